@@ -0,0 +1,149 @@
+"""
+Headless batch scorer.
+
+Streams a CSV or JSON-lines file of applicants through the vectorized
+pipeline in fixed-size chunks and writes the scores incrementally, so memory
+use does not grow with the size of the file. Only NumPy and the scoring core
+are imported; tkinter and matplotlib are never loaded.
+
+Usage:
+    python batch_score.py applicants.csv -o scores.csv --chunk-size 16384
+"""
+import argparse
+import csv
+import itertools
+import json
+import sys
+import time
+
+import numpy as np
+
+from scoring import score_batch
+
+
+INPUT_COLUMNS = ('market_house', 'location_house', 'application_assets',
+                 'application_salary', 'interest_rate')
+SCORE_COLUMNS = ('house_score', 'application_score', 'credit_score')
+
+
+def detect_format(path, default='csv'):
+    """Guess 'csv' or 'jsonl' from a file name."""
+    if path.endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    if path.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def read_records(stream, file_format):
+    """Yield one dict per applicant from a CSV or JSON-lines stream."""
+    if file_format == 'csv':
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def score_records(records, chunk_size, method='sampled'):
+    """
+    Score an iterable of applicant dicts chunk by chunk.
+
+    Args:
+        records (iterable): Dicts holding at least INPUT_COLUMNS
+        chunk_size (int): Applicants scored per vectorized call
+        method (str): Centroid method, 'sampled' or 'exact'
+
+    Yields:
+        tuple: (chunk of records, N x 3 array of house, application and credit scores)
+    """
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+        try:
+            columns = [np.array([record[name] for record in chunk], dtype=float)
+                       for name in INPUT_COLUMNS]
+        except KeyError as error:
+            raise ValueError(f"Missing input column: {error.args[0]}") from None
+        yield chunk, np.column_stack(score_batch(*columns, method=method))
+
+
+class RecordWriter:
+    """Writes input records extended with their scores as CSV or JSON lines."""
+
+    def __init__(self, stream, file_format):
+        self.stream = stream
+        self.file_format = file_format
+        self._csv_writer = None
+
+    def write(self, chunk, scores):
+        if self.file_format == 'csv':
+            if self._csv_writer is None:
+                fieldnames = list(chunk[0]) + [name for name in SCORE_COLUMNS if name not in chunk[0]]
+                self._csv_writer = csv.DictWriter(self.stream, fieldnames=fieldnames, extrasaction='ignore')
+                self._csv_writer.writeheader()
+            for record, row in zip(chunk, scores.tolist()):
+                self._csv_writer.writerow({**record, **dict(zip(SCORE_COLUMNS, row))})
+        else:
+            self.stream.writelines(json.dumps({**record, **dict(zip(SCORE_COLUMNS, row))}) + '\n'
+                                   for record, row in zip(chunk, scores.tolist()))
+        self.stream.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV or JSON-lines file of credit applicants.")
+    parser.add_argument('input', help="Input file, or - for stdin")
+    parser.add_argument('-o', '--output', default='-', help="Output file, or - for stdout (default)")
+    parser.add_argument('--input-format', choices=('csv', 'jsonl'),
+                        help="Defaults to the input file extension, else csv")
+    parser.add_argument('--output-format', choices=('csv', 'jsonl'),
+                        help="Defaults to the output file extension, else the input format")
+    parser.add_argument('--chunk-size', type=int, default=16384, help="Applicants scored per chunk")
+    parser.add_argument('--method', choices=('sampled', 'exact'), default='sampled',
+                        help="Centroid method (default: sampled, as in the GUI)")
+    args = parser.parse_args(argv)
+
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be positive")
+
+    input_format = args.input_format or detect_format(args.input)
+    output_format = args.output_format or detect_format(args.output, default=input_format)
+
+    # The input is opened first, so a missing input never truncates the output
+    try:
+        input_stream = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    except OSError as error:
+        parser.exit(1, f"error: {error}\n")
+    try:
+        output_stream = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+    except OSError as error:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        parser.exit(1, f"error: {error}\n")
+
+    rows = 0
+    start = time.perf_counter()
+    try:
+        writer = RecordWriter(output_stream, output_format)
+        for chunk, scores in score_records(read_records(input_stream, input_format),
+                                           args.chunk_size, args.method):
+            writer.write(chunk, scores)
+            rows += len(chunk)
+    except (OSError, ValueError) as error:
+        parser.exit(1, f"error: {error}\n")
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    elapsed = time.perf_counter() - start
+    rate = rows / elapsed if elapsed > 0 else float('inf')
+    print(f"Scored {rows} rows in {elapsed:.2f} s ({rate:,.0f} rows/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,498 @@
+"""
+Per-stage benchmark suite.
+
+Times every stage of the pipeline separately (membership evaluation, each
+fuzzification function, each rule stage, the centroid of each output type)
+plus full single-applicant and batch scoring at several batch sizes, and
+reports p50 latency per item, p99 latency per call (one input of the
+single-input stages, one batch of the batch benchmarks) and throughput. Startup benchmarks time the import of
+each module in a fresh interpreter (the cold start of a worker process) and
+check that the headless modules do not pull in matplotlib or tkinter. Results can be saved as a JSON
+baseline (a filtered run only replaces the benchmarks it ran); later runs
+are compared against it and the script exits with status 1 when any
+benchmark's p50 latency regresses past the threshold.
+
+Usage:
+    python benchmark.py --save                # record benchmark_baseline.json
+    python benchmark.py --threshold 0.25      # compare against it
+    python benchmark.py --filter score/       # only benchmarks whose name contains "score/"
+    python benchmark.py --filter startup/     # only the import-time benchmarks
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import fuzzification
+import membership_function
+from defuzzification import Defuzzifier
+from inference import (APPLICATION_RULE_BASE, HOUSE_RULE_BASE, LOAN_RULE_BASE,
+                       evaluate_application_rule, evaluate_house_rule, evaluate_loan_rule)
+from scoring import score_applicant, score_batch
+from sensitivity import score_sensitivities
+from session import ScoringSession
+from fis_graph import credit_graph
+from workspace import ScoringWorkspace
+
+
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+BATCH_SIZES = (1, 64, 1024, 16384)
+
+# Crisp inputs per call of a scalar benchmark; latencies are reported per input
+SCALAR_INPUTS = 64
+
+# Target error of the adaptive centroid benchmarks, in score units
+ADAPTIVE_TOLERANCE = 0.01
+
+# Modules whose import is timed, and those of them that must import with NumPy only
+STARTUP_MODULES = ('membership_function', 'fuzzification', 'inference', 'defuzzification',
+                   'scoring', 'sensitivity', 'session', 'fis_graph', 'workspace', 'batch_score', 'main')
+HEADLESS_MODULES = ('membership_function', 'fuzzification', 'inference', 'defuzzification',
+                    'scoring', 'sensitivity', 'session', 'fis_graph', 'workspace', 'batch_score')
+GUI_MODULES = ('matplotlib', 'tkinter')
+
+_IMPORT_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [name for name in {gui_modules!r} if name in sys.modules]}}))
+'''
+
+
+def sample_inputs(count, seed=0):
+    """Random applicants over the input universes, as a dict of arrays keyed like INPUT_CONFIGS."""
+    rng = np.random.default_rng(seed)
+    return {name: rng.uniform(*config['range'], count)
+            for name, config in fuzzification.INPUT_CONFIGS.items()}
+
+
+def build_benchmarks():
+    """
+    Returns:
+        list: (name, function, items, call) tuples; each call of `function` processes
+              `items` inputs (applicants, crisp values or fuzzy outputs). For benchmarks
+              looping over single inputs call(i) processes the i-th input alone; call is
+              None for batch benchmarks, whose individual calls are calls of `function`
+    """
+    inputs = sample_inputs(max(BATCH_SIZES))
+    scalar = {name: values[:SCALAR_INPUTS].tolist() for name, values in inputs.items()}
+    benchmarks = []
+
+    # Membership evaluation
+    salary_sets = fuzzification.SALARY_SETS
+    for shape, params in (salary_sets['Medium'], salary_sets['Very High']):
+        def membership(shape=shape, params=params, values=scalar['application_salary']):
+            function = membership_function.MEMBERSHIP_FUNCTIONS[shape]
+            for value in values:
+                function(value, *params)
+
+        def membership_call(index, shape=shape, params=params, values=scalar['application_salary']):
+            membership_function.MEMBERSHIP_FUNCTIONS[shape](values[index], *params)
+        benchmarks.append((f'membership/{shape}', membership, SCALAR_INPUTS, membership_call))
+
+        def membership_array(shape=shape, params=params, values=inputs['application_salary']):
+            membership_function.evaluate_membership_array(values, shape, params)
+        benchmarks.append((f'membership/{shape}_array', membership_array, len(inputs['application_salary']), None))
+
+    # Fuzzification
+    fuzzifiers = {
+        'market_house': fuzzification.market_value_house_fuzzification,
+        'location_house': fuzzification.location_of_house_fuzzification,
+        'application_assets': fuzzification.application_assets_fuzzification,
+        'application_salary': fuzzification.application_salary_fuzzification,
+        'interest_rate': fuzzification.interest_rate_fuzzification,
+    }
+    for name, function in fuzzifiers.items():
+        def fuzzify(function=function, values=scalar[name]):
+            for value in values:
+                function(value)
+
+        def fuzzify_call(index, function=function, values=scalar[name]):
+            function(values[index])
+        benchmarks.append((f'fuzzification/{function.__name__}', fuzzify, SCALAR_INPUTS, fuzzify_call))
+
+        def fuzzify_active(index=fuzzification.BREAKPOINT_INDEXES[name], values=scalar[name]):
+            for value in values:
+                index.active(value)
+
+        def fuzzify_active_call(position, index=fuzzification.BREAKPOINT_INDEXES[name], values=scalar[name]):
+            index.active(values[position])
+        benchmarks.append((f'fuzzification/active_{name}', fuzzify_active, SCALAR_INPUTS, fuzzify_active_call))
+
+    # Inference, on the fuzzified sample inputs
+    fuzzy = {name: [function(value) for value in scalar[name]] for name, function in fuzzifiers.items()}
+    houses = [evaluate_house_rule(market, location)
+              for market, location in zip(fuzzy['market_house'], fuzzy['location_house'])]
+    applications = [evaluate_application_rule(assets, salary)
+                    for assets, salary in zip(fuzzy['application_assets'], fuzzy['application_salary'])]
+    credits = [evaluate_loan_rule(salary, rate, application, house)
+               for salary, rate, application, house
+               in zip(fuzzy['application_salary'], fuzzy['interest_rate'], applications, houses)]
+
+    def house_rules():
+        for market, location in zip(fuzzy['market_house'], fuzzy['location_house']):
+            evaluate_house_rule(market, location)
+
+    def application_rules():
+        for assets, salary in zip(fuzzy['application_assets'], fuzzy['application_salary']):
+            evaluate_application_rule(assets, salary)
+
+    def loan_rules():
+        for salary, rate, application, house in zip(fuzzy['application_salary'], fuzzy['interest_rate'],
+                                                    applications, houses):
+            evaluate_loan_rule(salary, rate, application, house)
+
+    def house_rule_call(index):
+        evaluate_house_rule(fuzzy['market_house'][index], fuzzy['location_house'][index])
+
+    def application_rule_call(index):
+        evaluate_application_rule(fuzzy['application_assets'][index], fuzzy['application_salary'][index])
+
+    def loan_rule_call(index):
+        evaluate_loan_rule(fuzzy['application_salary'][index], fuzzy['interest_rate'][index],
+                           applications[index], houses[index])
+
+    benchmarks += [
+        ('inference/evaluate_house_rule', house_rules, SCALAR_INPUTS, house_rule_call),
+        ('inference/evaluate_application_rule', application_rules, SCALAR_INPUTS, application_rule_call),
+        ('inference/evaluate_loan_rule', loan_rules, SCALAR_INPUTS, loan_rule_call),
+    ]
+
+    # The same stages on active labels only
+    active = {name: [vector.active() for vector in vectors] for name, vectors in fuzzy.items()}
+    active_houses = [house.active() for house in houses]
+    active_applications = [application.active() for application in applications]
+
+    def house_rules_active():
+        for market, location in zip(active['market_house'], active['location_house']):
+            HOUSE_RULE_BASE.evaluate_active({'market': market, 'location': location})
+
+    def application_rules_active():
+        for assets, salary in zip(active['application_assets'], active['application_salary']):
+            APPLICATION_RULE_BASE.evaluate_active({'assets': assets, 'salary': salary})
+
+    def loan_rules_active():
+        for salary, rate, application, house in zip(active['application_salary'], active['interest_rate'],
+                                                    active_applications, active_houses):
+            LOAN_RULE_BASE.evaluate_active({'salary': salary, 'interest': rate,
+                                            'application': application, 'house': house})
+
+    def house_rule_active_call(index):
+        HOUSE_RULE_BASE.evaluate_active({'market': active['market_house'][index],
+                                         'location': active['location_house'][index]})
+
+    def application_rule_active_call(index):
+        APPLICATION_RULE_BASE.evaluate_active({'assets': active['application_assets'][index],
+                                               'salary': active['application_salary'][index]})
+
+    def loan_rule_active_call(index):
+        LOAN_RULE_BASE.evaluate_active({'salary': active['application_salary'][index],
+                                        'interest': active['interest_rate'][index],
+                                        'application': active_applications[index], 'house': active_houses[index]})
+
+    benchmarks += [
+        ('inference/evaluate_house_rule_active', house_rules_active, SCALAR_INPUTS, house_rule_active_call),
+        ('inference/evaluate_application_rule_active', application_rules_active, SCALAR_INPUTS,
+         application_rule_active_call),
+        ('inference/evaluate_loan_rule_active', loan_rules_active, SCALAR_INPUTS, loan_rule_active_call),
+    ]
+
+    # Defuzzification
+    defuzzifier = Defuzzifier()
+    for output_type, outputs in (('house', houses), ('application', applications), ('credit', credits)):
+        for method in ('sampled', 'exact'):
+            def centroid(output_type=output_type, outputs=outputs, method=method):
+                for fuzzy_output in outputs:
+                    defuzzifier.centroid_defuzzification(fuzzy_output, output_type, method)
+
+            def centroid_call(index, output_type=output_type, outputs=outputs, method=method):
+                defuzzifier.centroid_defuzzification(outputs[index], output_type, method)
+            benchmarks.append((f'defuzzification/centroid_{output_type}_{method}', centroid, SCALAR_INPUTS,
+                               centroid_call))
+
+        def adaptive_centroid(output_type=output_type, outputs=outputs):
+            for fuzzy_output in outputs:
+                defuzzifier.adaptive_centroid_defuzzification(fuzzy_output, output_type, ADAPTIVE_TOLERANCE)
+
+        def adaptive_centroid_call(index, output_type=output_type, outputs=outputs):
+            defuzzifier.adaptive_centroid_defuzzification(outputs[index], output_type, ADAPTIVE_TOLERANCE)
+        benchmarks.append((f'defuzzification/centroid_{output_type}_adaptive', adaptive_centroid, SCALAR_INPUTS,
+                           adaptive_centroid_call))
+
+    # Full pipeline
+    rows = list(zip(*scalar.values()))
+    for name, sparse in (('score/single', False), ('score/single_sparse', True)):
+        def single(sparse=sparse):
+            for row in rows:
+                score_applicant(*row, defuzzifier=defuzzifier, sparse=sparse)
+
+        def single_call(index, sparse=sparse):
+            score_applicant(*rows[index], defuzzifier=defuzzifier, sparse=sparse)
+        benchmarks.append((name, single, SCALAR_INPUTS, single_call))
+
+    # What-if edits of one input of the first applicant, re-scored incrementally
+    session = ScoringSession(defuzzifier, **{name: values[0] for name, values in scalar.items()})
+    for name in ('interest_rate', 'application_salary', 'market_house'):
+        def session_update(name=name, values=scalar[name]):
+            for value in values:
+                session.update(**{name: value})
+                session.scores()
+
+        def session_call(index, name=name, values=scalar[name]):
+            session.update(**{name: values[index]})
+            session.scores()
+        benchmarks.append((f'score/session_{name}', session_update, SCALAR_INPUTS, session_call))
+
+    graph_system = credit_graph(defuzzifier)
+    for size in BATCH_SIZES:
+        columns = [values[:size] for values in inputs.values()]
+
+        def batch(columns=columns):
+            score_batch(*columns, defuzzifier=defuzzifier)
+        benchmarks.append((f'score/batch_{size}', batch, size, None))
+
+        def graph(columns=dict(zip(inputs, columns))):
+            graph_system.evaluate(columns, workers=os.cpu_count())
+        benchmarks.append((f'score/graph_{size}', graph, size, None))
+
+        def workspace_batch(columns=columns, workspace=ScoringWorkspace(size, defuzzifier)):
+            workspace.score(*columns)
+        benchmarks.append((f'score/workspace_{size}', workspace_batch, size, None))
+
+        def sensitivities(columns=columns):
+            score_sensitivities(*columns, defuzzifier=defuzzifier)
+        benchmarks.append((f'score/sensitivities_{size}', sensitivities, size, None))
+
+    return benchmarks
+
+
+def time_benchmark(function, items, repeat=30, min_sample_time=0.01, call=None, single_calls=2000):
+    """
+    Time one benchmark.
+
+    Calls are grouped into samples lasting at least `min_sample_time` seconds;
+    the latency of a sample is its time per call divided by `items`, and p50 is
+    the median of these per-item averages. An average hides the slow calls, so
+    p99 is taken over individually timed calls instead: calls of `call`, one
+    input each, or without it calls of `function`, one batch each. About as
+    many are timed as fit in the samples, at least `repeat` and at most
+    `single_calls`.
+
+    Args:
+        function (callable): Benchmark body, called without arguments
+        items (int): Inputs processed per call
+        repeat (int): Number of samples
+        min_sample_time (float): Shortest sample duration (seconds)
+        call (callable): Optional; call(i) processes input i alone, i < items
+        single_calls (int): Most individually timed calls
+
+    Returns:
+        dict: p50_us (per-item latency, microseconds), p99_us (latency of one call of
+              `call`, or else of `function`, microseconds), throughput (items per
+              second), calls_per_sample
+    """
+    function()  # warm up caches and lazily built tables
+
+    # Calibrate the number of calls per sample
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample_time:
+            break
+        calls *= 2 if elapsed <= 0 else max(2, min(10, int(min_sample_time / elapsed) + 1))
+
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        latencies.append((time.perf_counter() - start) / (calls * items))
+
+    if call is None and calls == 1:
+        call_latencies = [latency * items for latency in latencies]  # the samples were single calls
+    else:
+        if call is None:
+            call, items = (lambda index: function()), 1
+        call_latencies = []
+        for index in range(min(single_calls, max(repeat, repeat * calls * items))):
+            start = time.perf_counter()
+            call(index % items)
+            call_latencies.append(time.perf_counter() - start)
+
+    p50 = np.percentile(latencies, 50)
+    return {
+        'p50_us': float(p50 * 1e6),
+        'p99_us': float(np.percentile(call_latencies, 99) * 1e6),
+        'throughput': float(1.0 / p50),
+        'calls_per_sample': calls,
+    }
+
+
+def time_import(module, repeat=10):
+    """
+    Time the import of a module in fresh interpreters, as a worker process would.
+
+    Each sample runs a new interpreter (bytecode caches warm) and times only the
+    import statement, leaving out interpreter startup.
+
+    Args:
+        module (str): Module name, importable from the repository directory
+        repeat (int): Number of interpreters started
+
+    Returns:
+        dict: p50_us, p99_us, throughput (imports per second), calls_per_sample, and
+              gui_modules, the GUI modules (GUI_MODULES) the import loaded
+    """
+    probe = _IMPORT_PROBE.format(module=module, gui_modules=GUI_MODULES)
+    directory = os.path.dirname(os.path.abspath(__file__))
+
+    samples = []
+    for _ in range(repeat + 1):  # the first run only warms the bytecode cache
+        output = subprocess.run([sys.executable, '-c', probe], cwd=directory, check=True,
+                                capture_output=True, text=True).stdout
+        samples.append(json.loads(output.splitlines()[-1]))
+    samples = samples[1:]
+
+    p50, p99 = np.percentile([sample['seconds'] for sample in samples], [50, 99])
+    return {
+        'p50_us': float(p50 * 1e6),
+        'p99_us': float(p99 * 1e6),
+        'throughput': float(1.0 / p50),
+        'calls_per_sample': 1,
+        'gui_modules': sorted({name for sample in samples for name in sample['loaded']}),
+    }
+
+
+def run_benchmarks(name_filter='', repeat=30, min_sample_time=0.01, startup_repeat=10, out=sys.stdout):
+    """Run the matching benchmarks, printing a line per benchmark; returns {name: timings}."""
+    results = {}
+    print(f"{'benchmark':<45} {'p50 (us/item)':>14} {'p99 (us/call)':>14} {'items/s':>14}", file=out)
+
+    def report(name, timings):
+        results[name] = timings
+        print(f"{name:<45} {timings['p50_us']:>14.3f} {timings['p99_us']:>14.3f} "
+              f"{timings['throughput']:>14,.0f}", file=out, flush=True)
+
+    for name, function, items, call in build_benchmarks():
+        if name_filter in name:
+            report(name, time_benchmark(function, items, repeat, min_sample_time, call))
+
+    for module in STARTUP_MODULES:
+        name = f'startup/import_{module}'
+        if name_filter in name:
+            report(name, time_import(module, startup_repeat))
+    return results
+
+
+def gui_imports(results):
+    """
+    Returns:
+        list: (module, GUI modules it loaded) for every headless module whose import
+              pulled in matplotlib or tkinter
+    """
+    return [(module, results[f'startup/import_{module}']['gui_modules'])
+            for module in HEADLESS_MODULES
+            if results.get(f'startup/import_{module}', {}).get('gui_modules')]
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare p50 latencies against a baseline.
+
+    Args:
+        results (dict): {name: timings} of this run
+        baseline (dict): {name: timings} of the baseline
+        threshold (float): Allowed relative slowdown, e.g. 0.2 for 20%
+
+    Returns:
+        list: (name, baseline p50, current p50, relative change) of every regression
+    """
+    regressions = []
+    for name, timings in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['p50_us']
+        change = timings['p50_us'] / before - 1.0 if before > 0 else 0.0
+        if change > threshold:
+            regressions.append((name, before, timings['p50_us'], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark each stage of the credit scoring pipeline.")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help=f"Baseline JSON file (default: {DEFAULT_BASELINE})")
+    parser.add_argument('--save', action='store_true', help="Write this run as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Allowed p50 slowdown relative to the baseline (default: 0.2 = 20%%)")
+    parser.add_argument('--filter', default='', help="Only run benchmarks whose name contains this string")
+    parser.add_argument('--repeat', type=int, default=30, help="Samples per benchmark")
+    parser.add_argument('--min-sample-time', type=float, default=0.01, help="Shortest sample (seconds)")
+    parser.add_argument('--startup-repeat', type=int, default=10, help="Interpreters started per import benchmark")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.filter, args.repeat, args.min_sample_time, args.startup_repeat)
+
+    heavy_imports = gui_imports(results)
+    for module, loaded in heavy_imports:
+        print(f"HEAVY IMPORT {module}: loads {', '.join(loaded)}")
+
+    if args.save:
+        # Keep the baseline of every benchmark this run did not time
+        saved = {}
+        try:
+            with open(args.baseline, encoding='utf-8') as file:
+                baseline = json.load(file)
+        except FileNotFoundError:
+            pass
+        else:
+            if baseline.get('environment') == environment():
+                saved = baseline['results']
+            elif args.filter:
+                print("Error: the baseline was recorded in a different environment; "
+                      "re-record it without --filter", file=sys.stderr)
+                return 1
+        saved.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump({'environment': environment(), 'results': saved}, file, indent=2)
+        print(f"Baseline saved to {args.baseline} ({len(results)} updated, {len(saved) - len(results)} kept)")
+        return 1 if heavy_imports else 0
+
+    try:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}; run with --save to record one")
+        return 1 if heavy_imports else 0
+
+    if baseline.get('environment') != environment():
+        print("Warning: the baseline was recorded in a different environment", file=sys.stderr)
+
+    regressions = compare(results, baseline['results'], args.threshold)
+    for name, before, after, change in regressions:
+        print(f"REGRESSION {name}: p50 {before:.3f} us -> {after:.3f} us ({change:+.0%})")
+    if regressions or heavy_imports:
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%} of {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Speed and accuracy of the defuzzification methods against the centroid.
+
+Scores a random portfolio once up to the rule stages, then defuzzifies the
+fuzzy outputs of every output type with each of DEFUZZIFICATION_METHODS and
+reports its throughput, its speedup over the sampled centroid (the GUI's
+method) and how far its scores deviate from the centroid's.
+
+Usage:
+    python compare_defuzzifiers.py --size 100000
+    python compare_defuzzifiers.py --json report.json
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from benchmark import sample_inputs
+from defuzzification import DEFUZZIFICATION_METHODS, Defuzzifier
+from scoring import score_batch
+
+
+OUTPUT_TYPES = ('house', 'application', 'credit')
+
+
+def compare_methods(size=100000, seed=0, repeat=3, chunk_size=256):
+    """
+    Compare every defuzzification method with the sampled centroid.
+
+    Args:
+        size (int): Applicants in the sample portfolio
+        seed (int): Seed of the portfolio
+        repeat (int): Timed runs per method (the fastest is kept)
+        chunk_size (int): Rows defuzzified at a time
+
+    Returns:
+        dict: {output_type: {method: {'seconds', 'rows_per_second', 'speedup',
+               'mean_deviation', 'p99_deviation', 'max_deviation', 'correlation'}}};
+              deviations are absolute, in score units
+    """
+    defuzzifier = Defuzzifier()
+    *_, degrees = score_batch(*sample_inputs(size, seed).values(), return_degrees=True,
+                              defuzzifier=defuzzifier)
+
+    report = {}
+    for output_type in OUTPUT_TYPES:
+        fuzzy_outputs = dict(zip(defuzzifier.output_configs[output_type]['sets'], degrees[output_type].T))
+
+        results = {}
+        for method in DEFUZZIFICATION_METHODS:
+            seconds = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                scores = defuzzifier.defuzzify_batch(fuzzy_outputs, output_type, method, chunk_size)
+                seconds = min(seconds, time.perf_counter() - start)
+            results[method] = (seconds, scores)
+
+        reference_seconds, reference = results['centroid']
+        report[output_type] = {}
+        for method, (seconds, scores) in results.items():
+            deviation = np.abs(scores - reference)
+            spread = np.std(scores) * np.std(reference)
+            report[output_type][method] = {
+                'seconds': seconds,
+                'rows_per_second': size / seconds,
+                'speedup': reference_seconds / seconds,
+                'mean_deviation': float(deviation.mean()),
+                'p99_deviation': float(np.percentile(deviation, 99)),
+                'max_deviation': float(deviation.max()),
+                'correlation': float(np.mean((scores - scores.mean()) * (reference - reference.mean())) / spread)
+                               if spread > 0 else float('nan'),
+            }
+    return report
+
+
+def print_report(report, out=sys.stdout):
+    for output_type, methods in report.items():
+        print(f"\n{output_type} (deviations from the sampled centroid, in score units)", file=out)
+        print(f"{'method':<20} {'rows/s':>12} {'speedup':>8} {'mean dev':>10} {'p99 dev':>10} "
+              f"{'max dev':>10} {'corr':>7}", file=out)
+        for method, stats in methods.items():
+            print(f"{method:<20} {stats['rows_per_second']:>12,.0f} {stats['speedup']:>7.1f}x "
+                  f"{stats['mean_deviation']:>10.4f} {stats['p99_deviation']:>10.4f} "
+                  f"{stats['max_deviation']:>10.4f} {stats['correlation']:>7.4f}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the defuzzification methods with the centroid.")
+    parser.add_argument('--size', type=int, default=100000, help="Applicants in the sample portfolio")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per method")
+    parser.add_argument('--json', help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.size < 1:
+        parser.error("--size must be positive")
+
+    report = compare_methods(args.size, args.seed, args.repeat)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,27 @@
+import math
+
 import numpy as np
-from membership_function import trapezoidal_membership, triangle_membership
+
+from fuzzy_vector import FuzzyVector, batch_rows
+from instrumentation import instrumented, record_cache
+from membership_function import evaluate_membership, evaluate_membership_array, trapezoidal_membership_array
+
+
+# Defuzzification methods selectable per output type
+DEFUZZIFICATION_METHODS = {
+    'centroid': "Centroid of the aggregated set, sampled on the grid (as in the GUI)",
+    'centroid_exact': "Centroid of the aggregated set, integrated in closed form",
+    'bisector': "Point splitting the area of the aggregated set in half, in closed form",
+    'weighted_average': "Average of the set centroids weighted by rule strength (no grid)",
+    'height': "Average of the set peaks weighted by rule strength (no grid)",
+    'mean_of_maxima': "Mean of the points where the aggregated set is highest",
+    'smallest_of_maxima': "Smallest point where the aggregated set is highest",
+    'largest_of_maxima': "Largest point where the aggregated set is highest",
+}
+
+# Finest refinement level of the adaptive centroid; level k samples the output
+# range with cells of at most 1/2**k of its width, between the set breakpoints
+ADAPTIVE_MAX_LEVEL = 16
 
 
 class Defuzzifier:
@@ -7,46 +29,138 @@ class Defuzzifier:
     Performs defuzzification for different output types.
     """
     
-    def __init__(self):
+    # Compiled membership grids shared by all instances, keyed by the range
+    # and sets of the output type: (config key, resolution) -> (x, labels x resolution matrix)
+    _grid_cache = {}
+    
+    def __init__(self, resolution=1000, methods=None, output_configs=None):
+        """
+        Args:
+            resolution (int): Number of points sampled on each output range by
+                              the sampled centroid and the visualizations
+            methods (dict): Optional {output_type: method} used by `defuzzify` and
+                            `defuzzify_batch`, methods being keys of
+                            DEFUZZIFICATION_METHODS (default: 'centroid' everywhere)
+            output_configs (dict): Optional {output_type: {'range': (low, high),
+                                   'sets': {label: (shape, vertices)}}} adding output
+                                   types to (or replacing) credit, house and application
+        """
+        self.resolution = resolution
+        self._buffers = {}
+        
         # Define membership functions and ranges for each output type
         self.output_configs = {
             'credit': {
                 'range': (0, 1000),
-                'functions': {
-                    'Very_low': lambda val: trapezoidal_membership(val, 0, 0, 100, 200),
-                    'Low': lambda val: triangle_membership(val, 100, 250, 400),
-                    'Medium': lambda val: triangle_membership(val, 300, 500, 700),
-                    'High': lambda val: triangle_membership(val, 600, 750, 900),
-                    'Very_high': lambda val: trapezoidal_membership(val, 800, 900, 1000, 1000)
+                'sets': {
+                    'Very_low': ('trapezoid', (0, 0, 100, 200)),
+                    'Low': ('triangle', (100, 250, 400)),
+                    'Medium': ('triangle', (300, 500, 700)),
+                    'High': ('triangle', (600, 750, 900)),
+                    'Very_high': ('trapezoid', (800, 900, 1000, 1000))
                 }
             },
             'house': {
                 'range': (0, 10),
-                'functions': {
-                    'Very_low': lambda val: trapezoidal_membership(val, 0, 0, 1, 3),
-                    'Low': lambda val: triangle_membership(val, 1, 3, 5),
-                    'Medium': lambda val: triangle_membership(val, 3, 5, 7),
-                    'High': lambda val: triangle_membership(val, 5, 7, 9),
-                    'Very_high': lambda val: trapezoidal_membership(val, 7, 9, 10, 10)
+                'sets': {
+                    'Very_low': ('trapezoid', (0, 0, 1, 3)),
+                    'Low': ('triangle', (1, 3, 5)),
+                    'Medium': ('triangle', (3, 5, 7)),
+                    'High': ('triangle', (5, 7, 9)),
+                    'Very_high': ('trapezoid', (7, 9, 10, 10))
                 }
             },
             'application': {
                 'range': (0, 10),
-                'functions': {
-                    'Low': lambda val: trapezoidal_membership(val, 0, 0, 2, 4),
-                    'Medium': lambda val: triangle_membership(val, 2, 5, 8),
-                    'High': lambda val: trapezoidal_membership(val, 6, 8, 10, 10)
+                'sets': {
+                    'Low': ('trapezoid', (0, 0, 2, 4)),
+                    'Medium': ('triangle', (2, 5, 8)),
+                    'High': ('trapezoid', (6, 8, 10, 10))
                 }
             }
         }
+        for output_type, config in (output_configs or {}).items():
+            self.output_configs[output_type] = {'range': tuple(config['range']), 'sets': dict(config['sets'])}
+        self._config_keys = {
+            output_type: (config['range'], tuple((label, shape, tuple(params))
+                                                 for label, (shape, params) in config['sets'].items()))
+            for output_type, config in self.output_configs.items()
+        }
+        self._exact_cache = {}
+        self._labels = {output_type: tuple(config['sets']) for output_type, config in self.output_configs.items()}
+        self._center_cache = {}
+        self._kink_cache = {}
+        
+        self.methods = dict.fromkeys(self.output_configs, 'centroid')
+        for output_type, method in (methods or {}).items():
+            if output_type not in self.output_configs:
+                raise ValueError(f"Invalid output_type: {output_type}")
+            if method not in DEFUZZIFICATION_METHODS:
+                raise ValueError(f"Invalid method: {method}")
+            self.methods[output_type] = method
+
+        # Scalar membership functions built from the (shape, vertices) tables
+        for config in self.output_configs.values():
+            config['functions'] = {
+                category: self._membership_function(shape, params)
+                for category, (shape, params) in config['sets'].items()
+            }
+
+    @staticmethod
+    def _membership_function(shape, params):
+        return lambda val: evaluate_membership(val, shape, params)
     
-    def centroid_defuzzification(self, fuzzy_output, output_type='credit'):
+    def grid(self, output_type):
+        """
+        Returns the sampled universe and the compiled membership grid
+        (labels x resolution, rows in the order of config['sets']) of an output type.
+        Grids are compiled once and shared by every Defuzzifier; both arrays are
+        read-only.
+        """
+        key = (self._config_keys[output_type], self.resolution)
+        record_cache('defuzzifier_grid', key in Defuzzifier._grid_cache)
+        if key not in Defuzzifier._grid_cache:
+            config = self.output_configs[output_type]
+            x = np.linspace(config['range'][0], config['range'][1], self.resolution)
+            grid = np.array([evaluate_membership_array(x, shape, params)
+                             for shape, params in config['sets'].values()])
+            x.flags.writeable = False
+            grid.flags.writeable = False
+            Defuzzifier._grid_cache[key] = (x, grid)
+        return Defuzzifier._grid_cache[key]
+    
+    def _strength_vector(self, fuzzy_output, output_type):
+        # Rule strengths in grid row order; non-positive strengths clip to nothing
+        if type(fuzzy_output) is FuzzyVector and fuzzy_output.labels == self._labels[output_type]:
+            return np.fmax(fuzzy_output.degrees, 0.0)
+        return np.array([
+            strength if strength > 0 else 0.0
+            for strength in (fuzzy_output.get(category, 0.0)
+                             for category in self.output_configs[output_type]['sets'])
+        ])
+    
+    def _strength_matrix(self, fuzzy_outputs, output_type, empty_size=0):
+        # N x labels rule strengths in grid row order, from a FuzzyVector or a
+        # dict of arrays (missing labels have strength 0; scalars broadcast)
+        labels = self._labels[output_type]
+        if isinstance(fuzzy_outputs, FuzzyVector):
+            return FuzzyVector.from_mapping(fuzzy_outputs, labels).degrees.reshape(-1, len(labels))
+        n = max((np.size(strength) for strength in fuzzy_outputs.values()), default=empty_size)
+        return np.column_stack([
+            np.broadcast_to(np.asarray(fuzzy_outputs.get(category, 0.0), dtype=float), (n,))
+            for category in labels
+        ])
+    
+    @instrumented('defuzzification.centroid_defuzzification')
+    def centroid_defuzzification(self, fuzzy_output, output_type='credit', method='sampled'):
         """
         Converts the fuzzy output to a crisp value using the centroid method.
         
         Args:
-            fuzzy_output (dict): {'Very_low': 0.2, 'Low': 0.5, ...}
+            fuzzy_output (FuzzyVector or dict): {'Very_low': 0.2, 'Low': 0.5, ...}
             output_type (str): 'credit', 'house', or 'application'
+            method (str): 'sampled' takes the discrete centroid of the compiled grid,
+                          'exact' integrates the piecewise-linear aggregated set in closed form
         
         Returns:
             float: Crisp output value
@@ -55,30 +169,27 @@ class Defuzzifier:
         if output_type not in self.output_configs:
             raise ValueError(f"Invalid output_type: {output_type}")
         
-        config = self.output_configs[output_type]
-        output_range = config['range']
-        membership_functions = config['functions']
+        if method == 'exact':
+            if not isinstance(fuzzy_output, FuzzyVector):
+                fuzzy_output = {category: [strength] for category, strength in fuzzy_output.items()}
+            return float(self._exact_centroid(fuzzy_output, output_type)[0])
+        if method != 'sampled':
+            raise ValueError(f"Invalid method: {method}")
         
-        # Generate values for the X-axis
-        x = np.linspace(output_range[0], output_range[1], 1000)
+        output_range = self.output_configs[output_type]['range']
+        x, grid = self.grid(output_type)
+        strengths = self._strength_vector(fuzzy_output, output_type)
         
-        # Initialize aggregated membership
-        aggregated = np.zeros(len(x))
+        if output_type not in self._buffers:
+            self._buffers[output_type] = np.empty(grid.shape)
+        clipped = self._buffers[output_type]
         
-        # Process each category
-        for category, strength in fuzzy_output.items():
-            if strength > 0 and category in membership_functions:
-                # Compute membership values
-                membership_values = np.array([membership_functions[category](xi) for xi in x])
-                
-                # CLIPPING
-                clipped = np.minimum(membership_values, strength)
-                
-                # AGGREGATION
-                aggregated = np.maximum(aggregated, clipped)
+        # CLIPPING and AGGREGATION
+        np.minimum(grid, strengths[:, np.newaxis], out=clipped)
+        aggregated = clipped.max(axis=0)
         
         # Compute centroid
-        numerator = np.sum(x * aggregated)
+        numerator = aggregated @ x
         denominator = np.sum(aggregated)
         
         if denominator == 0:
@@ -87,6 +198,547 @@ class Defuzzifier:
         crisp_output = numerator / denominator
         return crisp_output
     
+    @instrumented('defuzzification.centroid_defuzzification_batch',
+                  batch_size=lambda self, fuzzy_outputs, *args, **kwargs: batch_rows(fuzzy_outputs, 1))
+    def centroid_defuzzification_batch(self, fuzzy_outputs, output_type='credit', chunk_size=256,
+                                       method='sampled'):
+        """
+        Vectorized version of `centroid_defuzzification` for a batch of fuzzy outputs.
+        Uses the same compiled grid, clipping and aggregation as the scalar method.
+        
+        Args:
+            fuzzy_outputs (FuzzyVector or dict): N x labels FuzzyVector, or
+                {'Very_low': array, 'Low': array, ...}, each an array of N degrees
+            output_type (str): 'credit', 'house', or 'application'
+            chunk_size (int): Rows defuzzified at a time, bounding the size of the work buffers
+            method (str): 'sampled' or 'exact', as in `centroid_defuzzification`
+        
+        Returns:
+            numpy.ndarray: N crisp output values
+        """
+        
+        if output_type not in self.output_configs:
+            raise ValueError(f"Invalid output_type: {output_type}")
+        
+        strengths = self._strength_matrix(fuzzy_outputs, output_type)
+        n = strengths.shape[0]
+        
+        if method == 'exact':
+            crisp_outputs = np.empty(n)
+            labels = self._labels[output_type]
+            for start in range(0, n, chunk_size):
+                chunk = FuzzyVector(labels, strengths[start:start + chunk_size])
+                crisp_outputs[start:start + chunk_size] = self._exact_centroid(chunk, output_type)
+            return crisp_outputs
+        if method != 'sampled':
+            raise ValueError(f"Invalid method: {method}")
+        
+        config = self.output_configs[output_type]
+        output_range = config['range']
+        x, grid = self.grid(output_type)
+        
+        aggregated_buffer = np.empty((min(chunk_size, n), x.shape[0]))
+        clipped_buffer = np.empty_like(aggregated_buffer)
+        
+        crisp_outputs = np.empty(n)
+        for start in range(0, n, chunk_size):
+            chunk = strengths[start:start + chunk_size]
+            aggregated = aggregated_buffer[:chunk.shape[0]]
+            clipped = clipped_buffer[:chunk.shape[0]]
+            
+            aggregated.fill(0.0)
+            for column, membership_values in enumerate(grid):
+                # CLIPPING
+                np.minimum(membership_values, chunk[:, column, np.newaxis], out=clipped)
+                
+                # AGGREGATION
+                np.maximum(aggregated, clipped, out=aggregated)
+            
+            numerator = aggregated @ x
+            denominator = np.sum(aggregated, axis=1)
+            
+            empty = denominator == 0
+            denominator[empty] = 1.0
+            result = numerator / denominator
+            result[empty] = (output_range[0] + output_range[1]) / 2
+            crisp_outputs[start:start + chunk_size] = result
+        
+        return crisp_outputs
+    
+    def _exact_tables(self, output_type):
+        """
+        Breakpoints and edge lines of an output type, used by `_exact_centroid`.
+        
+        Every set is written as a trapezoid (a, b, c, d) with b == c for triangles.
+        Returns the vertices (labels x 4), the constant candidate points (the
+        range ends, every vertex and every crossing of two sloped edges) and the
+        sloped edges as (foot, shoulder) pairs.
+        """
+        record_cache('defuzzifier_exact_tables', output_type in self._exact_cache)
+        if output_type in self._exact_cache:
+            return self._exact_cache[output_type]
+        
+        config = self.output_configs[output_type]
+        vertices = np.array([
+            (params[0], params[1], params[1], params[2]) if shape == 'triangle' else params
+            for shape, params in config['sets'].values()
+        ], dtype=float)
+        
+        # Sloped edges as lines through (foot, 0) and (shoulder, 1)
+        edges = []
+        for a, b, c, d in vertices:
+            if b > a:
+                edges.append((a, b))
+            if d > c:
+                edges.append((d, c))
+        edges = np.array(edges)
+        
+        # Crossings of two edges: x = foot + y * (shoulder - foot) on both lines
+        crossings = []
+        for i in range(len(edges)):
+            for j in range(i + 1, len(edges)):
+                (f1, s1), (f2, s2) = edges[i], edges[j]
+                slope_difference = (s1 - f1) - (s2 - f2)
+                if slope_difference != 0:
+                    y = (f2 - f1) / slope_difference
+                    if 0 < y < 1:
+                        crossings.append(f1 + y * (s1 - f1))
+        
+        fixed_points = np.concatenate([config['range'], vertices.ravel(), crossings])
+        fixed_points = np.unique(np.clip(fixed_points, *config['range']))
+        
+        self._exact_cache[output_type] = (vertices, fixed_points, edges)
+        return self._exact_cache[output_type]
+    
+    def _aggregated_polyline(self, strengths, output_type):
+        """
+        The clipped and aggregated output sets as exact polylines.
+        
+        Clipping with min and aggregating with max keeps the output piecewise
+        linear, with kinks only at the set vertices, at crossings of two edges
+        and where an edge reaches a clipping level. Assumes, as in all current
+        configurations, that vertical edges only occur at the range ends.
+        
+        Args:
+            strengths (numpy.ndarray): N x labels rule strengths in grid row order
+            output_type (str): 'credit', 'house', or 'application'
+        
+        Returns:
+            tuple: (points, aggregated), N x P sorted x coordinates and the aggregated
+                   membership at each; the set is a straight line between neighbours
+        """
+        output_range = self.output_configs[output_type]['range']
+        vertices, fixed_points, edges = self._exact_tables(output_type)
+        
+        n = strengths.shape[0]
+        levels = np.clip(strengths, 0.0, 1.0)
+        
+        # Where each edge reaches each clipping level: N x (edges * labels)
+        feet = edges[:, 0, np.newaxis]
+        level_points = feet + levels[:, np.newaxis, :] * (edges[:, 1, np.newaxis] - feet)
+        level_points = np.clip(level_points.reshape(n, -1), *output_range)
+        
+        points = np.concatenate([np.broadcast_to(fixed_points, (n, fixed_points.size)), level_points], axis=1)
+        points.sort(axis=1)
+        
+        # Aggregated membership at every candidate point
+        aggregated = np.zeros(points.shape)
+        for column, (a, b, c, d) in enumerate(vertices):
+            membership_values = trapezoidal_membership_array(points, a, b, c, d)
+            np.maximum(aggregated, np.minimum(membership_values, strengths[:, column, np.newaxis]),
+                       out=aggregated)
+        return points, aggregated
+    
+    @staticmethod
+    def _polyline_integrals(points, aggregated):
+        # Area and first moment of the polylines through (points, aggregated),
+        # integrated exactly per linear segment; points is N x P or a shared P grid
+        x0, x1 = points[..., :-1], points[..., 1:]
+        y0, y1 = aggregated[:, :-1], aggregated[:, 1:]
+        width = x1 - x0
+        area = np.sum(width * (y0 + y1), axis=1) / 2
+        moment = np.sum(width * (y0 * (2 * x0 + x1) + y1 * (x0 + 2 * x1)), axis=1) / 6
+        return area, moment
+    
+    def _exact_centroid(self, fuzzy_outputs, output_type):
+        """
+        Closed-form centroid of the clipped and aggregated output sets.
+        
+        Between the kinks of `_aggregated_polyline` (O(labels^2) points) the
+        aggregated set is a straight line, so its area and first moment are
+        integrated exactly per segment.
+        
+        Args:
+            fuzzy_outputs (FuzzyVector or dict): As in `centroid_defuzzification_batch`
+            output_type (str): 'credit', 'house', or 'application'
+        
+        Returns:
+            numpy.ndarray: N crisp output values
+        """
+        output_range = self.output_configs[output_type]['range']
+        strengths = self._strength_matrix(fuzzy_outputs, output_type, empty_size=1)
+        area, moment = self._polyline_integrals(*self._aggregated_polyline(strengths, output_type))
+        
+        empty = area <= 0
+        area[empty] = 1.0
+        crisp_outputs = moment / area
+        crisp_outputs[empty] = (output_range[0] + output_range[1]) / 2
+        return crisp_outputs
+    
+    def _adaptive_grid(self, output_type, level):
+        """
+        Returns the non-uniform universe of refinement `level` and its compiled
+        membership grid: every set breakpoint and edge crossing, with the gaps
+        between them split evenly into cells of at most range / 2**level.
+        Grids are compiled once and shared by every Defuzzifier.
+        """
+        key = (self._config_keys[output_type], 'adaptive', level)
+        record_cache('defuzzifier_grid', key in Defuzzifier._grid_cache)
+        if key not in Defuzzifier._grid_cache:
+            config = self.output_configs[output_type]
+            fixed_points = self._exact_tables(output_type)[1]
+            cell = (config['range'][1] - config['range'][0]) / 2 ** level
+            pieces = [np.linspace(left, right, int(np.ceil((right - left) / cell)) + 1)[:-1]
+                      for left, right in zip(fixed_points[:-1], fixed_points[1:])]
+            x = np.concatenate(pieces + [fixed_points[-1:]])
+            grid = np.array([evaluate_membership_array(x, shape, params)
+                             for shape, params in config['sets'].values()])
+            x.flags.writeable = False
+            grid.flags.writeable = False
+            Defuzzifier._grid_cache[key] = (x, grid)
+        return Defuzzifier._grid_cache[key]
+    
+    def _kink_tables(self, output_type):
+        # Per sloped edge (edges x 1 columns): its set, foot, signed run to the
+        # shoulder and slope; and the cut interval of every set at level h as
+        # start = a + h (b - a) and end = d - h (d - c), widened by a rounding margin
+        if output_type not in self._kink_cache:
+            vertices, _, edges = self._exact_tables(output_type)
+            edge_sets = [column for column, (a, b, c, d) in enumerate(vertices)
+                         for sloped in (b > a, d > c) if sloped]
+            feet, rises = edges[:, :1], edges[:, 1:] - edges[:, :1]
+            a, b, c, d = vertices.T
+            margin = 1e-9 * (vertices[:, 3] - vertices[:, 0])
+            self._kink_cache[output_type] = (edge_sets, feet, rises, 1.0 / np.abs(rises),
+                                              (a - margin, b - a), (d + margin, d - c))
+        return self._kink_cache[output_type]
+    
+    def _adaptive_level(self, strengths, output_type, level):
+        """
+        Centroids of N rows of rule strengths on the grid of one refinement
+        level, with a bound on their distance from the exact centroid.
+        
+        The sampled aggregated set is integrated as the polyline through its
+        samples. Every breakpoint of the sets is a grid point, so the polyline
+        only departs from the aggregated set in cells holding a clip kink: a
+        point where an edge reaches a clipping level. There the gap is a tent
+        under the kink, of area slope * t * (width - t) / 2 for a kink t from
+        the left end of its cell, and never more than width * (highest
+        strength). With S the sum of these areas and D the sum weighted by
+        the farthest distance of each cell from the computed centroid c, the
+        exact centroid lies within D / (area - S) of c.
+        
+        Returns:
+            tuple: (centroids, error_bounds), two arrays of N values
+        """
+        output_range = self.output_configs[output_type]['range']
+        x, grid = self._adaptive_grid(output_type, level)
+        
+        aggregated = np.zeros((strengths.shape[0], x.size))
+        for column, membership_values in enumerate(grid):
+            np.maximum(aggregated, np.minimum(membership_values, strengths[:, column, np.newaxis]),
+                       out=aggregated)
+        area, moment = self._polyline_integrals(x, aggregated)
+        
+        empty = area <= 0
+        safe_area = np.where(empty, 1.0, area)
+        centroids = np.where(empty, (output_range[0] + output_range[1]) / 2, moment / safe_area)
+        
+        # Clip kinks: where each edge reaches each clipping level, N x edges x labels.
+        # Edge e of set j meets the plateau of set i only if j is cut no lower
+        # than i and set i reaches that level there
+        edge_sets, feet, rises, slopes, cut_starts, cut_ends = self._kink_tables(output_type)
+        levels = strengths[:, np.newaxis, :]
+        kinks = feet + levels * rises
+        possible = ((strengths[:, edge_sets, np.newaxis] >= levels) & (levels > 0) & (levels < 1)
+                    & (kinks >= cut_starts[0] + levels * cut_starts[1])
+                    & (kinks <= cut_ends[0] - levels * cut_ends[1]))
+        
+        cells = np.clip(np.searchsorted(x, kinks, side='right') - 1, 0, x.size - 2)
+        left, right = x[cells], x[cells + 1]
+        height = strengths.max(axis=1)[:, np.newaxis, np.newaxis]
+        tents = np.where(possible & (kinks > left),
+                         np.minimum(slopes * (kinks - left) * (right - kinks) / 2, (right - left) * height), 0.0)
+        middle = centroids[:, np.newaxis, np.newaxis]
+        spread = np.maximum(np.abs(left - middle), np.abs(right - middle))
+        
+        missing_area = tents.sum(axis=(1, 2))
+        covered = area > missing_area
+        bounds = np.where(covered, (tents * spread).sum(axis=(1, 2)) / np.where(covered, area - missing_area, 1.0),
+                          np.inf)
+        bounds[empty] = 0.0
+        return centroids, bounds
+    
+    def _adaptive_centroid(self, strengths, output_type, tolerance, chunk_size):
+        # Bounds shrink about 4x per level and scale with the range width, so
+        # rows start at the level where range / 4**level reaches the tolerance.
+        # Rows whose bound misses the tolerance are refined again, at the lowest
+        # level their bounds predict, until they meet it or reach ADAPTIVE_MAX_LEVEL.
+        if tolerance < 0:
+            raise ValueError(f"Invalid tolerance: {tolerance}")
+        output_range = self.output_configs[output_type]['range']
+        level = ADAPTIVE_MAX_LEVEL
+        if tolerance > 0:
+            level = min(max(math.ceil(math.log((output_range[1] - output_range[0]) / tolerance, 4)), 1), level)
+        
+        strengths = np.clip(strengths, 0.0, 1.0)
+        centroids = np.empty(strengths.shape[0])
+        bounds = np.empty(strengths.shape[0])
+        pending = np.arange(strengths.shape[0])
+        while True:
+            # Bound the work buffers by chunk_size rows of the default grid
+            step = max(1, chunk_size * self.resolution // self._adaptive_grid(output_type, level)[0].size)
+            for start in range(0, pending.size, step):
+                rows = pending[start:start + step]
+                centroids[rows], bounds[rows] = self._adaptive_level(strengths[rows], output_type, level)
+            
+            pending = pending[bounds[pending] > tolerance]
+            if not pending.size or level == ADAPTIVE_MAX_LEVEL:
+                return centroids, bounds
+            predicted = level + np.ceil(np.log(bounds[pending] / tolerance) / np.log(4.0))
+            level = int(min(max(predicted.min(), level + 1), ADAPTIVE_MAX_LEVEL))
+    
+    @instrumented('defuzzification.adaptive_centroid_defuzzification')
+    def adaptive_centroid_defuzzification(self, fuzzy_output, output_type='credit', tolerance=1e-3):
+        """
+        Converts the fuzzy output to a crisp value using the centroid method,
+        sampling the output range only as finely as a target error requires.
+        
+        The grid holds every set breakpoint and is refined between them until
+        the reported bound on the distance from the exact centroid is within
+        `tolerance`, so the 0-10 ranges need far fewer points than the 0-1000
+        credit range for the same absolute error.
+        
+        Args:
+            fuzzy_output (FuzzyVector or dict): {'Very_low': 0.2, 'Low': 0.5, ...}
+            output_type (str): 'credit', 'house', or 'application'
+            tolerance (float): Target absolute error, in score units
+        
+        Returns:
+            tuple: (crisp_output, error_bound); the bound exceeds the tolerance only if
+                   the finest grid (ADAPTIVE_MAX_LEVEL) could not meet it
+        """
+        if output_type not in self.output_configs:
+            raise ValueError(f"Invalid output_type: {output_type}")
+        strengths = self._strength_vector(fuzzy_output, output_type)[np.newaxis, :]
+        centroids, bounds = self._adaptive_centroid(strengths, output_type, tolerance, chunk_size=1)
+        return float(centroids[0]), float(bounds[0])
+    
+    @instrumented('defuzzification.adaptive_centroid_defuzzification_batch',
+                  batch_size=lambda self, fuzzy_outputs, *args, **kwargs: batch_rows(fuzzy_outputs, 1))
+    def adaptive_centroid_defuzzification_batch(self, fuzzy_outputs, output_type='credit', tolerance=1e-3,
+                                                chunk_size=256):
+        """
+        Vectorized version of `adaptive_centroid_defuzzification`; each row is
+        refined only as far as its own bound requires.
+        
+        Args:
+            fuzzy_outputs (FuzzyVector or dict): As in `centroid_defuzzification_batch`
+            output_type (str): 'credit', 'house', or 'application'
+            tolerance (float): Target absolute error, in score units
+            chunk_size (int): Rows defuzzified at a time on a grid of `resolution` points
+                              (fewer on finer grids), bounding the size of the work buffers
+        
+        Returns:
+            tuple: (crisp_outputs, error_bounds), two arrays of N values
+        """
+        if output_type not in self.output_configs:
+            raise ValueError(f"Invalid output_type: {output_type}")
+        strengths = self._strength_matrix(fuzzy_outputs, output_type)
+        return self._adaptive_centroid(strengths, output_type, tolerance, chunk_size)
+    
+    def _bisector(self, strengths, output_type):
+        # The point splitting the area of the aggregated polyline in half: find
+        # the segment where the cumulative area passes half the total, then
+        # solve the area of its linear piece, y0 t + slope t^2 / 2, for t
+        output_range = self.output_configs[output_type]['range']
+        points, aggregated = self._aggregated_polyline(strengths, output_type)
+        
+        x0 = points[:, :-1]
+        y0, y1 = aggregated[:, :-1], aggregated[:, 1:]
+        width = points[:, 1:] - x0
+        areas = width * (y0 + y1) / 2
+        cumulative = np.cumsum(areas, axis=1)
+        half = cumulative[:, -1] / 2
+        
+        rows = np.arange(points.shape[0])
+        segment = np.argmax(cumulative >= half[:, np.newaxis], axis=1)
+        remaining = half - (cumulative[rows, segment] - areas[rows, segment])
+        height = y0[rows, segment]
+        segment_width = width[rows, segment]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = np.where(segment_width > 0, (y1[rows, segment] - height) / segment_width, 0.0)
+            # Stable root of slope/2 t^2 + height t - remaining = 0
+            offset = 2 * remaining / (height + np.sqrt(np.maximum(height ** 2 + 2 * slope * remaining, 0.0)))
+        crisp_outputs = x0[rows, segment] + np.nan_to_num(offset)
+        
+        empty = half <= 0
+        crisp_outputs[empty] = (output_range[0] + output_range[1]) / 2
+        return crisp_outputs
+    
+    def _set_centers(self, output_type):
+        # (centroids, peaks) of the output sets: the centroid of each trapezoid
+        # and the middle of its core
+        if output_type not in self._center_cache:
+            a, b, c, d = self._exact_tables(output_type)[0].T
+            centroids = ((c * c + c * d + d * d) - (a * a + a * b + b * b)) / (3 * ((c + d) - (a + b)))
+            self._center_cache[output_type] = (centroids, (b + c) / 2)
+        return self._center_cache[output_type]
+    
+    def _weighted_centers(self, strengths, output_type, centers):
+        output_range = self.output_configs[output_type]['range']
+        weights = np.clip(strengths, 0.0, 1.0)
+        total = weights.sum(axis=1)
+        empty = total <= 0
+        total[empty] = 1.0
+        crisp_outputs = weights @ centers / total
+        crisp_outputs[empty] = (output_range[0] + output_range[1]) / 2
+        return crisp_outputs
+    
+    def _maxima(self, strengths, output_type, method):
+        # The aggregated set is highest (at the largest clipping level h) on the
+        # union of the intervals [a + h (b - a), d - h (d - c)] of the sets cut
+        # at h. Intervals are swept in order of their start to merge overlaps.
+        output_range = self.output_configs[output_type]['range']
+        vertices = self._exact_tables(output_type)[0]
+        levels = np.clip(strengths, 0.0, 1.0)
+        height = levels.max(axis=1, initial=0.0)
+        
+        active = (levels == height[:, np.newaxis]) & (height[:, np.newaxis] > 0)
+        starts = np.clip(vertices[:, 0] + height[:, np.newaxis] * (vertices[:, 1] - vertices[:, 0]), *output_range)
+        ends = np.clip(vertices[:, 3] - height[:, np.newaxis] * (vertices[:, 3] - vertices[:, 2]), *output_range)
+        starts = np.where(active, starts, np.inf)
+        ends = np.where(active, ends, -np.inf)
+        
+        empty = ~active.any(axis=1)
+        midpoint = (output_range[0] + output_range[1]) / 2
+        if method == 'smallest_of_maxima':
+            return np.where(empty, midpoint, starts.min(axis=1))
+        if method == 'largest_of_maxima':
+            return np.where(empty, midpoint, ends.max(axis=1))
+        
+        order = np.argsort(starts, axis=1)
+        starts = np.take_along_axis(starts, order, axis=1)
+        ends = np.take_along_axis(ends, order, axis=1)
+        active = np.take_along_axis(active, order, axis=1)
+        
+        covered_to = np.full(height.shape, -np.inf)
+        length = np.zeros(height.shape)
+        moment = np.zeros(height.shape)
+        with np.errstate(invalid='ignore'):  # inactive intervals run from +inf to -inf
+            for column in range(starts.shape[1]):
+                start = np.maximum(starts[:, column], covered_to)
+                end = ends[:, column]
+                piece = np.where(active[:, column] & (end > start), end - start, 0.0)
+                length += piece
+                moment += piece * np.where(piece > 0, start + end, 0.0) / 2
+                covered_to = np.where(active[:, column], np.maximum(covered_to, end), covered_to)
+        
+        # Only single points (triangle peaks cut at 1): average the points instead
+        point_mean = np.where(active, starts, 0.0).sum(axis=1) / np.maximum(active.sum(axis=1), 1)
+        crisp_outputs = np.where(length > 0, moment / np.where(length > 0, length, 1.0), point_mean)
+        return np.where(empty, midpoint, crisp_outputs)
+    
+    def _defuzzify_strengths(self, strengths, output_type, method):
+        # N x labels strengths -> N crisp values with any method but the sampled centroid
+        if method == 'centroid_exact':
+            return self._exact_centroid(FuzzyVector(self._labels[output_type], strengths), output_type)
+        if method == 'bisector':
+            return self._bisector(strengths, output_type)
+        if method == 'weighted_average':
+            return self._weighted_centers(strengths, output_type, self._set_centers(output_type)[0])
+        if method == 'height':
+            return self._weighted_centers(strengths, output_type, self._set_centers(output_type)[1])
+        if method in ('mean_of_maxima', 'smallest_of_maxima', 'largest_of_maxima'):
+            return self._maxima(strengths, output_type, method)
+        raise ValueError(f"Invalid method: {method}")
+    
+    def defuzzify(self, fuzzy_output, output_type='credit', method=None):
+        """
+        Converts a fuzzy output to a crisp value with any of DEFUZZIFICATION_METHODS.
+        
+        Args:
+            fuzzy_output (FuzzyVector or dict): {'Very_low': 0.2, 'Low': 0.5, ...}
+            output_type (str): 'credit', 'house', or 'application'
+            method (str): A key of DEFUZZIFICATION_METHODS (default: self.methods[output_type])
+        
+        Returns:
+            float: Crisp output value
+        """
+        if output_type not in self.output_configs:
+            raise ValueError(f"Invalid output_type: {output_type}")
+        method = method or self.methods[output_type]
+        if method == 'centroid':
+            return float(self.centroid_defuzzification(fuzzy_output, output_type))
+        strengths = self._strength_matrix(fuzzy_output if isinstance(fuzzy_output, FuzzyVector)
+                                          else {category: [strength] for category, strength in fuzzy_output.items()},
+                                          output_type, empty_size=1)
+        return float(self._defuzzify_strengths(strengths, output_type, method)[0])
+    
+    @instrumented('defuzzification.defuzzify_batch',
+                  batch_size=lambda self, fuzzy_outputs, *args, **kwargs: batch_rows(fuzzy_outputs, 1))
+    def defuzzify_batch(self, fuzzy_outputs, output_type='credit', method=None, chunk_size=256):
+        """
+        Vectorized version of `defuzzify` for a batch of fuzzy outputs.
+        
+        Args:
+            fuzzy_outputs (FuzzyVector or dict): As in `centroid_defuzzification_batch`
+            output_type (str): 'credit', 'house', or 'application'
+            method (str): A key of DEFUZZIFICATION_METHODS (default: self.methods[output_type])
+            chunk_size (int): Rows defuzzified at a time, bounding the size of the work buffers
+        
+        Returns:
+            numpy.ndarray: N crisp output values
+        """
+        if output_type not in self.output_configs:
+            raise ValueError(f"Invalid output_type: {output_type}")
+        method = method or self.methods[output_type]
+        if method == 'centroid':
+            return self.centroid_defuzzification_batch(fuzzy_outputs, output_type, chunk_size)
+        if method == 'centroid_exact':
+            return self.centroid_defuzzification_batch(fuzzy_outputs, output_type, chunk_size, method='exact')
+        if method not in DEFUZZIFICATION_METHODS:
+            raise ValueError(f"Invalid method: {method}")
+        
+        strengths = self._strength_matrix(fuzzy_outputs, output_type)
+        if method != 'bisector':
+            # The grid-free methods only hold N x labels temporaries
+            return self._defuzzify_strengths(strengths, output_type, method)
+        crisp_outputs = np.empty(strengths.shape[0])
+        for start in range(0, strengths.shape[0], chunk_size):
+            crisp_outputs[start:start + chunk_size] = self._defuzzify_strengths(
+                strengths[start:start + chunk_size], output_type, method)
+        return crisp_outputs
+    
+    def clipped_sets(self, fuzzy_output, output_type='credit'):
+        """
+        The clipped output sets and their aggregation on the sampled universe,
+        as drawn by the visualizations.
+        
+        Args:
+            fuzzy_output (FuzzyVector or dict): {'Very_low': 0.2, 'Low': 0.5, ...}
+            output_type (str): 'credit', 'house', or 'application'
+        
+        Returns:
+            tuple: (x, clipped, aggregated); clipped is labels x resolution, rows in
+                   the order of config['sets']
+        """
+        if output_type not in self.output_configs:
+            raise ValueError(f"Invalid output_type: {output_type}")
+        x, grid = self.grid(output_type)
+        clipped = np.minimum(grid, self._strength_vector(fuzzy_output, output_type)[:, np.newaxis])
+        return x, clipped, clipped.max(axis=0)
+    
     def visualize_defuzzification(self, fuzzy_output, output_type='credit', ax=None):
         """
         Visualizes the defuzzification process.
@@ -98,9 +750,8 @@ class Defuzzifier:
         
         config = self.output_configs[output_type]
         output_range = config['range']
-        membership_functions = config['functions']
-        
-        x = np.linspace(output_range[0], output_range[1], 1000)
+        x, grid = self.grid(output_type)
+        rows = dict(zip(config['sets'], grid))
         
         if ax is None:
             plt.figure(figsize=(14, 8))
@@ -116,8 +767,7 @@ class Defuzzifier:
         }
         
         # 1. Plot original membership functions
-        for category, func in membership_functions.items():
-            membership_vals = [func(xi) for xi in x]
+        for category, membership_vals in rows.items():
             color = colors.get(category, 'gray')
             ax.plot(x, membership_vals, '--', color=color, 
                     alpha=0.3, label=f'{category} (original)')
@@ -126,9 +776,8 @@ class Defuzzifier:
         aggregated = np.zeros(len(x))
         
         for category, strength in fuzzy_output.items():
-            if strength > 0 and category in membership_functions:
-                membership_vals = np.array([membership_functions[category](xi) for xi in x])
-                clipped = np.minimum(membership_vals, strength)
+            if strength > 0 and category in rows:
+                clipped = np.minimum(rows[category], strength)
                 color = colors.get(category, 'gray')
                 ax.fill_between(x, clipped, alpha=0.4, color=color,
                                label=f'{category} = {strength:.2f}')
@@ -0,0 +1,209 @@
+"""
+Declarative hierarchical fuzzy inference systems.
+
+A `FISGraph` is built from three kinds of nodes:
+
+- inputs: crisp linguistic variables, fuzzified with a table of membership
+  functions ({label: (shape, vertices)}, as in fuzzification.py);
+- rule blocks: an `inference.RuleBase` whose variables read inputs or the
+  outputs of other rule blocks;
+- outputs: the crisp value of a rule block, defuzzified by a `Defuzzifier`
+  output type.
+
+`FISGraph.evaluate` runs a batch through the graph in topological order.
+Given workers, stages whose dependencies are ready run concurrently on a
+thread pool (NumPy releases the GIL in the large array operations of the
+rule and defuzzification stages), so independent stages such as house and
+application overlap on big batches. Every stage sees the same arrays in
+either mode, so results do not depend on the worker count.
+
+`credit_graph` expresses the credit system of scoring.py as one such graph;
+its scores are identical to `score_batch`.
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from graphlib import TopologicalSorter
+
+import numpy as np
+
+import fuzzification
+from defuzzification import DEFUZZIFICATION_METHODS, Defuzzifier
+from inference import APPLICATION_RULE_BASE, HOUSE_RULE_BASE, LOAN_RULE_BASE
+from instrumentation import instrumented
+
+
+class FISGraph:
+    """
+    A graph of fuzzified inputs, rule blocks and defuzzified outputs.
+
+    Nodes are kept in `nodes` as name -> (kind, dependencies, spec), kind being
+    'input', 'rules' or 'output'. Inputs and rule blocks produce N x labels
+    degree matrices; outputs produce N crisp values.
+    """
+
+    def __init__(self, defuzzifier=None):
+        """
+        Args:
+            defuzzifier (Defuzzifier): Instance whose output types the outputs use;
+                                       pass one built with `output_configs` for
+                                       outputs other than credit, house and application
+        """
+        self.defuzzifier = defuzzifier if defuzzifier is not None else Defuzzifier()
+        self.nodes = {}
+
+    def _labels(self, name):
+        kind, _, spec = self.nodes[name]
+        if kind == 'input':
+            return tuple(spec)
+        if kind == 'rules':
+            return spec[0].outputs
+        raise ValueError(f"Node {name} is an output and cannot feed a rule block")
+
+    def _add(self, name, node):
+        if name in self.nodes:
+            raise ValueError(f"Duplicate node: {name}")
+        self.nodes[name] = node
+
+    def add_input(self, name, sets):
+        """
+        Add a crisp input.
+
+        Args:
+            name (str): Node name, also the key of its crisp values in `evaluate`
+            sets (dict): {label: (shape, vertices)}, e.g. fuzzification.MARKET_VALUE_SETS
+        """
+        self._add(name, ('input', (), dict(sets)))
+        return self
+
+    def add_rule_block(self, name, rule_base, inputs):
+        """
+        Add a rule block.
+
+        Args:
+            name (str): Node name
+            rule_base (RuleBase): Compiled rules of the block
+            inputs (dict): {rule base variable: node name}; each node's labels must be
+                           the variable's labels, in the same order
+        """
+        if set(inputs) != set(rule_base.inputs):
+            raise ValueError(f"Rule block {name} needs inputs {sorted(rule_base.inputs)}")
+        for variable, source in inputs.items():
+            if source not in self.nodes:
+                raise ValueError(f"Unknown node: {source}")
+            if self._labels(source) != rule_base.inputs[variable]:
+                raise ValueError(f"Labels of {source} do not match variable {variable} of {name}")
+        self._add(name, ('rules', tuple(inputs.values()), (rule_base, tuple(inputs))))
+        return self
+
+    def add_output(self, name, block, output_type=None, method=None):
+        """
+        Add a defuzzified output.
+
+        Args:
+            name (str): Node name, the key of its scores in `evaluate`
+            block (str): Rule block defuzzified
+            output_type (str): Defuzzifier output type (default: name)
+            method (str): Optional key of DEFUZZIFICATION_METHODS; by default the centroid
+                          selected by the `method` of `evaluate`
+        """
+        output_type = output_type or name
+        if block not in self.nodes or self.nodes[block][0] != 'rules':
+            raise ValueError(f"Unknown rule block: {block}")
+        if output_type not in self.defuzzifier.output_configs:
+            raise ValueError(f"Invalid output_type: {output_type}")
+        if method is not None and method not in DEFUZZIFICATION_METHODS:
+            raise ValueError(f"Invalid method: {method}")
+        self._add(name, ('output', (block,), (output_type, method)))
+        return self
+
+    def order(self):
+        """Node names in a topological order (the order of serial evaluation)."""
+        return list(TopologicalSorter({name: node[1] for name, node in self.nodes.items()}).static_order())
+
+    def _run(self, name, values, crisp_inputs, method, chunk_size):
+        # Compute one node from the values of its dependencies
+        kind, dependencies, spec = self.nodes[name]
+        if kind == 'input':
+            return fuzzification.fuzzify_array(crisp_inputs[name], spec)
+        if kind == 'rules':
+            rule_base, variables = spec
+            return rule_base.evaluate({variable: values[source] for variable, source in zip(variables, dependencies)})
+
+        output_type, output_method = spec
+        block = dependencies[0]
+        fuzzy_outputs = dict(zip(self._labels(block), values[block].T))
+        if output_method:
+            return self.defuzzifier.defuzzify_batch(fuzzy_outputs, output_type, output_method, chunk_size)
+        return self.defuzzifier.centroid_defuzzification_batch(fuzzy_outputs, output_type, chunk_size, method)
+
+    @instrumented('fis_graph.FISGraph.evaluate',
+                  batch_size=lambda self, inputs, *args, **kwargs: np.size(next(iter(inputs.values()), ())))
+    def evaluate(self, inputs, workers=None, min_parallel_size=16384, method='sampled', chunk_size=256,
+                 return_degrees=False):
+        """
+        Evaluate a batch.
+
+        Args:
+            inputs (dict): {input node: array_like of N crisp values}
+            workers (int): Threads running independent stages concurrently; None or 1
+                           evaluates serially
+            min_parallel_size (int): Batches smaller than this are evaluated serially,
+                                     where thread handoffs would cost more than they save
+            method (str): Centroid method of outputs without their own, 'sampled' or 'exact'
+            chunk_size (int): Rows defuzzified at a time
+            return_degrees (bool): Also return the degree matrices of inputs and rule blocks
+
+        Returns:
+            dict: {output node: N crisp values}. With return_degrees=True, a tuple
+                  (scores, {input or rule block: N x labels matrix})
+        """
+        missing = [name for name, node in self.nodes.items() if node[0] == 'input' and name not in inputs]
+        if missing:
+            raise ValueError(f"Missing inputs: {', '.join(missing)}")
+        crisp_inputs = {name: np.ravel(np.asarray(inputs[name], dtype=float))
+                        for name, node in self.nodes.items() if node[0] == 'input'}
+        n = next(iter(crisp_inputs.values())).size if crisp_inputs else 0
+
+        values = {}
+        if not workers or workers == 1 or n < min_parallel_size:
+            for name in self.order():
+                values[name] = self._run(name, values, crisp_inputs, method, chunk_size)
+        else:
+            # Submit every stage whose dependencies are done; values is only
+            # written here, and a stage only reads values that are complete
+            sorter = TopologicalSorter({name: node[1] for name, node in self.nodes.items()})
+            sorter.prepare()
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fis_graph') as executor:
+                running = {}
+                while sorter.is_active():
+                    for name in sorter.get_ready():
+                        running[executor.submit(self._run, name, values, crisp_inputs, method, chunk_size)] = name
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        values[name] = future.result()
+                        sorter.done(name)
+
+        scores = {name: values[name] for name, node in self.nodes.items() if node[0] == 'output'}
+        if not return_degrees:
+            return scores
+        return scores, {name: value for name, value in values.items() if self.nodes[name][0] != 'output'}
+
+
+def credit_graph(defuzzifier=None):
+    """
+    The credit system of `scoring.score_batch` as a FISGraph: five inputs
+    keyed like fuzzification.INPUT_CONFIGS, the house and application blocks
+    feeding the loan block, and 'house', 'application' and 'credit' outputs.
+    """
+    graph = FISGraph(defuzzifier)
+    for name, config in fuzzification.INPUT_CONFIGS.items():
+        graph.add_input(name, config['sets'])
+    graph.add_rule_block('house_rules', HOUSE_RULE_BASE, {'market': 'market_house', 'location': 'location_house'})
+    graph.add_rule_block('application_rules', APPLICATION_RULE_BASE,
+                         {'assets': 'application_assets', 'salary': 'application_salary'})
+    graph.add_rule_block('credit_rules', LOAN_RULE_BASE,
+                         {'salary': 'application_salary', 'interest': 'interest_rate',
+                          'application': 'application_rules', 'house': 'house_rules'})
+    for output_type in ('house', 'application', 'credit'):
+        graph.add_output(output_type, f'{output_type}_rules')
+    return graph
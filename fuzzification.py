@@ -1,9 +1,152 @@
-import matplotlib.pyplot as plt
+from bisect import bisect_left
+
 import numpy as np
-from membership_function import trapezoidal_membership, triangle_membership
-from plotting_mf import FuzzificationPlotter
+
+from fuzzy_vector import FuzzyVector
+from instrumentation import instrumented
+from membership_function import (MEMBERSHIP_FUNCTIONS, evaluate_membership, evaluate_membership_array,
+                                 trapezoidal_membership, triangle_membership)
+
+
+# Membership functions of the crisp inputs, described as (shape, vertices).
+# The label order of each dict is the column order used by the batch functions.
+MARKET_VALUE_SETS = {
+    'Low': ('trapezoid', (0, 0, 70000, 100000)),
+    'Medium': ('trapezoid', (50000, 100000, 200000, 250000)),
+    'High': ('trapezoid', (200000, 300000, 650000, 850000)),
+    'Very High': ('trapezoid', (650000, 850000, 1000000, 1000000))
+}
+
+LOCATION_SETS = {
+    'Bad': ('trapezoid', (0, 0, 1.5, 4)),
+    'Fair': ('trapezoid', (2.5, 5, 6, 8.5)),
+    'Excellent': ('trapezoid', (6, 8.5, 10, 10))
+}
+
+ASSETS_SETS = {
+    'Low': ('triangle', (0, 0, 150000)),
+    'Medium': ('trapezoid', (50000, 250000, 450000, 650000)),
+    'High': ('trapezoid', (500000, 700000, 1000000, 1000000))
+}
+
+SALARY_SETS = {
+    'Low': ('trapezoid', (0, 0, 10000, 25000)),
+    'Medium': ('triangle', (15000, 35000, 55000)),
+    'High': ('triangle', (40000, 60000, 80000)),
+    'Very High': ('trapezoid', (60000, 80000, 100000, 100000))
+}
+
+INTEREST_RATE_SETS = {
+    'Low': ('trapezoid', (0, 0, 2, 5)),
+    'Medium': ('trapezoid', (2, 4, 6, 8)),
+    'High': ('trapezoid', (6, 8.5, 10, 10))
+}
+
+# Universe of discourse and membership functions of each crisp input,
+# keyed by the input names used in main.py.
+INPUT_CONFIGS = {
+    'market_house': {'range': (0, 1000000), 'sets': MARKET_VALUE_SETS},
+    'location_house': {'range': (0, 10), 'sets': LOCATION_SETS},
+    'application_assets': {'range': (0, 1000000), 'sets': ASSETS_SETS},
+    'application_salary': {'range': (0, 100000), 'sets': SALARY_SETS},
+    'interest_rate': {'range': (0, 10), 'sets': INTEREST_RATE_SETS}
+}
+
+
+class BreakpointIndex:
+    """
+    The sorted vertices of a linguistic variable's membership functions, used
+    to find the labels active at a crisp value by binary search.
+
+    Between two consecutive vertices every membership function is linear, so
+    the set of labels with a non-zero degree is fixed per interval (at most
+    two adjacent labels for the inputs of INPUT_CONFIGS). `active` evaluates
+    only those, with the same membership functions as `fuzzify`, so the
+    degrees are identical.
+    """
+
+    def __init__(self, sets):
+        """
+        Parameters:
+        sets (dict): {label: (shape, vertices)}, e.g. MARKET_VALUE_SETS.
+        """
+        self.labels = tuple(sets)
+        self.breakpoints = sorted({vertex for _, params in sets.values() for vertex in params})
+        functions = [(column, MEMBERSHIP_FUNCTIONS[shape], params)
+                     for column, (shape, params) in enumerate(sets.values())]
+
+        # Degrees at each breakpoint, and the functions non-zero on each open
+        # interval: below the first breakpoint, between each pair, above the last
+        self._at_breakpoints = [
+            tuple((column, degree) for column, function, params in functions
+                  if (degree := function(breakpoint, *params)) > 0)
+            for breakpoint in self.breakpoints
+        ]
+        probes = ([self.breakpoints[0] - 1]
+                  + [(left + right) / 2 for left, right in zip(self.breakpoints, self.breakpoints[1:])]
+                  + [self.breakpoints[-1] + 1])
+        self._intervals = [
+            tuple((column, function, params) for column, function, params in functions
+                  if function(probe, *params) > 0)
+            for probe in probes
+        ]
+
+    def active(self, value):
+        """
+        Fuzzify a crisp value, returning only its non-zero degrees.
+
+        Parameters:
+        value (float): The crisp input value.
+
+        Returns:
+        tuple: (column, degree) pairs, columns in the label order of the sets.
+        """
+        position = bisect_left(self.breakpoints, value)
+        if position < len(self.breakpoints) and self.breakpoints[position] == value:
+            return self._at_breakpoints[position]
+        return tuple((column, function(value, *params)) for column, function, params in self._intervals[position])
 
 
+# Breakpoint index of each crisp input, keyed like INPUT_CONFIGS
+BREAKPOINT_INDEXES = {name: BreakpointIndex(config['sets']) for name, config in INPUT_CONFIGS.items()}
+
+
+def fuzzify(value, sets):
+    """
+    Fuzzify a crisp value against a table of membership functions.
+
+    Parameters:
+    value (float): The crisp input value.
+    sets (dict): {label: (shape, vertices)}, e.g. MARKET_VALUE_SETS.
+
+    Returns:
+    FuzzyVector: Membership values for each label, in the label order of `sets`.
+    """
+    return FuzzyVector(tuple(sets), np.array([evaluate_membership(value, shape, params)
+                                             for shape, params in sets.values()]))
+
+
+@instrumented('fuzzification.fuzzify_array', batch_size=lambda values, sets: np.size(values))
+def fuzzify_array(values, sets):
+    """
+    Fuzzify an array of crisp values against a table of membership functions.
+
+    Parameters:
+    values (array_like): 1-D array of N crisp input values.
+    sets (dict): {label: (shape, vertices)}, e.g. MARKET_VALUE_SETS.
+
+    Returns:
+    numpy.ndarray: N x labels matrix of membership values, with columns
+                   in the label order of `sets`.
+    """
+    values = np.asarray(values, dtype=float)
+    degrees = np.empty((values.shape[0], len(sets)))
+    for column, (shape, params) in enumerate(sets.values()):
+        degrees[:, column] = evaluate_membership_array(values, shape, params)
+    return degrees
+
+
+@instrumented('fuzzification.market_value_house_fuzzification')
 def market_value_house_fuzzification(value):
     """
     Fuzzify the market value of a house into linguistic categories:
@@ -13,17 +156,12 @@ def market_value_house_fuzzification(value):
     value (float): The market value of the house.
 
     Returns:
-    dict: A dictionary with membership values for each category.
+    FuzzyVector: Membership values for each category (reads like a dict).
     """
-    memberships = {
-        'Low': trapezoidal_membership(value, 0, 0, 70000,100000),
-        'Medium': trapezoidal_membership(value, 50000, 100000, 200000, 250000),
-        'High': trapezoidal_membership(value, 200000, 300000, 650000, 850000),
-        'Very High': trapezoidal_membership(value, 650000, 850000, 1000000, 1000000)
-    }
-    return memberships
+    return fuzzify(value, MARKET_VALUE_SETS)
 
 
+@instrumented('fuzzification.location_of_house_fuzzification')
 def location_of_house_fuzzification(location):
     """
     Fuzzify the location of a house into linguistic categories:
@@ -33,16 +171,12 @@ def location_of_house_fuzzification(location):
     location (float): The location score of the house.
 
     Returns:
-    dict: A dictionary with membership values for each category.
+    FuzzyVector: Membership values for each category (reads like a dict).
     """
-    memberships = {
-        'Bad': trapezoidal_membership(location, 0, 0, 1.5, 4),
-        'Fair': trapezoidal_membership(location, 2.5, 5, 6, 8.5),
-        'Excellent': trapezoidal_membership(location, 6, 8.5, 10, 10)
-    }
-    return memberships
+    return fuzzify(location, LOCATION_SETS)
 
 
+@instrumented('fuzzification.application_assets_fuzzification')
 def application_assets_fuzzification(assets):
     """
     Fuzzify the application assets into linguistic categories:
@@ -52,15 +186,11 @@ def application_assets_fuzzification(assets):
     assets (float): The total assets of the applicant.
 
     Returns:
-    dict: A dictionary with membership values for each category.
+    FuzzyVector: Membership values for each category (reads like a dict).
     """
-    memberships = {
-        'Low': triangle_membership(assets, 0, 0, 150000),
-        'Medium': trapezoidal_membership(assets, 50000, 250000, 450000, 650000),
-        'High': trapezoidal_membership(assets, 500000, 700000, 1000000, 1000000)
-    }
-    return memberships
+    return fuzzify(assets, ASSETS_SETS)
 
+@instrumented('fuzzification.application_salary_fuzzification')
 def application_salary_fuzzification(income):
     """
     Fuzzify the application salary into linguistic categories:
@@ -70,16 +200,11 @@ def application_salary_fuzzification(income):
     income (float): The salary of the applicant.
 
     Returns:
-    dict: A dictionary with membership values for each category.
+    FuzzyVector: Membership values for each category (reads like a dict).
     """
-    memberships = {
-        'Low': trapezoidal_membership(income, 0, 0, 10000, 25000),
-        'Medium': triangle_membership(income, 15000, 35000, 55000),
-        'High': triangle_membership(income, 40000, 60000, 80000),
-        'Very High': trapezoidal_membership(income, 60000, 80000, 100000, 100000)
-    }
-    return memberships
+    return fuzzify(income, SALARY_SETS)
 
+@instrumented('fuzzification.interest_rate_fuzzification')
 def interest_rate_fuzzification(rate):
     """
     Fuzzify the interest rate into linguistic categories:
@@ -89,14 +214,9 @@ def interest_rate_fuzzification(rate):
     rate (float): The interest rate.
 
     Returns:
-    dict: A dictionary with membership values for each category.
+    FuzzyVector: Membership values for each category (reads like a dict).
     """
-    memberships = {
-        'Low': trapezoidal_membership(rate, 0, 0, 2, 5),
-        'Medium': trapezoidal_membership(rate, 2, 4, 6, 8),
-        'High': trapezoidal_membership(rate, 6, 8.5, 10, 10)
-    }
-    return memberships
+    return fuzzify(rate, INTEREST_RATE_SETS)
 
 def house_fuzzification(house):
     """
@@ -107,16 +227,16 @@ def house_fuzzification(house):
     house (float): The value of the house.
 
     Returns:
-    dict: A dictionary with membership values for each category.
+    FuzzyVector: Membership values for each category (reads like a dict).
     """
-    memberships = {
-        'Very_low': triangle_membership(house, 0, 0, 3),
-        'Low': triangle_membership(house, 0, 3, 6),
-        'Medium': triangle_membership(house, 2, 5, 8),
-        'High': triangle_membership(house, 4, 7, 10),
-        'Very_high': triangle_membership(house, 7, 10, 10)
-    }
-    return memberships
+    memberships = [
+        triangle_membership(house, 0, 0, 3),     # Very_low
+        triangle_membership(house, 0, 3, 6),     # Low
+        triangle_membership(house, 2, 5, 8),     # Medium
+        triangle_membership(house, 4, 7, 10),    # High
+        triangle_membership(house, 7, 10, 10)    # Very_high
+    ]
+    return FuzzyVector(('Very_low', 'Low', 'Medium', 'High', 'Very_high'), np.array(memberships))
 
 def application_fuzzification(application):
     """
@@ -127,14 +247,14 @@ def application_fuzzification(application):
     application (float): The value of the application.
 
     Returns:
-    dict: A dictionary with membership values for each category.
-    """
-    memberships = {
-        'Low': trapezoidal_membership(application, 0, 0, 2, 4),
-        'Medium': triangle_membership(application, 2, 5, 8),
-        'High': trapezoidal_membership(application, 6, 8, 10, 10)
-    }
-    return memberships
+    FuzzyVector: Membership values for each category (reads like a dict).
+    """
+    memberships = [
+        trapezoidal_membership(application, 0, 0, 2, 4),   # Low
+        triangle_membership(application, 2, 5, 8),         # Medium
+        trapezoidal_membership(application, 6, 8, 10, 10)  # High
+    ]
+    return FuzzyVector(('Low', 'Medium', 'High'), np.array(memberships))
     
    
 
@@ -142,6 +262,8 @@ def application_fuzzification(application):
 
 # --- TESTING THE FUZZIFICATION FUNCTIONS ---
 if __name__ == "__main__":
+    # Plotting is only needed here; keep matplotlib out of the scoring imports
+    from plotting_mf import FuzzificationPlotter
     
     plotter = FuzzificationPlotter(figsize=(14, 7))
 
@@ -0,0 +1,150 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+
+def normalize_label(label):
+    """Canonical spelling of a label: 'Very_high', 'Very High' and 'very high' all become 'very high'."""
+    return ' '.join(label.replace('_', ' ').split()).lower()
+
+
+# Label -> column lookups, shared by every vector of a linguistic variable
+_label_indices = {}
+
+
+def _label_index(labels):
+    index = _label_indices.get(labels)
+    if index is None:
+        index = {normalize_label(label): column for column, label in enumerate(labels)}
+        index.update((label, column) for column, label in enumerate(labels))
+        _label_indices[labels] = index
+    return index
+
+
+def batch_rows(degrees, width):
+    """
+    Number of applicants in a batch of degrees, without building its matrix.
+
+    Args:
+        degrees: FuzzyVector, {label: array} dict (scalars count as one row), or
+                 array of `width` degrees per applicant
+        width (int): Labels per applicant of an array
+
+    Returns:
+        int: Rows of the N x labels matrix the degrees stand for
+    """
+    if isinstance(degrees, FuzzyVector):
+        return np.size(degrees.degrees) // max(len(degrees.labels), 1)
+    if isinstance(degrees, dict):
+        return max((np.size(column) for column in degrees.values()), default=0)
+    return np.size(degrees) // max(width, 1)
+
+
+class FuzzyVector:
+    """
+    The fuzzy degrees of one linguistic variable, stored as a float array in a
+    fixed label order.
+
+    Reads like the {label: degree} dicts it replaces (`v['High']`, `get`,
+    `items`, iteration over the labels), and accepts either spelling of the
+    labels ('Very_high' / 'Very High'). The degrees are an array of shape
+    (labels,) for one applicant, or (N, labels) for a batch, in which case a
+    label reads as a column of N degrees.
+    """
+
+    __slots__ = ('labels', 'degrees', '_index')
+
+    def __init__(self, labels, degrees):
+        """
+        Args:
+            labels (tuple): Labels in column order
+            degrees (array_like): Degrees, shape (labels,) or (N, labels)
+        """
+        self.labels = labels
+        self.degrees = degrees if type(degrees) is np.ndarray else np.asarray(degrees, dtype=float)
+        self._index = None  # looked up on first access by label
+
+    @classmethod
+    def from_mapping(cls, mapping, labels):
+        """
+        Build a vector from a {label: degree} mapping; missing labels get degree 0.
+
+        Args:
+            mapping (dict): Degrees by label, in either spelling
+            labels (tuple): Labels of the vector, in column order
+        """
+        if isinstance(mapping, FuzzyVector) and mapping.labels == labels:
+            return mapping
+        normalized = {normalize_label(label): degree for label, degree in mapping.items()}
+        degrees = [np.asarray(normalized.get(normalize_label(label), 0.0), dtype=float) for label in labels]
+        if any(degree.ndim for degree in degrees):
+            return cls(labels, np.column_stack(np.broadcast_arrays(*degrees)))
+        return cls(labels, np.array(degrees))
+
+    def _column(self, label):
+        if self._index is None:
+            self._index = _label_index(self.labels)
+        column = self._index.get(label)
+        if column is None:
+            column = self._index.get(normalize_label(label)) if isinstance(label, str) else None
+            if column is None:
+                raise KeyError(label)
+        return column
+
+    def __getitem__(self, label):
+        column = self._column(label)
+        if self.degrees.ndim == 1:
+            return float(self.degrees[column])
+        return self.degrees[:, column]
+
+    def get(self, label, default=None):
+        try:
+            return self[label]
+        except KeyError:
+            return default
+
+    def __contains__(self, label):
+        try:
+            self._column(label)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self.labels)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def keys(self):
+        return list(self.labels)
+
+    def values(self):
+        if self.degrees.ndim == 1:
+            return self.degrees.tolist()
+        return list(self.degrees.T)
+
+    def items(self):
+        return list(zip(self.labels, self.values()))
+
+    def to_dict(self):
+        return dict(zip(self.labels, self.values()))
+
+    def active(self):
+        """(column, degree) pairs of the non-zero degrees of one applicant, as `RuleBase.evaluate_active` takes them."""
+        return tuple((column, degree) for column, degree in enumerate(self.degrees.tolist()) if degree > 0)
+
+    def __eq__(self, other):
+        if isinstance(other, FuzzyVector):
+            return self.labels == other.labels and np.array_equal(self.degrees, other.degrees)
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"FuzzyVector({self.to_dict()!r})"
+
+
+Mapping.register(FuzzyVector)
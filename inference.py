@@ -1,278 +1,434 @@
-def evaluate_house_rule(market_fuzzy_values, location_fuzzy_values):
-    """
-    Takes fuzzified 'Market Value' and 'Location' inputs,
-    applies House Evaluation rules, and returns the fuzzy result for the 'House' output.
-    
-    Args:
-    market_fuzzy_values (dict): Fuzzy degrees for 'Market Value'.
-                               {'Low': float, 'Medium': float, 'High': float, 'Very High': float}
-    location_fuzzy_values (dict): Fuzzy degrees for 'Location'.
-                                  {'Bad': float, 'Fair': float, 'Excellent': float}
+from itertools import product
+from operator import itemgetter
 
-    Returns:
-    dict: Fuzzy degrees for the 'House' output.
-          {'Very_low': float, 'Low': float, 'Medium': float, 'High': float, 'Very_high': float}
-    """
-    
-    rule_strengths = {
-        'Very_low': [],
-        'Low': [],
-        'Medium': [],
-        'High': [],
-        'Very_high': []
-    }
-    
-    # --- Apply rules (AND = min, OR = max) ---
-    
+import numpy as np
+
+from fuzzy_vector import FuzzyVector, batch_rows
+from instrumentation import instrumented
+
+
+# --- Rule bases (AND = min, OR = max) ---
+# Each rule is (antecedents, connective, consequent): antecedents is a tuple of
+# (input variable, label) pairs, connective is 'AND' or 'OR' and consequent is
+# an output label. Single-antecedent rules use 'AND' (min of one value).
+
+MARKET_LABELS = ('Low', 'Medium', 'High', 'Very High')
+LOCATION_LABELS = ('Bad', 'Fair', 'Excellent')
+ASSETS_LABELS = ('Low', 'Medium', 'High')
+SALARY_LABELS = ('Low', 'Medium', 'High', 'Very High')
+INTEREST_LABELS = ('Low', 'Medium', 'High')
+HOUSE_LABELS = ('Very_low', 'Low', 'Medium', 'High', 'Very_high')
+APPLICATION_LABELS = ('Low', 'Medium', 'High')
+CREDIT_LABELS = ('Very_low', 'Low', 'Medium', 'High', 'Very_high')
+
+HOUSE_RULES = [
     # Rule 1: If (Market_value is Low) then (House is Low)
-    rule_1 = market_fuzzy_values['Low']
-    rule_strengths['Low'].append(rule_1)
-    
+    ((('market', 'Low'),), 'AND', 'Low'),
     # Rule 2: If (Location is Bad) then (House is Low)
-    rule_2 = location_fuzzy_values['Bad']
-    rule_strengths['Low'].append(rule_2)
-    
+    ((('location', 'Bad'),), 'AND', 'Low'),
     # Rule 3: If (Location is Bad) and (Market_value is Low) then (House is Very_low)
-    rule_3 = min(location_fuzzy_values['Bad'], market_fuzzy_values['Low'])
-    rule_strengths['Very_low'].append(rule_3)
-    
+    ((('location', 'Bad'), ('market', 'Low')), 'AND', 'Very_low'),
     # Rule 4: If (Location is Bad) and (Market_value is Medium) then (House is Low)
-    rule_4 = min(location_fuzzy_values['Bad'], market_fuzzy_values['Medium'])
-    rule_strengths['Low'].append(rule_4)
-    
+    ((('location', 'Bad'), ('market', 'Medium')), 'AND', 'Low'),
     # Rule 5: If (Location is Bad) and (Market_value is High) then (House is Medium)
-    rule_5 = min(location_fuzzy_values['Bad'], market_fuzzy_values['High'])
-    rule_strengths['Medium'].append(rule_5)
-    
+    ((('location', 'Bad'), ('market', 'High')), 'AND', 'Medium'),
     # Rule 6: If (Location is Bad) and (Market_value is Very_high) then (House is High)
-    rule_6 = min(location_fuzzy_values['Bad'], market_fuzzy_values['Very High'])
-    rule_strengths['High'].append(rule_6)
-    
+    ((('location', 'Bad'), ('market', 'Very High')), 'AND', 'High'),
     # Rule 7: If (Location is Fair) and (Market_value is Low) then (House is Low)
-    rule_7 = min(location_fuzzy_values['Fair'], market_fuzzy_values['Low'])
-    rule_strengths['Low'].append(rule_7)
-    
+    ((('location', 'Fair'), ('market', 'Low')), 'AND', 'Low'),
     # Rule 8: If (Location is Fair) and (Market_value is Medium) then (House is Medium)
-    rule_8 = min(location_fuzzy_values['Fair'], market_fuzzy_values['Medium'])
-    rule_strengths['Medium'].append(rule_8)
-    
+    ((('location', 'Fair'), ('market', 'Medium')), 'AND', 'Medium'),
     # Rule 9: If (Location is Fair) and (Market_value is High) then (House is High)
-    rule_9 = min(location_fuzzy_values['Fair'], market_fuzzy_values['High'])
-    rule_strengths['High'].append(rule_9)
-    
+    ((('location', 'Fair'), ('market', 'High')), 'AND', 'High'),
     # Rule 10: If (Location is Fair) and (Market_value is Very_high) then (House is Very_high)
-    rule_10 = min(location_fuzzy_values['Fair'], market_fuzzy_values['Very High'])
-    rule_strengths['Very_high'].append(rule_10)
-    
+    ((('location', 'Fair'), ('market', 'Very High')), 'AND', 'Very_high'),
     # Rule 11: If (Location is Excellent) and (Market_value is Low) then (House is Medium)
-    rule_11 = min(location_fuzzy_values['Excellent'], market_fuzzy_values['Low'])
-    rule_strengths['Medium'].append(rule_11)
-    
+    ((('location', 'Excellent'), ('market', 'Low')), 'AND', 'Medium'),
     # Rule 12: If (Location is Excellent) and (Market_value is Medium) then (House is High)
-    rule_12 = min(location_fuzzy_values['Excellent'], market_fuzzy_values['Medium'])
-    rule_strengths['High'].append(rule_12)
-    
+    ((('location', 'Excellent'), ('market', 'Medium')), 'AND', 'High'),
     # Rule 13: If (Location is Excellent) and (Market_value is High) then (House is Very_high)
-    rule_13 = min(location_fuzzy_values['Excellent'], market_fuzzy_values['High'])
-    rule_strengths['Very_high'].append(rule_13)
-    
+    ((('location', 'Excellent'), ('market', 'High')), 'AND', 'Very_high'),
     # Rule 14: If (Location is Excellent) and (Market_value is Very_high) then (House is Very_high)
-    rule_14 = min(location_fuzzy_values['Excellent'], market_fuzzy_values['Very High'])
-    rule_strengths['Very_high'].append(rule_14)
-    
-    # --- For each output category, take the maximum rule strength (OR operation) ---
-    house_output = {
-        'Very_low': max(rule_strengths['Very_low']) if rule_strengths['Very_low'] else 0,
-        'Low': max(rule_strengths['Low']) if rule_strengths['Low'] else 0,
-        'Medium': max(rule_strengths['Medium']) if rule_strengths['Medium'] else 0,
-        'High': max(rule_strengths['High']) if rule_strengths['High'] else 0,
-        'Very_high': max(rule_strengths['Very_high']) if rule_strengths['Very_high'] else 0
-    }
-    
-    return house_output
-
-
-def evaluate_application_rule(assets_fuzzy_values, salary_fuzzy_values):
-    """
-    Takes fuzzified 'Assets' and 'Salary' inputs,
-    applies Application Evaluation rules, and returns the fuzzy result for the 'Application' output.
-    
-    Args:
-    assets_fuzzy_values (dict): Fuzzy degrees for 'Assets'.
-                                 {'Low': float, 'Medium': float, 'High': float}
-    salary_fuzzy_values (dict): Fuzzy degrees for 'Salary'.
-                                 {'Low': float, 'Medium': float, 'High': float, 'Very High': float}
+    ((('location', 'Excellent'), ('market', 'Very High')), 'AND', 'Very_high'),
+]
 
-    Returns:
-    dict: Fuzzy degrees for the 'Application' output.
-          {'Low': float, 'Medium': float, 'High': float}
-    """
-    
-    rule_strengths = {
-        'Low': [],
-        'Medium': [],
-        'High': []
-    }
-    
-    # --- Apply rules (AND = min, OR = max) ---
-    
+APPLICATION_RULES = [
     # Rule 1: If (Asset is Low) and (Income is Low) then (Applicant is Low)
-    rule_1 = min(assets_fuzzy_values['Low'], salary_fuzzy_values['Low'])
-    rule_strengths['Low'].append(rule_1)
-    
+    ((('assets', 'Low'), ('salary', 'Low')), 'AND', 'Low'),
     # Rule 2: If (Asset is Low) and (Income is Medium) then (Applicant is Low)
-    rule_2 = min(assets_fuzzy_values['Low'], salary_fuzzy_values['Medium'])
-    rule_strengths['Low'].append(rule_2)
-    
+    ((('assets', 'Low'), ('salary', 'Medium')), 'AND', 'Low'),
     # Rule 3: If (Asset is Low) and (Income is High) then (Applicant is Medium)
-    rule_3 = min(assets_fuzzy_values['Low'], salary_fuzzy_values['High'])
-    rule_strengths['Medium'].append(rule_3)
-    
+    ((('assets', 'Low'), ('salary', 'High')), 'AND', 'Medium'),
     # Rule 4: If (Asset is Low) and (Income is Very_high) then (Applicant is High)
-    rule_4 = min(assets_fuzzy_values['Low'], salary_fuzzy_values['Very High'])
-    rule_strengths['High'].append(rule_4)
-    
+    ((('assets', 'Low'), ('salary', 'Very High')), 'AND', 'High'),
     # Rule 5: If (Asset is Medium) and (Income is Low) then (Applicant is Low)
-    rule_5 = min(assets_fuzzy_values['Medium'], salary_fuzzy_values['Low'])
-    rule_strengths['Low'].append(rule_5)
-    
+    ((('assets', 'Medium'), ('salary', 'Low')), 'AND', 'Low'),
     # Rule 6: If (Asset is Medium) and (Income is Medium) then (Applicant is Medium)
-    rule_6 = min(assets_fuzzy_values['Medium'], salary_fuzzy_values['Medium'])
-    rule_strengths['Medium'].append(rule_6)
-    
+    ((('assets', 'Medium'), ('salary', 'Medium')), 'AND', 'Medium'),
     # Rule 7: If (Asset is Medium) and (Income is High) then (Applicant is High)
-    rule_7 = min(assets_fuzzy_values['Medium'], salary_fuzzy_values['High'])
-    rule_strengths['High'].append(rule_7)
-    
+    ((('assets', 'Medium'), ('salary', 'High')), 'AND', 'High'),
     # Rule 8: If (Asset is Medium) and (Income is Very_high) then (Applicant is High)
-    rule_8 = min(assets_fuzzy_values['Medium'], salary_fuzzy_values['Very High'])
-    rule_strengths['High'].append(rule_8)
-    
+    ((('assets', 'Medium'), ('salary', 'Very High')), 'AND', 'High'),
     # Rule 9: If (Asset is High) and (Income is Low) then (Applicant is Medium)
-    rule_9 = min(assets_fuzzy_values['High'], salary_fuzzy_values['Low'])
-    rule_strengths['Medium'].append(rule_9)
-    
+    ((('assets', 'High'), ('salary', 'Low')), 'AND', 'Medium'),
     # Rule 10: If (Asset is High) and (Income is Medium) then (Applicant is Medium)
-    rule_10 = min(assets_fuzzy_values['High'], salary_fuzzy_values['Medium'])
-    rule_strengths['Medium'].append(rule_10)
-    
+    ((('assets', 'High'), ('salary', 'Medium')), 'AND', 'Medium'),
     # Rule 11: If (Asset is High) and (Income is High) then (Applicant is High)
-    rule_11 = min(assets_fuzzy_values['High'], salary_fuzzy_values['High'])
-    rule_strengths['High'].append(rule_11)
-    
+    ((('assets', 'High'), ('salary', 'High')), 'AND', 'High'),
     # Rule 12: If (Asset is High) and (Income is Very_high) then (Applicant is High)
-    rule_12 = min(assets_fuzzy_values['High'], salary_fuzzy_values['Very High'])
-    rule_strengths['High'].append(rule_12)
-    
-    # --- For each output category, take the maximum rule strength (OR operation) ---
-    application_output = {
-        'Low': max(rule_strengths['Low']) if rule_strengths['Low'] else 0,
-        'Medium': max(rule_strengths['Medium']) if rule_strengths['Medium'] else 0,
-        'High': max(rule_strengths['High']) if rule_strengths['High'] else 0
-    }
-    
-    return application_output
-
-def evaluate_loan_rule(salary_fuzzy_values, interest_fuzzy_values, application_fuzzy_values, house_fuzzy_values):
-    """
-    Takes fuzzified 'Salary', 'Interest Rate', 'Application', and 'House' inputs,
-    applies Loan Evaluation rules, and returns the fuzzy result for the 'Credit' output.
-    
-    Args:
-    salary_fuzzy_values (dict): Fuzzy degrees for 'Salary'.
-                                 {'Low': float, 'Medium': float, 'High': float, 'Very High': float}
-    interest_fuzzy_values (dict): Fuzzy degrees for 'Interest Rate'.
-                                   {'Low': float, 'Medium': float, 'High': float}
-    application_fuzzy_values (dict): Fuzzy degrees for 'Application'.
-                                      {'Low': float, 'Medium': float, 'High': float}
-    house_fuzzy_values (dict): Fuzzy degrees for 'House'.
-                                {'Very_low': float, 'Low': float, 'Medium': float, 'High': float, 'Very_high': float}
+    ((('assets', 'High'), ('salary', 'Very High')), 'AND', 'High'),
+]
 
-    Returns:
-    dict: Fuzzy degrees for the 'Credit' output.
-          {'Very_low': float, 'Low': float, 'Medium': float, 'High': float, 'Very_high': float}
-    """
-    
-    rule_strengths = {
-        'Very_low': [],
-        'Low': [],
-        'Medium': [],
-        'High': [],
-        'Very_high': []
-    }
-    
-    # --- Apply rules (AND = min, OR = max) ---
-    
+LOAN_RULES = [
     # Rule 1: If (Income is Low) and (Interest is Medium) then (Credit is Very_low)
-    rule_1 = min(salary_fuzzy_values['Low'], interest_fuzzy_values['Medium'])
-    rule_strengths['Very_low'].append(rule_1)
-    
+    ((('salary', 'Low'), ('interest', 'Medium')), 'AND', 'Very_low'),
     # Rule 2: If (Income is Low) and (Interest is High) then (Credit is Very_low)
-    rule_2 = min(salary_fuzzy_values['Low'], interest_fuzzy_values['High'])
-    rule_strengths['Very_low'].append(rule_2)
-    
+    ((('salary', 'Low'), ('interest', 'High')), 'AND', 'Very_low'),
     # Rule 3: If (Income is Medium) and (Interest is High) then (Credit is Low)
-    rule_3 = min(salary_fuzzy_values['Medium'], interest_fuzzy_values['High'])
-    rule_strengths['Low'].append(rule_3)
-    
+    ((('salary', 'Medium'), ('interest', 'High')), 'AND', 'Low'),
     # Rule 4: If (Applicant is Low) then (Credit is Very_low)
-    rule_4 = application_fuzzy_values['Low']
-    rule_strengths['Very_low'].append(rule_4)
-    
+    ((('application', 'Low'),), 'AND', 'Very_low'),
     # Rule 5: If (House is Very_low) then (Credit is Very_low)
-    rule_5 = house_fuzzy_values['Very_low']
-    rule_strengths['Very_low'].append(rule_5)
-    
+    ((('house', 'Very_low'),), 'AND', 'Very_low'),
     # Rule 6: If (Applicant is Medium) and (House is Very_low) then (Credit is Low)
-    rule_6 = min(application_fuzzy_values['Medium'], house_fuzzy_values['Very_low'])
-    rule_strengths['Low'].append(rule_6)
-    
+    ((('application', 'Medium'), ('house', 'Very_low')), 'AND', 'Low'),
     # Rule 7: If (Applicant is Medium) and (House is Low) then (Credit is Low)
-    rule_7 = min(application_fuzzy_values['Medium'], house_fuzzy_values['Low'])
-    rule_strengths['Low'].append(rule_7)
-    
+    ((('application', 'Medium'), ('house', 'Low')), 'AND', 'Low'),
     # Rule 8: If (Applicant is Medium) and (House is Medium) then (Credit is Medium)
-    rule_8 = min(application_fuzzy_values['Medium'], house_fuzzy_values['Medium'])
-    rule_strengths['Medium'].append(rule_8)
-    
+    ((('application', 'Medium'), ('house', 'Medium')), 'AND', 'Medium'),
     # Rule 9: If (Applicant is Medium) and (House is High) then (Credit is High)
-    rule_9 = min(application_fuzzy_values['Medium'], house_fuzzy_values['High'])
-    rule_strengths['High'].append(rule_9)
-    
+    ((('application', 'Medium'), ('house', 'High')), 'AND', 'High'),
     # Rule 10: If (Applicant is Medium) and (House is Very_high) then (Credit is High)
-    rule_10 = min(application_fuzzy_values['Medium'], house_fuzzy_values['Very_high'])
-    rule_strengths['High'].append(rule_10)
-    
+    ((('application', 'Medium'), ('house', 'Very_high')), 'AND', 'High'),
     # Rule 11: If (Applicant is High) and (House is Very_low) then (Credit is Low)
-    rule_11 = min(application_fuzzy_values['High'], house_fuzzy_values['Very_low'])
-    rule_strengths['Low'].append(rule_11)
-    
+    ((('application', 'High'), ('house', 'Very_low')), 'AND', 'Low'),
     # Rule 12: If (Applicant is High) and (House is Low) then (Credit is Medium)
-    rule_12 = min(application_fuzzy_values['High'], house_fuzzy_values['Low'])
-    rule_strengths['Medium'].append(rule_12)
-    
+    ((('application', 'High'), ('house', 'Low')), 'AND', 'Medium'),
     # Rule 13: If (Applicant is High) and (House is Medium) then (Credit is High)
-    rule_13 = min(application_fuzzy_values['High'], house_fuzzy_values['Medium'])
-    rule_strengths['High'].append(rule_13)
-    
+    ((('application', 'High'), ('house', 'Medium')), 'AND', 'High'),
     # Rule 14: If (Applicant is High) and (House is High) then (Credit is High)
-    rule_14 = min(application_fuzzy_values['High'], house_fuzzy_values['High'])
-    rule_strengths['High'].append(rule_14)
-    
+    ((('application', 'High'), ('house', 'High')), 'AND', 'High'),
     # Rule 15: If (Applicant is High) and (House is Very_high) then (Credit is Very_high)
-    rule_15 = min(application_fuzzy_values['High'], house_fuzzy_values['Very_high'])
-    rule_strengths['Very_high'].append(rule_15)
+    ((('application', 'High'), ('house', 'Very_high')), 'AND', 'Very_high'),
+]
+
+
+class RuleBase:
+    """
+    A rule table compiled to index arrays for vectorized Mamdani inference.
+
+    The degrees of all input variables are stacked into one
+    (sum of labels) x N matrix. Each rule becomes a row of indices into that
+    matrix (padded by repeating its first antecedent, which leaves min and max
+    unchanged), so a batch is evaluated with one gather, one min or max per
+    connective and one max over the rules of each output label.
+    """
+
+    def __init__(self, rules, inputs, outputs):
+        """
+        Args:
+            rules (list): (antecedents, connective, consequent) tuples
+            inputs (dict): {variable: tuple of labels}, fixing the column order of each input
+            outputs (tuple): Output labels, fixing the column order of the result
+        """
+        self.rules = list(rules)
+        self.inputs = {variable: tuple(labels) for variable, labels in inputs.items()}
+        self.outputs = tuple(outputs)
+
+        offsets = {}
+        width = 0
+        for variable, labels in self.inputs.items():
+            offsets[variable] = width
+            width += len(labels)
+
+        arity = max(len(antecedents) for antecedents, _, _ in self.rules)
+        antecedent_rows = np.empty((len(self.rules), arity), dtype=np.intp)
+        consequents = np.empty(len(self.rules), dtype=np.intp)
+        is_or = np.empty(len(self.rules), dtype=bool)
+
+        for index, (antecedents, connective, consequent) in enumerate(self.rules):
+            if connective not in ('AND', 'OR'):
+                raise ValueError(f"Invalid connective: {connective}")
+            rows = [offsets[variable] + self.inputs[variable].index(label)
+                    for variable, label in antecedents]
+            antecedent_rows[index] = rows + rows[:1] * (arity - len(rows))
+            consequents[index] = self.outputs.index(consequent)
+            is_or[index] = connective == 'OR'
+
+        # The same table for one applicant: rows into the flat list of its
+        # degrees (padded to two, so itemgetter always returns a tuple)
+        self._scalar_rules = [
+            (itemgetter(*rows, *rows[:1] * (2 - len(rows))), max if is_or[index] else min, int(consequents[index]))
+            for index, rows in enumerate(antecedent_rows.tolist())
+        ]
+
+        # The same table for preallocated buffers: (antecedent rows, OR, output column)
+        self._buffer_rules = [(tuple(rows[:len(antecedents)]), bool(rule_is_or), int(column))
+                              for (antecedents, _, _), rows, rule_is_or, column
+                              in zip(self.rules, antecedent_rows.tolist(), is_or, consequents)]
+
+        # The same table for active sets: AND rules grouped by the variables
+        # they read, then keyed by the label columns of their antecedents, so
+        # only rules whose antecedents are all active are looked up
+        groups = {}
+        self._active_or_rules = []
+        for (antecedents, _, _), rows, column, rule_is_or in zip(self.rules, antecedent_rows.tolist(),
+                                                                consequents.tolist(), is_or.tolist()):
+            keys = tuple((variable, row - offsets[variable]) for (variable, _), row in zip(antecedents, rows))
+            if rule_is_or:
+                self._active_or_rules.append((keys, column))
+            else:
+                variables = tuple(variable for variable, _ in keys)
+                columns = tuple(label_column for _, label_column in keys)
+                groups.setdefault(variables, {}).setdefault(columns, []).append(column)
+        self._active_groups = list(groups.items())
+
+        # Sort rules by consequent so each output label reduces a contiguous block
+        order = np.argsort(consequents, kind='stable')
+        self._antecedent_rows = antecedent_rows[order]
+        self._or_rules = is_or[order]
+        sorted_consequents = consequents[order]
+        self._groups = [
+            (column, int(np.searchsorted(sorted_consequents, column, 'left')),
+             int(np.searchsorted(sorted_consequents, column, 'right')))
+            for column in np.unique(sorted_consequents)
+        ]
+
+    @instrumented('inference.RuleBase.evaluate',
+                  batch_size=lambda self, inputs, *args, **kwargs: batch_rows(
+                      *next(iter(zip(inputs.values(), map(len, self.inputs.values()))))))
+    def evaluate(self, inputs, chunk_size=2048):
+        """
+        Evaluate the rule base for a batch.
+
+        Args:
+            inputs (dict): {variable: N x labels matrix or FuzzyVector}, matrix columns in
+                           the label order of self.inputs
+            chunk_size (int): Applicants evaluated at a time, keeping the gathered
+                              antecedents small enough to stay in cache
+
+        Returns:
+            numpy.ndarray: N x outputs matrix of fuzzy degrees
+        """
+        matrices = [_degree_matrix(inputs[variable], labels) for variable, labels in self.inputs.items()]
+        n = matrices[0].shape[0]
+
+        output = np.zeros((n, len(self.outputs)))
+        for start in range(0, n, chunk_size):
+            degrees = np.concatenate([matrix[start:start + chunk_size].T for matrix in matrices])
+
+            # Gather antecedents and apply the connectives: rules x chunk
+            gathered = degrees[self._antecedent_rows]
+            strengths = gathered.min(axis=1)
+            if self._or_rules.any():
+                strengths[self._or_rules] = gathered[self._or_rules].max(axis=1)
+
+            # Aggregate rules sharing a consequent (OR = max)
+            block = output[start:start + chunk_size].T
+            for column, first, last in self._groups:
+                np.maximum.reduce(strengths[first:last], axis=0, out=block[column])
+
+        return output
+
+    def evaluate_dicts(self, inputs):
+        """
+        Evaluate the rule base for fuzzy degrees given per input variable.
+
+        A single applicant walks the compiled rule table over a flat list of
+        its degrees, which is cheaper than array operations at that size;
+        batches (arrays of N degrees per label) go through `evaluate`.
+
+        Args:
+            inputs (dict): {variable: FuzzyVector or {label: degree}}, degrees being
+                           floats or arrays of N values
+
+        Returns:
+            FuzzyVector: Output degrees, of shape (outputs,) or (N, outputs) like the inputs
+        """
+        vectors = [inputs[variable] for variable in self.inputs]
+        first = vectors[0]
+        if isinstance(first, FuzzyVector):
+            batch = first.degrees.ndim > 1
+        else:
+            batch = np.ndim(next(iter(first.values()))) > 0
+        if batch:
+            matrices = {variable: FuzzyVector.from_mapping(vector, labels).degrees
+                        for vector, (variable, labels) in zip(vectors, self.inputs.items())}
+            return FuzzyVector(self.outputs, self.evaluate(matrices))
+
+        degrees = []
+        for vector, labels in zip(vectors, self.inputs.values()):
+            if type(vector) is FuzzyVector and vector.labels == labels:
+                degrees += vector.degrees.tolist()
+            else:
+                degrees += [vector[label] for label in labels]
+
+        output = [0.0] * len(self.outputs)
+        for antecedents, combine, column in self._scalar_rules:
+            strength = combine(antecedents(degrees))
+            if strength > output[column]:
+                output[column] = strength
+        return FuzzyVector(self.outputs, np.array(output))
+
+    def evaluate_into(self, degrees, out, scratch):
+        """
+        Evaluate the rule base for a batch held in caller-owned buffers,
+        allocating no arrays: each rule is combined into `scratch` and folded
+        into its output row with in-place ufuncs. Results equal `evaluate`.
+
+        Args:
+            degrees (numpy.ndarray): (sum of labels) x N degrees, the rows of each
+                                     variable stacked in the order of self.inputs
+            out (numpy.ndarray): outputs x N matrix receiving the output degrees
+            scratch (numpy.ndarray): Work row of N values
+
+        Returns:
+            numpy.ndarray: out
+        """
+        out.fill(0.0)
+        for rows, rule_is_or, column in self._buffer_rules:
+            combine = np.maximum if rule_is_or else np.minimum
+            if len(rows) == 1:
+                np.copyto(scratch, degrees[rows[0]])
+            else:
+                combine(degrees[rows[0]], degrees[rows[1]], out=scratch)
+                for row in rows[2:]:
+                    combine(scratch, degrees[row], out=scratch)
+            np.maximum(out[column], scratch, out=out[column])
+        return out
+
+    def evaluate_active(self, active):
+        """
+        Evaluate the rule base for one applicant given the active labels of
+        each input variable, as from `fuzzification.BreakpointIndex.active` or
+        `FuzzyVector.active`.
+
+        Each group of AND rules reading the same variables is looked up for
+        every combination of their active labels (at most four for two inputs
+        with two active labels each), so rules with an inactive antecedent,
+        whose strength is 0, are never touched. Results equal `evaluate_dicts`.
+
+        Args:
+            active (dict): {variable: ((label column, degree), ...)}, columns in the
+                           label order of self.inputs; labels left out have degree 0
+
+        Returns:
+            FuzzyVector: Output degrees, of shape (outputs,)
+        """
+        output = [0.0] * len(self.outputs)
+        for variables, table in self._active_groups:
+            # Pairs of (consequents, strength) of the rules whose antecedents are
+            # all active; one- and two-antecedent rules are unrolled
+            if len(variables) == 1:
+                fired = [(table.get((column,)), degree) for column, degree in active[variables[0]]]
+            elif len(variables) == 2:
+                second = active[variables[1]]
+                fired = [(table.get((first_column, second_column)),
+                          first_degree if first_degree < second_degree else second_degree)
+                         for first_column, first_degree in active[variables[0]]
+                         for second_column, second_degree in second]
+            else:
+                fired = [(table.get(tuple(column for column, _ in combination)),
+                          min(degree for _, degree in combination))
+                         for combination in product(*[active[variable] for variable in variables])]
+            for consequents, strength in fired:
+                if consequents is not None:
+                    for column in consequents:
+                        if strength > output[column]:
+                            output[column] = strength
+
+        for keys, column in self._active_or_rules:
+            strength = max(dict(active[variable]).get(label_column, 0.0) for variable, label_column in keys)
+            if strength > output[column]:
+                output[column] = strength
+        return FuzzyVector(self.outputs, np.array(output))
+
+
+def _degree_matrix(degrees, labels):
+    # N x labels matrix of a variable's degrees, given as a matrix or a FuzzyVector
+    if isinstance(degrees, FuzzyVector):
+        degrees = FuzzyVector.from_mapping(degrees, labels).degrees
+    return np.asarray(degrees, dtype=float).reshape(-1, len(labels))
+
+
+HOUSE_RULE_BASE = RuleBase(HOUSE_RULES,
+                           inputs={'market': MARKET_LABELS, 'location': LOCATION_LABELS},
+                           outputs=HOUSE_LABELS)
+
+APPLICATION_RULE_BASE = RuleBase(APPLICATION_RULES,
+                                 inputs={'assets': ASSETS_LABELS, 'salary': SALARY_LABELS},
+                                 outputs=APPLICATION_LABELS)
+
+LOAN_RULE_BASE = RuleBase(LOAN_RULES,
+                          inputs={'salary': SALARY_LABELS, 'interest': INTEREST_LABELS,
+                                  'application': APPLICATION_LABELS, 'house': HOUSE_LABELS},
+                          outputs=CREDIT_LABELS)
+
+
+@instrumented('inference.evaluate_house_rule')
+def evaluate_house_rule(market_fuzzy_values, location_fuzzy_values):
+    """
+    Takes fuzzified 'Market Value' and 'Location' inputs,
+    applies House Evaluation rules, and returns the fuzzy result for the 'House' output.
+    
+    Args:
+    market_fuzzy_values (FuzzyVector or dict): Fuzzy degrees for 'Market Value'.
+                               {'Low': float, 'Medium': float, 'High': float, 'Very High': float}
+    location_fuzzy_values (FuzzyVector or dict): Fuzzy degrees for 'Location'.
+                                  {'Bad': float, 'Fair': float, 'Excellent': float}
+
+    Returns:
+    FuzzyVector: Fuzzy degrees for the 'House' output (reads like a dict).
+          {'Very_low': float, 'Low': float, 'Medium': float, 'High': float, 'Very_high': float}
+    """
+    return HOUSE_RULE_BASE.evaluate_dicts({'market': market_fuzzy_values,
+                                           'location': location_fuzzy_values})
+
+
+@instrumented('inference.evaluate_application_rule')
+def evaluate_application_rule(assets_fuzzy_values, salary_fuzzy_values):
+    """
+    Takes fuzzified 'Assets' and 'Salary' inputs,
+    applies Application Evaluation rules, and returns the fuzzy result for the 'Application' output.
     
-    # --- For each output category, take the maximum rule strength (OR operation) ---
-    credit_output = {
-        'Very_low': max(rule_strengths['Very_low']) if rule_strengths['Very_low'] else 0,
-        'Low': max(rule_strengths['Low']) if rule_strengths['Low'] else 0,
-        'Medium': max(rule_strengths['Medium']) if rule_strengths['Medium'] else 0,
-        'High': max(rule_strengths['High']) if rule_strengths['High'] else 0,
-        'Very_high': max(rule_strengths['Very_high']) if rule_strengths['Very_high'] else 0
-    }
+    Args:
+    assets_fuzzy_values (FuzzyVector or dict): Fuzzy degrees for 'Assets'.
+                                 {'Low': float, 'Medium': float, 'High': float}
+    salary_fuzzy_values (FuzzyVector or dict): Fuzzy degrees for 'Salary'.
+                                 {'Low': float, 'Medium': float, 'High': float, 'Very High': float}
+
+    Returns:
+    FuzzyVector: Fuzzy degrees for the 'Application' output (reads like a dict).
+          {'Low': float, 'Medium': float, 'High': float}
+    """
+    return APPLICATION_RULE_BASE.evaluate_dicts({'assets': assets_fuzzy_values,
+                                                 'salary': salary_fuzzy_values})
+
+
+@instrumented('inference.evaluate_loan_rule')
+def evaluate_loan_rule(salary_fuzzy_values, interest_fuzzy_values, application_fuzzy_values, house_fuzzy_values):
+    """
+    Takes fuzzified 'Salary', 'Interest Rate', 'Application', and 'House' inputs,
+    applies Loan Evaluation rules, and returns the fuzzy result for the 'Credit' output.
     
-    return credit_output
+    Args:
+    salary_fuzzy_values (FuzzyVector or dict): Fuzzy degrees for 'Salary'.
+                                 {'Low': float, 'Medium': float, 'High': float, 'Very High': float}
+    interest_fuzzy_values (FuzzyVector or dict): Fuzzy degrees for 'Interest Rate'.
+                                   {'Low': float, 'Medium': float, 'High': float}
+    application_fuzzy_values (FuzzyVector or dict): Fuzzy degrees for 'Application'.
+                                      {'Low': float, 'Medium': float, 'High': float}
+    house_fuzzy_values (FuzzyVector or dict): Fuzzy degrees for 'House'.
+                                {'Very_low': float, 'Low': float, 'Medium': float, 'High': float, 'Very_high': float}
+
+    Returns:
+    FuzzyVector: Fuzzy degrees for the 'Credit' output (reads like a dict).
+          {'Very_low': float, 'Low': float, 'Medium': float, 'High': float, 'Very_high': float}
+    """
+    return LOAN_RULE_BASE.evaluate_dicts({'salary': salary_fuzzy_values,
+                                          'interest': interest_fuzzy_values,
+                                          'application': application_fuzzy_values,
+                                          'house': house_fuzzy_values})
 
 
 # --- TESTING ---
@@ -0,0 +1,193 @@
+"""
+Opt-in instrumentation of the scoring pipeline.
+
+The pipeline's stage functions are wrapped with `instrumented`, so callers do
+not change. While instrumentation is disabled (the default) a wrapper only
+checks one flag before calling through; once `enable()` is called it records
+per-stage call counts and wall time, batch-size histograms for the vectorized
+stages, and hit/miss counts of the Defuzzifier caches. The figures are
+available as a dict (`snapshot`) or in Prometheus text format (`prometheus_text`).
+
+Example:
+    import instrumentation
+    instrumentation.enable()
+    score_batch(...)
+    print(instrumentation.prometheus_text())
+"""
+import functools
+import threading
+import time
+
+# Upper bounds of the batch-size histogram buckets (the last one is +Inf)
+BATCH_SIZE_BUCKETS = (1, 4, 16, 64, 256, 1024, 4096, 16384, 65536, float('inf'))
+
+_enabled = False
+_lock = threading.Lock()
+_stages = {}
+_batch_sizes = {}
+_caches = {}
+
+
+def enable():
+    """Start recording metrics."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Stop recording metrics; those recorded so far are kept."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Discard every recorded metric."""
+    with _lock:
+        _stages.clear()
+        _batch_sizes.clear()
+        _caches.clear()
+
+
+def instrumented(stage, batch_size=None):
+    """
+    Decorator recording calls and wall time of a pipeline stage.
+
+    Args:
+        stage (str): Stage name used in the metrics, e.g. 'inference.evaluate_house_rule'
+        batch_size (callable): Optional; called with the arguments of the wrapped
+                               function after it returns, gives the number of applicants
+                               of the call for the batch-size histogram (keep it cheap:
+                               it runs on every instrumented call)
+
+    Returns:
+        callable: The decorator
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except BaseException:
+                # Failed calls count without a batch size: sizing arguments the
+                # stage rejected could raise in place of its own error
+                _record_call(stage, time.perf_counter() - start, None)
+                raise
+            elapsed = time.perf_counter() - start
+            _record_call(stage, elapsed, batch_size(*args, **kwargs) if batch_size is not None else None)
+            return result
+
+        return wrapper
+    return decorate
+
+
+def _record_call(stage, elapsed, size):
+    with _lock:
+        calls, seconds, slowest = _stages.get(stage, (0, 0.0, 0.0))
+        _stages[stage] = (calls + 1, seconds + elapsed, max(slowest, elapsed))
+        if size is not None:
+            histogram = _batch_sizes.get(stage)
+            if histogram is None:
+                histogram = _batch_sizes[stage] = [0] * len(BATCH_SIZE_BUCKETS) + [0]
+            for bucket, bound in enumerate(BATCH_SIZE_BUCKETS):
+                if size <= bound:
+                    histogram[bucket] += 1
+                    break
+            histogram[-1] += size
+
+
+def record_cache(cache, hit):
+    """
+    Count a lookup of a cache.
+
+    Args:
+        cache (str): Cache name, e.g. 'defuzzifier_grid'
+        hit (bool): Whether the lookup found its entry
+    """
+    if not _enabled:
+        return
+    with _lock:
+        hits, misses = _caches.get(cache, (0, 0))
+        _caches[cache] = (hits + 1, misses) if hit else (hits, misses + 1)
+
+
+def snapshot():
+    """
+    Returns:
+        dict: {'stages': {stage: {'calls', 'seconds', 'mean_seconds', 'max_seconds'}},
+               'batch_sizes': {stage: {'buckets': {upper bound: calls}, 'count', 'sum'}},
+               'caches': {cache: {'hits', 'misses', 'hit_rate'}}}
+              Histogram buckets are not cumulative here.
+    """
+    with _lock:
+        stages = {
+            stage: {'calls': calls, 'seconds': seconds, 'mean_seconds': seconds / calls,
+                    'max_seconds': slowest}
+            for stage, (calls, seconds, slowest) in _stages.items()
+        }
+        batch_sizes = {
+            stage: {'buckets': dict(zip(BATCH_SIZE_BUCKETS, histogram[:-1])),
+                    'count': sum(histogram[:-1]), 'sum': histogram[-1]}
+            for stage, histogram in _batch_sizes.items()
+        }
+        caches = {
+            cache: {'hits': hits, 'misses': misses, 'hit_rate': hits / (hits + misses)}
+            for cache, (hits, misses) in _caches.items()
+        }
+    return {'stages': stages, 'batch_sizes': batch_sizes, 'caches': caches}
+
+
+def _bound_label(bound):
+    return '+Inf' if bound == float('inf') else str(bound)
+
+
+def prometheus_text(prefix='fuzzy_credit'):
+    """
+    The recorded metrics in the Prometheus text exposition format.
+
+    Args:
+        prefix (str): Prefix of every metric name
+
+    Returns:
+        str: The exposition text, ending in a newline
+    """
+    metrics = snapshot()
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+    family('stage_calls_total', 'counter', "Calls of each pipeline stage.")
+    for stage, stats in metrics['stages'].items():
+        lines.append(f'{prefix}_stage_calls_total{{stage="{stage}"}} {stats["calls"]}')
+    family('stage_seconds_total', 'counter', "Wall time spent in each pipeline stage (inclusive of nested stages).")
+    for stage, stats in metrics['stages'].items():
+        lines.append(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {stats["seconds"]!r}')
+    family('stage_max_seconds', 'gauge', "Slowest call of each pipeline stage.")
+    for stage, stats in metrics['stages'].items():
+        lines.append(f'{prefix}_stage_max_seconds{{stage="{stage}"}} {stats["max_seconds"]!r}')
+
+    family('batch_size', 'histogram', "Applicants per call of the vectorized stages.")
+    for stage, histogram in metrics['batch_sizes'].items():
+        cumulative = 0
+        for bound, calls in histogram['buckets'].items():
+            cumulative += calls
+            lines.append(f'{prefix}_batch_size_bucket{{stage="{stage}",le="{_bound_label(bound)}"}} {cumulative}')
+        lines.append(f'{prefix}_batch_size_sum{{stage="{stage}"}} {histogram["sum"]}')
+        lines.append(f'{prefix}_batch_size_count{{stage="{stage}"}} {histogram["count"]}')
+
+    family('cache_hits_total', 'counter', "Cache lookups that found their entry.")
+    for cache, stats in metrics['caches'].items():
+        lines.append(f'{prefix}_cache_hits_total{{cache="{cache}"}} {stats["hits"]}')
+    family('cache_misses_total', 'counter', "Cache lookups that had to build their entry.")
+    for cache, stats in metrics['caches'].items():
+        lines.append(f'{prefix}_cache_misses_total{{cache="{cache}"}} {stats["misses"]}')
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,266 @@
+"""
+Input fuzzification and defuzzification figures embedded in the Tkinter GUI.
+
+The membership curves and axes are drawn once and cached as a background
+bitmap. An update only moves the animated artists (input markers and their
+degrees, clipped sets, aggregated set and centroid line) and blits them over
+the cached background, so slider-driven redraws never rebuild a figure. The
+background is captured again whenever the canvas is fully redrawn (e.g. when
+the window is resized).
+
+Updates are split in two: `prepare_frame` computes the data of a result with
+NumPy only and may run on a worker thread; `LivePlots.show` applies it to the
+artists on the Tk thread.
+
+Importing this module loads Matplotlib; main.py imports it once the first
+result is shown.
+"""
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.patches import Polygon
+from matplotlib.ticker import FuncFormatter
+
+import fuzzification
+from plotting_mf import FuzzificationPlotter
+
+
+# Input plots: (variable, title, x label, curve colors in label order, money axis)
+INPUT_PLOTS = (
+    ('market_house', 'House Market Value', 'Market Value ($)', ('blue', 'green', 'orange', 'red'), True),
+    ('location_house', 'House Location', 'Location Score', ('red', 'yellow', 'green'), False),
+    ('application_assets', 'Application Assets', 'Assets ($)', ('blue', 'green', 'orange'), True),
+    ('application_salary', 'Application Salary', 'Salary ($)', ('blue', 'green', 'orange', 'red'), True),
+    ('interest_rate', 'Interest Rate', 'Interest Rate (%)', ('blue', 'green', 'orange'), False),
+)
+
+# Output plots: (output type, title)
+OUTPUT_PLOTS = (
+    ('house', 'House Evaluation'),
+    ('application', 'Application Evaluation'),
+    ('credit', 'Credit Evaluation'),
+)
+
+# Colors of the output sets, as in Defuzzifier.visualize_defuzzification
+OUTPUT_COLORS = {'Very_low': 'blue', 'Low': 'cyan', 'Medium': 'green', 'High': 'orange', 'Very_high': 'red'}
+
+
+def prepare_frame(defuzzifier, inputs, fuzzy_outputs, scores, sets=None):
+    """
+    The data one result puts on the plots, computed with NumPy only so that
+    it can be prepared off the Tk thread (Matplotlib artists are not
+    thread-safe; `LivePlots.show` applies the frame).
+
+    Args:
+        defuzzifier (Defuzzifier): Instance whose grids are drawn
+        inputs (dict): {variable: crisp value}, variables of INPUT_PLOTS
+        fuzzy_outputs (dict): {output_type: fuzzy output}, output types of OUTPUT_PLOTS
+        scores (dict): {output_type: crisp score}
+        sets (dict): Optional {output_type: `Defuzzifier.clipped_sets` result} already
+                     computed (e.g. by a ScoringSession), used instead of recomputing them
+
+    Returns:
+        dict: {'inputs': {variable: (value, [(label, degree), ...] for degrees > 0)},
+               'outputs': {output_type: (clipped sets, aggregated set, score)}}
+    """
+    frame = {'inputs': {}, 'outputs': {}}
+    for variable, value in inputs.items():
+        degrees = fuzzification.fuzzify(value, fuzzification.INPUT_CONFIGS[variable]['sets'])
+        frame['inputs'][variable] = (value, [(label, degree) for label, degree in degrees.items() if degree > 0])
+    for output_type, fuzzy_output in fuzzy_outputs.items():
+        if sets is not None and output_type in sets:
+            _, clipped, aggregated = sets[output_type]
+        else:
+            _, clipped, aggregated = defuzzifier.clipped_sets(fuzzy_output, output_type)
+        frame['outputs'][output_type] = (clipped, aggregated, scores[output_type])
+    return frame
+
+
+class LivePlots:
+    """
+    The five input fuzzification plots and three defuzzification plots of the
+    GUI in one figure, updated by blitting.
+    """
+
+    def __init__(self, defuzzifier, master=None, figsize=(11, 8.5), dpi=100, header=False):
+        """
+        Args:
+            defuzzifier (Defuzzifier): Instance whose grids are drawn
+            master (tkinter widget): Parent of the embedded canvas (`widget`); without
+                                     one the figure is drawn on an offscreen Agg canvas
+            figsize (tuple): Figure size in inches
+            dpi (float): Figure resolution
+            header (bool): Reserve a figure title showing frame['title']
+        """
+        self.defuzzifier = defuzzifier
+        self.figure = Figure(figsize=figsize, dpi=dpi, layout='constrained')
+        if master is not None:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+            self.widget = self.canvas.get_tk_widget()
+        else:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.canvas = FigureCanvasAgg(self.figure)
+            self.widget = None
+
+        # Input plots fill the top two rows (three, then two), outputs the bottom row
+        grid = self.figure.add_gridspec(3, 6)
+        input_slots = [grid[0, 0:2], grid[0, 2:4], grid[0, 4:6], grid[1, 0:3], grid[1, 3:6]]
+        output_slots = [grid[2, 0:2], grid[2, 2:4], grid[2, 4:6]]
+
+        self._groups = {'inputs': [], 'house': [], 'application': [], 'credit': [], 'header': []}
+        self._visible = dict.fromkeys(self._groups, True)
+        # Axes of each group, hidden along with its moving parts
+        self._axes = {group: [] for group in self._groups}
+        self._inputs = {}
+        self._outputs = {}
+        plotter = FuzzificationPlotter()
+        for slot, (variable, title, xlabel, colors, money) in zip(input_slots, INPUT_PLOTS):
+            ax = self.figure.add_subplot(slot)
+            self._axes['inputs'].append(ax)
+            self._inputs[variable] = self._build_input(ax, plotter, variable, title, xlabel, colors, money)
+        for slot, (output_type, title) in zip(output_slots, OUTPUT_PLOTS):
+            ax = self.figure.add_subplot(slot)
+            self._axes[output_type].append(ax)
+            self._outputs[output_type] = self._build_output(ax, output_type, title)
+
+        self._header = None
+        if header:
+            # The placeholder text makes the layout reserve room for the title
+            self._header = self._animated('header', self.figure.suptitle(' ', fontsize=12, fontweight='bold'))
+
+        self._background = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _animated(self, group, artist):
+        artist.set_animated(True)
+        self._groups[group].append(artist)
+        return artist
+
+    def _build_input(self, ax, plotter, variable, title, xlabel, colors, money):
+        # Static curves, plus an input marker, dots at the degrees and one label per set
+        x_values, curves = plotter.curves(variable)
+        for (label, degrees), color in zip(curves.items(), colors):
+            ax.plot(x_values, degrees, linewidth=1.5, color=color, label=label)
+            ax.fill_between(x_values, degrees, color=color, alpha=0.3)
+
+        ax.set_title(title, fontsize=10, fontweight='bold')
+        ax.set_xlabel(xlabel, fontsize=9)
+        ax.set_xlim(x_values[0], x_values[-1])
+        ax.set_ylim(0, 1.15)
+        ax.tick_params(labelsize=8)
+        ax.grid(True, alpha=0.3)
+        ax.legend(fontsize=7, loc='upper right')
+        if money:
+            ax.xaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x/1000:.0f}K'))
+
+        marker = self._animated('inputs', ax.axvline(x_values[0], color='black', linestyle='--', linewidth=1.2))
+        dots = self._animated('inputs', ax.plot([], [], 'ko', markersize=4)[0])
+        texts = [self._animated('inputs', ax.text(0, 0, '', fontsize=8, verticalalignment='bottom'))
+                 for _ in curves]
+        return {'marker': marker, 'dots': dots, 'texts': texts}
+
+    def _build_output(self, ax, output_type, title):
+        # Static dashed sets, plus one clipped polygon per set, the aggregated
+        # outline, the centroid line and its label
+        config = self.defuzzifier.output_configs[output_type]
+        x, grid, _ = self.defuzzifier.clipped_sets(dict.fromkeys(config['sets'], 1.0), output_type)
+        for category, membership_values in zip(config['sets'], grid):
+            ax.plot(x, membership_values, '--', color=OUTPUT_COLORS.get(category, 'gray'), alpha=0.4,
+                    label=category)
+
+        ax.set_title(f'{title} - Defuzzification', fontsize=10, fontweight='bold')
+        ax.set_xlabel(f'{output_type.capitalize()} Score', fontsize=9)
+        ax.set_xlim(config['range'])
+        ax.set_ylim(0, 1.15)
+        ax.tick_params(labelsize=8)
+        ax.grid(True, alpha=0.3)
+        ax.legend(fontsize=7, loc='upper right')
+
+        # Polygon outlines (x, clipped) then back along (x, 0); the first half
+        # of the y column is rewritten on every update
+        outline = np.zeros((2 * x.size, 2))
+        outline[:x.size, 0] = x
+        outline[x.size:, 0] = x[::-1]
+        polygons = []
+        for category in config['sets']:
+            polygon = Polygon(outline.copy(), closed=True, alpha=0.4, linewidth=0,
+                              color=OUTPUT_COLORS.get(category, 'gray'))
+            polygons.append(self._animated(output_type, ax.add_patch(polygon)))
+        aggregated = self._animated(output_type, ax.plot(x, np.zeros_like(x), 'k-', linewidth=1.5)[0])
+        centroid = self._animated(output_type, ax.axvline(x[0], color='red', linestyle='--', linewidth=1.5))
+        label = self._animated(output_type, ax.text(0.02, 0.95, '', transform=ax.transAxes, fontsize=9,
+                                                    verticalalignment='top', color='red'))
+        return {'polygons': polygons, 'aggregated': aggregated, 'centroid': centroid, 'label': label}
+
+    def show(self, frame):
+        """
+        Move the moving parts to a frame from `prepare_frame` and blit them.
+        Must run on the thread that owns the canvas.
+        """
+        for variable, (value, active) in frame['inputs'].items():
+            plot = self._inputs[variable]
+            plot['marker'].set_xdata([value, value])
+            plot['dots'].set_data([value] * len(active), [degree for _, degree in active])
+            for text, (label, degree) in zip(plot['texts'], active + [(None, 0.0)] * len(plot['texts'])):
+                text.set_visible(label is not None)
+                if label is not None:
+                    text.set_position((value, degree))
+                    text.set_text(f' {label}: {degree:.2f}')
+
+        for output_type, (clipped, aggregated, score) in frame['outputs'].items():
+            plot = self._outputs[output_type]
+            for polygon, membership_values in zip(plot['polygons'], clipped):
+                polygon.set_visible(membership_values.any())
+                polygon.get_xy()[:membership_values.size, 1] = membership_values
+            plot['aggregated'].set_ydata(aggregated)
+            plot['centroid'].set_xdata([score, score])
+            plot['label'].set_text(f'Centroid = {score:.2f}')
+
+        if self._header is not None:
+            self._header.set_text(frame.get('title', ''))
+        self.redraw()
+
+    def set_visible(self, group, visible):
+        """
+        Show or hide 'inputs', 'house', 'application', 'credit' or 'header': the
+        axes of the plots with their curves and titles, and their moving parts.
+        A change takes effect on the next `redraw`, which then redraws the
+        whole figure to recapture the cached background.
+        """
+        visible = bool(visible)
+        if self._visible[group] == visible:
+            return
+        self._visible[group] = visible
+        for ax in self._axes[group]:
+            ax.set_visible(visible)
+        self._background = None
+
+    def _draw_animated(self):
+        for group, artists in self._groups.items():
+            if not self._visible[group]:
+                continue
+            for artist in artists:
+                if artist.get_visible():
+                    self.figure.draw_artist(artist)
+
+    def _on_draw(self, event):
+        # A full redraw (first show, resize) renders only the static artists:
+        # cache them, then paint the moving parts on top
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+
+    def snapshot(self):
+        """
+        Returns:
+            numpy.ndarray: Copy of the RGB pixels currently on the canvas, height x width x 3
+        """
+        return np.asarray(self.canvas.buffer_rgba())[:, :, :3].copy()
+
+    def redraw(self):
+        """Blit the current state of the moving parts over the cached background."""
+        if self._background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.figure.bbox)
@@ -1,20 +1,52 @@
+import queue
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 # Import project modules
 from defuzzification import Defuzzifier
 import fuzzification
-from inference import evaluate_application_rule, evaluate_house_rule, evaluate_loan_rule
-# plotting_mf is not strictly needed for the main logic but useful if we want to show MF plots
-from plotting_mf import FuzzificationPlotter 
+from session import OUTPUT_TYPES, ScoringSession
+# Matplotlib (through live_plots) is only imported once the first result is shown
+
+# Slider step of each input, in the units of the input, and the decimals shown
+SLIDER_STEPS = {
+    'market_house': (1000, 0),
+    'location_house': (0.1, 1),
+    'application_assets': (1000, 0),
+    'application_salary': (100, 0),
+    'interest_rate': (0.05, 2),
+}
+
+# How often the Tk thread checks for results of the scoring worker
+POLL_INTERVAL_MS = 10
 
 class FuzzyLogicApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Fuzzy Logic Credit Evaluation System")
-        self.root.geometry("600x750")
+        self.root.geometry("1560x900")
+        
+        # Reused across calculations; its membership grids are compiled once
+        self.defuzz = Defuzzifier()
+        
+        # Cached pipeline stages of the last inputs; only the worker uses it
+        self.session = ScoringSession(self.defuzz)
+        
+        # Embedded figures, created with the first result and updated by blitting
+        self.live_plots = None
+        self.update_pending = False
+        self.syncing_sliders = False
+        
+        # Scoring and plot preparation run on one worker thread; results come
+        # back through a queue polled from the Tk thread. Only the result of
+        # the latest generation of inputs is shown.
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scoring")
+        self.results = queue.Queue()
+        self.generation = 0
+        self.pending = None
+        self.polling = False
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
         
         # Style
         style = ttk.Style()
@@ -22,14 +54,18 @@ class FuzzyLogicApp:
         
         # Main Frame
         main_frame = ttk.Frame(root, padding="20")
-        main_frame.pack(fill=tk.BOTH, expand=True)
+        main_frame.pack(side=tk.LEFT, fill=tk.Y)
+        
+        self.plots_container = ttk.Frame(root, padding="5")
+        self.plots_container.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         # Title
         title_label = ttk.Label(main_frame, text="Credit Evaluation System", font=("Helvetica", 16, "bold"))
-        title_label.grid(row=0, column=0, columnspan=2, pady=(0, 20))
+        title_label.grid(row=0, column=0, columnspan=3, pady=(0, 20))
         
         # --- Inputs ---
         self.entries = {}
+        self.sliders = {}
         
         # Market Value
         self.create_input_field(main_frame, 1, "Market Value ($):", "market_house", 87000)
@@ -48,11 +84,11 @@ class FuzzyLogicApp:
         
         # --- Buttons ---
         calc_button = ttk.Button(main_frame, text="Calculate Credit Score", command=self.calculate)
-        calc_button.grid(row=6, column=0, columnspan=2, pady=20, ipadx=10, ipady=5)
+        calc_button.grid(row=6, column=0, columnspan=3, pady=20, ipadx=10, ipady=5)
         
         # --- Outputs ---
         self.result_frame = ttk.LabelFrame(main_frame, text="Results", padding="10")
-        self.result_frame.grid(row=7, column=0, columnspan=2, sticky="ew", pady=10)
+        self.result_frame.grid(row=7, column=0, columnspan=3, sticky="ew", pady=10)
         
         self.house_score_label = ttk.Label(self.result_frame, text="House Score: -", font=("Helvetica", 12))
         self.house_score_label.pack(anchor="w", pady=2)
@@ -65,106 +101,164 @@ class FuzzyLogicApp:
         
         # --- Visualization Options ---
         self.plot_frame = ttk.LabelFrame(main_frame, text="Visualizations", padding="10")
-        self.plot_frame.grid(row=8, column=0, columnspan=2, sticky="ew", pady=10)
+        self.plot_frame.grid(row=8, column=0, columnspan=3, sticky="ew", pady=10)
         
         self.plot_house_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(self.plot_frame, text="Show House Defuzzification", variable=self.plot_house_var).pack(anchor="w")
+        ttk.Checkbutton(self.plot_frame, text="Show House Defuzzification", variable=self.plot_house_var,
+                        command=self.toggle_plots).pack(anchor="w")
         
         self.plot_app_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(self.plot_frame, text="Show Application Defuzzification", variable=self.plot_app_var).pack(anchor="w")
+        ttk.Checkbutton(self.plot_frame, text="Show Application Defuzzification", variable=self.plot_app_var,
+                        command=self.toggle_plots).pack(anchor="w")
         
         self.plot_credit_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(self.plot_frame, text="Show Credit Defuzzification", variable=self.plot_credit_var).pack(anchor="w")
+        ttk.Checkbutton(self.plot_frame, text="Show Credit Defuzzification", variable=self.plot_credit_var,
+                        command=self.toggle_plots).pack(anchor="w")
 
         self.plot_input_fuzz_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(self.plot_frame, text="Show Input Fuzzification", variable=self.plot_input_fuzz_var).pack(anchor="w")
+        ttk.Checkbutton(self.plot_frame, text="Show Input Fuzzification", variable=self.plot_input_fuzz_var,
+                        command=self.toggle_plots).pack(anchor="w")
+        
+        # Show the plots of the default inputs once the window is up
+        self.root.after_idle(self.calculate)
 
     def create_input_field(self, parent, row, label_text, var_name, default_val):
         ttk.Label(parent, text=label_text).grid(row=row, column=0, sticky="w", pady=5)
-        entry = ttk.Entry(parent)
+        entry = ttk.Entry(parent, width=12)
         entry.insert(0, str(default_val))
         entry.grid(row=row, column=1, sticky="e", pady=5)
+        entry.bind("<Return>", lambda event: self.calculate())
         self.entries[var_name] = entry
+        
+        low, high = fuzzification.INPUT_CONFIGS[var_name]['range']
+        slider = ttk.Scale(parent, from_=low, to=high, orient=tk.HORIZONTAL, length=160,
+                           command=lambda value, name=var_name: self.slide(name, value))
+        slider.set(default_val)
+        slider.grid(row=row, column=2, sticky="ew", padx=(10, 0), pady=5)
+        self.sliders[var_name] = slider
+
+    def slide(self, var_name, value):
+        """Copy a slider position to its entry and re-score once the GUI is idle."""
+        if self.syncing_sliders:
+            return
+        step, decimals = SLIDER_STEPS[var_name]
+        value = round(float(value) / step) * step
+        self.entries[var_name].delete(0, tk.END)
+        self.entries[var_name].insert(0, f"{value:.{decimals}f}")
+        
+        # Slider events arrive faster than frames: coalesce them into one update
+        if not self.update_pending:
+            self.update_pending = True
+            self.root.after_idle(self.run_pending_update)
+
+    def run_pending_update(self):
+        self.update_pending = False
+        self.calculate()
+
+    def toggle_plots(self):
+        if self.live_plots is None:
+            return
+        self.live_plots.set_visible('inputs', self.plot_input_fuzz_var.get())
+        self.live_plots.set_visible('house', self.plot_house_var.get())
+        self.live_plots.set_visible('application', self.plot_app_var.get())
+        self.live_plots.set_visible('credit', self.plot_credit_var.get())
+        self.live_plots.redraw()
+
+    def show_plots(self, frame):
+        """Move the embedded plots to a prepared frame, creating them on first use."""
+        if self.live_plots is None:
+            from live_plots import LivePlots
+            self.live_plots = LivePlots(self.defuzz, master=self.plots_container)
+            self.live_plots.widget.pack(fill=tk.BOTH, expand=True)
+            self.toggle_plots()
+        self.live_plots.show(frame)
 
     def calculate(self):
         try:
             # 1. Get Inputs
-            market_house = float(self.entries["market_house"].get())
-            location_house = float(self.entries["location_house"].get())
-            application_assets = float(self.entries["application_assets"].get())
-            application_salary = float(self.entries["application_salary"].get())
-            interest_rate = float(self.entries["interest_rate"].get())
-            
-            # 2. Fuzzification
-            fuzzified_market_house = fuzzification.market_value_house_fuzzification(market_house)
-            fuzzified_location_house = fuzzification.location_of_house_fuzzification(location_house)
-            fuzzified_application_assets = fuzzification.application_assets_fuzzification(application_assets)
-            fuzzified_application_salary = fuzzification.application_salary_fuzzification(application_salary)
-            fuzzified_interest_rate = fuzzification.interest_rate_fuzzification(interest_rate)
-            
-            # 3. Inference
-            # House Evaluation
-            result_evaluation_house = evaluate_house_rule(fuzzified_market_house, fuzzified_location_house)
-            
-            # Application Evaluation
-            result_evaluation_application = evaluate_application_rule(fuzzified_application_assets, fuzzified_application_salary)
-            
-            # Loan Evaluation
-            # Note: evaluate_loan_rule expects specific inputs. 
-            # Based on inference.py: evaluate_loan_rule(salary, interest_rate, application, house)
-            # It seems it uses the FUZZIFIED salary and interest rate directly, 
-            # PLUS the FUZZY OUTPUTS of application and house evaluations.
-            
-            result_loan = evaluate_loan_rule(
-                fuzzified_application_salary, 
-                fuzzified_interest_rate, 
-                result_evaluation_application, 
-                result_evaluation_house
-            )
-            
-            # 4. Defuzzification
-            defuzz = Defuzzifier()
-            
-            house_score = defuzz.centroid_defuzzification(result_evaluation_house, 'house')
-            app_score = defuzz.centroid_defuzzification(result_evaluation_application, 'application')
-            credit_score = defuzz.centroid_defuzzification(result_loan, 'credit')
-            
-            # 5. Update UI
-            self.house_score_label.config(text=f"House Score: {house_score:.2f} / 10")
-            self.app_score_label.config(text=f"Application Score: {app_score:.2f} / 10")
-            self.credit_score_label.config(text=f"Credit Score: {credit_score:.2f} / 1000")
-            
-            # 6. Plotting
-            # We use the existing visualize_defuzzification method which calls plt.show()
-            # This will open separate windows.
-            
-            if self.plot_input_fuzz_var.get():
-                plotter = FuzzificationPlotter()
-                inputs = {
-                    'market_house': market_house,
-                    'location_house': location_house,
-                    'application_assets': application_assets,
-                    'application_salary': application_salary,
-                    'interest_rate': interest_rate
-                }
-                plotter.plot_all_inputs(inputs)
+            inputs = {
+                'market_house': float(self.entries["market_house"].get()),
+                'location_house': float(self.entries["location_house"].get()),
+                'application_assets': float(self.entries["application_assets"].get()),
+                'application_salary': float(self.entries["application_salary"].get()),
+                'interest_rate': float(self.entries["interest_rate"].get())
+            }
+        except ValueError:
+            messagebox.showerror("Input Error", "Please enter valid numeric values.")
+            return
+        
+        self.syncing_sliders = True
+        try:
+            for var_name, value in inputs.items():
+                self.sliders[var_name].set(value)
+        finally:
+            self.syncing_sliders = False
+        
+        # 2. Hand the inputs to the worker. A newer generation supersedes every
+        # older request: one still queued is cancelled, one already running
+        # is discarded when it reports back
+        self.generation += 1
+        if self.pending is not None:
+            self.pending.cancel()
+        self.pending = self.executor.submit(self.evaluate, self.generation, inputs)
+        if not self.polling:
+            self.polling = True
+            self.root.after(POLL_INTERVAL_MS, self.poll_results)
 
-            # Collect results for defuzzification plotting
-            defuzz_results = {}
-            if self.plot_house_var.get():
-                defuzz_results['house'] = result_evaluation_house
-            if self.plot_app_var.get():
-                defuzz_results['application'] = result_evaluation_application
-            if self.plot_credit_var.get():
-                defuzz_results['credit'] = result_loan
+    def evaluate(self, generation, inputs):
+        """Score the inputs and prepare their plot data; runs on the worker thread."""
+        if generation != self.generation:
+            return
+        try:
+            # Loaded here, off the Tk thread, so the first plots only pay for drawing
+            from live_plots import prepare_frame
             
-            if defuzz_results:
-                defuzz.visualize_all_defuzzification(defuzz_results)
-                
-        except ValueError as e:
-            messagebox.showerror("Input Error", "Please enter valid numeric values.")
+            # 3-5. Fuzzification, inference and defuzzification. The session
+            # keeps every stage and only re-runs those downstream of the
+            # inputs that changed since the last request (e.g. an interest
+            # rate change skips the house and application stages)
+            session = self.session
+            session.update(**inputs)
+            scores = dict(zip(OUTPUT_TYPES, session.scores()))
+            
+            # 6. Plot data
+            fuzzy_outputs = {output_type: session.get(output_type) for output_type in OUTPUT_TYPES}
+            sets = {output_type: session.get(f'{output_type}_sets') for output_type in OUTPUT_TYPES}
+            frame = prepare_frame(self.defuzz, inputs, fuzzy_outputs, scores, sets)
         except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+            self.results.put((generation, None, e))
+            return
+        self.results.put((generation, (scores, frame), None))
+
+    def poll_results(self):
+        """Show the latest result of the worker, if current; runs on the Tk thread."""
+        latest = None
+        while True:
+            try:
+                latest = self.results.get_nowait()
+            except queue.Empty:
+                break
+        
+        if latest is not None and latest[0] == self.generation:
+            _, result, error = latest
+            if error is not None:
+                messagebox.showerror("Error", f"An error occurred: {str(error)}")
+            else:
+                scores, frame = result
+                # 7. Update UI
+                self.house_score_label.config(text=f"House Score: {scores['house']:.2f} / 10")
+                self.app_score_label.config(text=f"Application Score: {scores['application']:.2f} / 10")
+                self.credit_score_label.config(text=f"Credit Score: {scores['credit']:.2f} / 1000")
+                self.show_plots(frame)
+        
+        if self.pending.done() and self.results.empty():
+            self.polling = False
+        else:
+            self.root.after(POLL_INTERVAL_MS, self.poll_results)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
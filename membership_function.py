@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def triangle_membership(x, a, b, c):
     """
     Calculate the triangular membership value for a given input x.
@@ -42,4 +45,131 @@ def trapezoidal_membership(x, a, b, c, d):
     elif c < x < d:
         return (d - x) / (d - c)
     else:
-        return 0.0
\ No newline at end of file
+        return 0.0
+
+
+def triangle_membership_array(x, a, b, c, out=None, scratch=None):
+    """
+    Vectorized version of `triangle_membership` for NumPy arrays.
+
+    Evaluates the same branches as the scalar function, including the
+    degenerate shoulders where a == b or b == c, without Python-level loops.
+
+    Parameters:
+    x (array_like): Input values of any shape.
+    a (float): The left vertex of the triangle.
+    b (float): The peak vertex of the triangle.
+    c (float): The right vertex of the triangle.
+    out (numpy.ndarray): Optional float array of x's shape receiving the result.
+    scratch (numpy.ndarray): Optional float array of x's shape for the intermediate
+                             edge; with `out`, nothing is allocated.
+
+    Returns:
+    numpy.ndarray: Membership values with the same shape as x (`out` if given).
+    """
+    x = np.asarray(x, dtype=float)
+
+    # A vertical edge (a == b or b == c) is a step at the peak.
+    result = np.empty(x.shape) if out is None else out
+    if scratch is None:
+        scratch = np.empty(x.shape)
+    if b > a:
+        np.subtract(x, a, out=result)
+        result /= b - a
+    else:
+        np.greater_equal(x, b, out=result)
+    if c > b:
+        np.subtract(c, x, out=scratch)
+        scratch /= c - b
+    else:
+        np.less_equal(x, b, out=scratch)
+    np.fmin(result, scratch, out=result)
+
+    # fmax also maps NaN inputs to 0.0, as the scalar comparisons do.
+    return np.fmax(result, 0.0, out=result)
+
+
+def trapezoidal_membership_array(x, a, b, c, d, out=None, scratch=None):
+    """
+    Vectorized version of `trapezoidal_membership` for NumPy arrays.
+
+    Evaluates the same branches as the scalar function, including the
+    degenerate shoulders where a == b or c == d, without Python-level loops.
+
+    Parameters:
+    x (array_like): Input values of any shape.
+    a (float): The left foot of the trapezoid.
+    b (float): The left shoulder of the trapezoid.
+    c (float): The right shoulder of the trapezoid.
+    d (float): The right foot of the trapezoid.
+    out (numpy.ndarray): Optional float array of x's shape receiving the result.
+    scratch (numpy.ndarray): Optional float array of x's shape for the intermediate
+                             edge; with `out`, nothing is allocated.
+
+    Returns:
+    numpy.ndarray: Membership values with the same shape as x (`out` if given).
+    """
+    x = np.asarray(x, dtype=float)
+
+    # A vertical edge (a == b or c == d) is a step at the shoulder.
+    result = np.empty(x.shape) if out is None else out
+    if scratch is None:
+        scratch = np.empty(x.shape)
+    if b > a:
+        np.subtract(x, a, out=result)
+        result /= b - a
+    else:
+        np.greater_equal(x, b, out=result)
+    if d > c:
+        np.subtract(d, x, out=scratch)
+        scratch /= d - c
+    else:
+        np.less_equal(x, c, out=scratch)
+    np.fmin(result, scratch, out=result)
+    np.fmin(result, 1.0, out=result)
+
+    # fmax also maps NaN inputs to 0.0, as the scalar comparisons do.
+    return np.fmax(result, 0.0, out=result)
+
+
+
+MEMBERSHIP_FUNCTIONS = {
+    'triangle': triangle_membership,
+    'trapezoid': trapezoidal_membership
+}
+
+MEMBERSHIP_ARRAY_FUNCTIONS = {
+    'triangle': triangle_membership_array,
+    'trapezoid': trapezoidal_membership_array
+}
+
+
+def evaluate_membership(x, shape, params):
+    """
+    Evaluate a membership function described as data.
+
+    Parameters:
+    x (float): The input value.
+    shape (str): 'triangle' or 'trapezoid'.
+    params (tuple): The vertices passed on to the membership function.
+
+    Returns:
+    float: The membership value ranging from 0 to 1.
+    """
+    return MEMBERSHIP_FUNCTIONS[shape](x, *params)
+
+
+def evaluate_membership_array(x, shape, params, out=None, scratch=None):
+    """
+    Vectorized version of `evaluate_membership` for NumPy arrays.
+
+    Parameters:
+    x (array_like): Input values of any shape.
+    shape (str): 'triangle' or 'trapezoid'.
+    params (tuple): The vertices passed on to the membership function.
+    out, scratch (numpy.ndarray): Optional buffers, as in the array membership functions.
+
+    Returns:
+    numpy.ndarray: Membership values with the same shape as x.
+    """
+    return MEMBERSHIP_ARRAY_FUNCTIONS[shape](x, *params, out=out, scratch=scratch)
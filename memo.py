@@ -0,0 +1,203 @@
+import math
+from collections import OrderedDict
+
+import fuzzification
+from defuzzification import Defuzzifier
+from inference import evaluate_application_rule, evaluate_house_rule, evaluate_loan_rule
+from instrumentation import record_cache
+from scoring import score_applicant
+
+
+# Quantization steps per crisp input, in the units of the input: market values
+# and assets to the nearest $1000, salaries to $100, location scores to one
+# decimal and interest rates to 0.05 percentage points
+DEFAULT_STEPS = {
+    'market_house': 1000.0,
+    'location_house': 0.1,
+    'application_assets': 1000.0,
+    'application_salary': 100.0,
+    'interest_rate': 0.05,
+}
+
+
+class LRUCache:
+    """A bounded mapping that evicts its least recently used entry, with hit/miss counts."""
+
+    def __init__(self, maxsize, name=None):
+        """
+        Args:
+            maxsize (int): Most entries kept
+            name (str): Optional name under which lookups are reported to `instrumentation`
+        """
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """Returns the cached value, or None on a miss."""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        if self.name is not None:
+            record_cache(self.name, value is not None)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class ScoreCache:
+    """
+    Memoizes the full scoring pipeline on quantized crisp inputs.
+
+    Every input is snapped to a multiple of its quantization step before it is
+    scored, so a cached score is exactly the score of the quantized applicant,
+    whichever raw values first filled the entry. Besides the cache of final
+    scores there are two stage caches: the house stage depends only on
+    (market, location) and the application stage only on (assets, salary),
+    so a miss on the full key can still reuse their fuzzy outputs and scores
+    and only recompute the loan stage.
+
+    Not thread-safe; use one instance per thread.
+    """
+
+    def __init__(self, maxsize=65536, stage_maxsize=16384, steps=None, defuzzifier=None, method='sampled'):
+        """
+        Args:
+            maxsize (int): Most applicants kept in the cache of final scores
+            stage_maxsize (int): Most entries kept in each of the house and application caches
+            steps (dict): Quantization step per input name (keys of DEFAULT_STEPS); entries
+                          override DEFAULT_STEPS, and a step of 0 or None disables
+                          quantization of that input
+            defuzzifier (Defuzzifier): Optional instance to reuse
+            method (str): Centroid method, 'sampled' or 'exact'
+        """
+        self.steps = dict(DEFAULT_STEPS, **(steps or {}))
+        unknown = set(self.steps) - set(DEFAULT_STEPS)
+        if unknown:
+            raise ValueError(f"Unknown inputs: {', '.join(sorted(unknown))}")
+
+        self.defuzzifier = defuzzifier if defuzzifier is not None else Defuzzifier()
+        self.method = method
+
+        self.scores = LRUCache(maxsize, 'score_cache')
+        self.house = LRUCache(stage_maxsize, 'score_cache_house')
+        self.application = LRUCache(stage_maxsize, 'score_cache_application')
+        # Steps like 0.1 are applied as a division by 10, which lands exactly on
+        # the nearest float to each grid point (3 * 0.1 != 0.3, but 3 / 10 == 0.3)
+        self._grids = []
+        for name in DEFAULT_STEPS:
+            step = self.steps[name]
+            divisor = 1.0 / step if step else None
+            if divisor is not None and divisor == round(divisor):
+                self._grids.append((step, divisor))
+            else:
+                self._grids.append((step, None))
+
+    def quantize(self, market, location, assets, salary, rate):
+        """
+        Snap crisp inputs to their quantization grids; NaN and infinite values,
+        which have no grid point, are kept as they are.
+
+        Returns:
+            tuple: (market, location, assets, salary, rate) as the values that are scored
+        """
+        quantized = []
+        for value, (step, divisor) in zip((market, location, assets, salary, rate), self._grids):
+            if not step or not math.isfinite(value):
+                quantized.append(float(value))
+            elif divisor is not None:
+                quantized.append(round(value * divisor) / divisor)
+            else:
+                quantized.append(round(value / step) * step)
+        return tuple(quantized)
+
+    def score(self, market, location, assets, salary, rate):
+        """
+        Score one applicant, reusing cached results where possible.
+
+        Args:
+            market (float): Market value of the house ($)
+            location (float): Location score of the house (0-10)
+            assets (float): Assets of the applicant ($)
+            salary (float): Salary of the applicant ($)
+            rate (float): Interest rate (%)
+
+        Returns:
+            tuple: (house_score, application_score, credit_score) of the quantized inputs
+        """
+        key = self.quantize(market, location, assets, salary, rate)
+        if not all(map(math.isfinite, key)):
+            # Scored like `score_applicant` but not cached: NaN keys never compare equal
+            return score_applicant(*key, defuzzifier=self.defuzzifier, method=self.method)
+
+        scores = self.scores.get(key)
+        if scores is not None:
+            return scores
+
+        market, location, assets, salary, rate = key
+
+        house = self.house.get((market, location))
+        if house is None:
+            fuzzy = evaluate_house_rule(fuzzification.market_value_house_fuzzification(market),
+                                        fuzzification.location_of_house_fuzzification(location))
+            house = (fuzzy, self.defuzzifier.centroid_defuzzification(fuzzy, 'house', self.method))
+            self.house.put((market, location), house)
+
+        application = self.application.get((assets, salary))
+        if application is None:
+            salary_fuzzy = fuzzification.application_salary_fuzzification(salary)
+            fuzzy = evaluate_application_rule(fuzzification.application_assets_fuzzification(assets),
+                                              salary_fuzzy)
+            application = (fuzzy, self.defuzzifier.centroid_defuzzification(fuzzy, 'application', self.method),
+                           salary_fuzzy)
+            self.application.put((assets, salary), application)
+
+        credit = evaluate_loan_rule(application[2], fuzzification.interest_rate_fuzzification(rate),
+                                    application[0], house[0])
+        scores = (house[1], application[1], self.defuzzifier.centroid_defuzzification(credit, 'credit', self.method))
+        self.scores.put(key, scores)
+        return scores
+
+    def clear(self):
+        """Drop every cached entry and reset the statistics."""
+        self.scores.clear()
+        self.house.clear()
+        self.application.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: {'scores': ..., 'house': ..., 'application': ...}, each with size, maxsize,
+                  hits, misses, evictions and hit_rate
+        """
+        return {'scores': self.scores.stats(), 'house': self.house.stats(),
+                'application': self.application.stats()}
@@ -0,0 +1,93 @@
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from scoring import score_batch
+
+
+# Worker state, set once per process by `_init_worker`
+_worker = {}
+
+
+def _init_worker(input_name, output_name, n, method, chunk_size):
+    # Pool workers share the parent's resource tracker, which unlinks the
+    # blocks only if the parent dies without cleaning up
+    input_block = shared_memory.SharedMemory(name=input_name)
+    output_block = shared_memory.SharedMemory(name=output_name)
+    _worker['blocks'] = (input_block, output_block)
+    _worker['inputs'] = np.ndarray((5, n), dtype=np.float64, buffer=input_block.buf)
+    _worker['outputs'] = np.ndarray((3, n), dtype=np.float64, buffer=output_block.buf)
+    _worker['method'] = method
+    _worker['chunk_size'] = chunk_size
+
+
+def _score_shard(bounds):
+    start, stop = bounds
+    inputs = _worker['inputs'][:, start:stop]
+    scores = score_batch(*inputs, method=_worker['method'], chunk_size=_worker['chunk_size'])
+    outputs = _worker['outputs']
+    for row, values in enumerate(scores):
+        outputs[row, start:stop] = values
+    return stop - start
+
+
+def score_batch_parallel(market, location, assets, salary, rate, workers=None,
+                         shard_size=65536, method='sampled', chunk_size=256):
+    """
+    Score a batch across a process pool, exchanging data through shared memory.
+
+    The five input columns are copied once into a shared block; each worker
+    scores contiguous shards of it and writes house, application and credit
+    scores straight into a shared output block, so no per-row objects are
+    pickled. Shards start on multiples of `chunk_size`, so every worker sees
+    the same defuzzification chunks as the serial `score_batch` and the output
+    is identical to it, whatever the worker count or scheduling order.
+
+    Call it from under `if __name__ == "__main__":` on platforms that spawn
+    worker processes (Windows, macOS).
+
+    Args:
+        market, location, assets, salary, rate (array_like): N crisp inputs, as in `score_batch`
+        workers (int): Worker processes (default: os.cpu_count()); 1 scores in-process
+        shard_size (int): Applicants per task, rounded up to a multiple of chunk_size
+        method (str): Centroid method, 'sampled' or 'exact'
+        chunk_size (int): Rows defuzzified at a time, passed on to `score_batch`
+
+    Returns:
+        tuple: (house_scores, application_scores, credit_scores), each an array of N values
+    """
+    columns = [np.ravel(np.asarray(values, dtype=np.float64))
+               for values in (market, location, assets, salary, rate)]
+    n = columns[0].size
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or n == 0:
+        return score_batch(*columns, method=method, chunk_size=chunk_size)
+
+    shard_size = -(-max(shard_size, 1) // chunk_size) * chunk_size
+    shards = [(start, min(start + shard_size, n)) for start in range(0, n, shard_size)]
+
+    input_block = shared_memory.SharedMemory(create=True, size=5 * n * 8)
+    output_block = shared_memory.SharedMemory(create=True, size=3 * n * 8)
+    try:
+        inputs = np.ndarray((5, n), dtype=np.float64, buffer=input_block.buf)
+        for row, values in enumerate(columns):
+            inputs[row] = values
+        outputs = np.ndarray((3, n), dtype=np.float64, buffer=output_block.buf)
+
+        with multiprocessing.get_context().Pool(
+                min(workers, len(shards)), initializer=_init_worker,
+                initargs=(input_block.name, output_block.name, n, method, chunk_size)) as pool:
+            for _ in pool.imap_unordered(_score_shard, shards):
+                pass
+
+        scores = tuple(np.array(row) for row in outputs)
+        del inputs, outputs
+        return scores
+    finally:
+        input_block.close()
+        input_block.unlink()
+        output_block.close()
+        output_block.unlink()
@@ -7,23 +7,52 @@ class FuzzificationPlotter:
     A class to handle plotting of fuzzification functions for various house and application parameters.
     """
     
-    def __init__(self, figsize=(14, 7)):
+    # Membership curves shared by all instances:
+    # (variable, resolution) -> (x values, {label: membership values})
+    _curve_cache = {}
+    
+    def __init__(self, figsize=(14, 7), resolution=1000):
         """
         Initialize the plotter with default figure size.
         
         Parameters:
         figsize (tuple): Default figure size for plots
+        resolution (int): Number of points sampled on each input range
         """
         self.figsize = figsize
+        self.resolution = resolution
+    
+    def curves(self, variable):
+        """
+        Membership curves of every label of an input, computed in one vectorized
+        pass on first use and cached per (variable, resolution).
+        
+        Parameters:
+        variable (str): Input name, a key of fuzzification.INPUT_CONFIGS
+        
+        Returns:
+        tuple: (x_values, {label: membership values}), read-only arrays
+        """
+        key = (variable, self.resolution)
+        if key not in FuzzificationPlotter._curve_cache:
+            from fuzzification import INPUT_CONFIGS, fuzzify_array
+            
+            config = INPUT_CONFIGS[variable]
+            x_values = np.linspace(config['range'][0], config['range'][1], self.resolution)
+            degrees = fuzzify_array(x_values, config['sets'])
+            x_values.flags.writeable = False
+            degrees.flags.writeable = False
+            FuzzificationPlotter._curve_cache[key] = (x_values, dict(zip(config['sets'], degrees.T)))
+        return FuzzificationPlotter._curve_cache[key]
     
     def plot_interest_rate_fuzzification(self, input_value=None, ax=None):
         """Plot the fuzzification of interest rates with all membership functions."""
         from fuzzification import interest_rate_fuzzification
         
-        x_values = np.linspace(0, 10, 1000)
-        low = [interest_rate_fuzzification(x)['Low'] for x in x_values]
-        medium = [interest_rate_fuzzification(x)['Medium'] for x in x_values]
-        high = [interest_rate_fuzzification(x)['High'] for x in x_values]
+        x_values, curves = self.curves('interest_rate')
+        low = curves['Low']
+        medium = curves['Medium']
+        high = curves['High']
         
         if ax is None:
             plt.figure(figsize=self.figsize)
@@ -64,11 +93,11 @@ class FuzzificationPlotter:
         """Plot the fuzzification of application salary with all membership functions."""
         from fuzzification import application_salary_fuzzification
         
-        x_values = np.linspace(0, 100000, 1000)
-        low = [application_salary_fuzzification(x)['Low'] for x in x_values]
-        medium = [application_salary_fuzzification(x)['Medium'] for x in x_values]
-        high = [application_salary_fuzzification(x)['High'] for x in x_values]
-        very_high = [application_salary_fuzzification(x)['Very High'] for x in x_values]
+        x_values, curves = self.curves('application_salary')
+        low = curves['Low']
+        medium = curves['Medium']
+        high = curves['High']
+        very_high = curves['Very High']
         
         if ax is None:
             plt.figure(figsize=self.figsize)
@@ -113,10 +142,10 @@ class FuzzificationPlotter:
         """Plot the fuzzification of application assets with all membership functions."""
         from fuzzification import application_assets_fuzzification
         
-        x_values = np.linspace(0, 1000000, 1000)
-        low = [application_assets_fuzzification(x)['Low'] for x in x_values]
-        medium = [application_assets_fuzzification(x)['Medium'] for x in x_values]
-        high = [application_assets_fuzzification(x)['High'] for x in x_values]
+        x_values, curves = self.curves('application_assets')
+        low = curves['Low']
+        medium = curves['Medium']
+        high = curves['High']
         
         if ax is None:
             plt.figure(figsize=self.figsize)
@@ -159,11 +188,11 @@ class FuzzificationPlotter:
         """Plot the fuzzification of house market values with all membership functions."""
         from fuzzification import market_value_house_fuzzification
         
-        x_values = np.linspace(0, 1000000, 1000)
-        low = [market_value_house_fuzzification(x)['Low'] for x in x_values]
-        medium = [market_value_house_fuzzification(x)['Medium'] for x in x_values]
-        high = [market_value_house_fuzzification(x)['High'] for x in x_values]
-        very_high = [market_value_house_fuzzification(x)['Very High'] for x in x_values]
+        x_values, curves = self.curves('market_house')
+        low = curves['Low']
+        medium = curves['Medium']
+        high = curves['High']
+        very_high = curves['Very High']
         
         if ax is None:
             plt.figure(figsize=self.figsize)
@@ -208,10 +237,10 @@ class FuzzificationPlotter:
         """Plot the fuzzification of house location with all membership functions."""
         from fuzzification import location_of_house_fuzzification
         
-        x_values = np.linspace(0, 10, 1000)
-        bad = [location_of_house_fuzzification(x)['Bad'] for x in x_values]
-        fair = [location_of_house_fuzzification(x)['Fair'] for x in x_values]
-        excellent = [location_of_house_fuzzification(x)['Excellent'] for x in x_values]
+        x_values, curves = self.curves('location_house')
+        bad = curves['Bad']
+        fair = curves['Fair']
+        excellent = curves['Excellent']
         
         if ax is None:
             plt.figure(figsize=self.figsize)
@@ -0,0 +1,232 @@
+"""
+Headless explanation reports for declined applicants.
+
+Scores a CSV or JSON-lines file of applicants with the vectorized pipeline,
+then renders one report per declined applicant (credit score below a
+threshold): the input fuzzification and defuzzification plots of the GUI,
+headed by the applicant's scores. Reports are rendered with the Agg backend
+across a process pool. Each worker builds its figure once, with the
+membership curves and axes drawn and cached, and then only redraws the
+applicant-specific parts of every report. Reports are written as one PNG
+per applicant or as the pages of a single PDF.
+
+Usage:
+    python reports.py applicants.csv -o reports/ --declined-below 500
+    python reports.py applicants.jsonl -o declined.pdf --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from batch_score import INPUT_COLUMNS, detect_format, read_records
+from defuzzification import Defuzzifier
+from fuzzy_vector import FuzzyVector
+from scoring import score_batch
+
+
+OUTPUT_TYPES = ('house', 'application', 'credit')
+
+# Worker state, set once per process by `_init_worker`
+_worker = {}
+
+
+def declined_jobs(records, threshold, id_column=None, method='sampled'):
+    """
+    Score applicants and describe the report of each declined one.
+
+    Args:
+        records (list): Dicts holding at least INPUT_COLUMNS
+        threshold (float): Applicants with a credit score below it are declined
+        id_column (str): Optional column naming each applicant (default: the 1-based row number)
+        method (str): Centroid method, 'sampled' or 'exact'
+
+    Returns:
+        list: (name, row, inputs, {output_type: rule strengths}, {output_type: score})
+              per declined applicant, in input order; row is the 1-based input row
+    """
+    try:
+        columns = [np.array([record[name] for record in records], dtype=float) for name in INPUT_COLUMNS]
+    except KeyError as error:
+        raise ValueError(f"Missing input column: {error.args[0]}") from None
+    *scores, degrees = score_batch(*columns, return_degrees=True, method=method)
+
+    jobs = []
+    for row in np.flatnonzero(scores[2] < threshold):
+        name = str(records[row][id_column]) if id_column else f"{row + 1:06d}"
+        jobs.append((
+            name,
+            int(row) + 1,
+            {column: float(values[row]) for column, values in zip(INPUT_COLUMNS, columns)},
+            {output_type: degrees[output_type][row] for output_type in OUTPUT_TYPES},
+            {output_type: float(values[row]) for output_type, values in zip(OUTPUT_TYPES, scores)},
+        ))
+    return jobs
+
+
+def _init_worker(dpi):
+    import matplotlib
+    matplotlib.use('Agg')
+    from live_plots import LivePlots, prepare_frame
+
+    defuzzifier = Defuzzifier()
+    plots = LivePlots(defuzzifier, dpi=dpi, header=True)
+    plots.redraw()  # draws and caches the static background
+    _worker.update(defuzzifier=defuzzifier, plots=plots, prepare_frame=prepare_frame,
+                   labels={output_type: tuple(config['sets'])
+                           for output_type, config in defuzzifier.output_configs.items()})
+
+
+def _render(job):
+    # Returns the PNG path written, or the pixels of the report when path is None
+    (name, _, inputs, strengths, scores), path = job
+    fuzzy_outputs = {output_type: FuzzyVector(_worker['labels'][output_type], values)
+                     for output_type, values in strengths.items()}
+    frame = _worker['prepare_frame'](_worker['defuzzifier'], inputs, fuzzy_outputs, scores)
+    frame['title'] = (f"Applicant {name}: credit {scores['credit']:.2f} / 1000, "
+                      f"house {scores['house']:.2f} / 10, application {scores['application']:.2f} / 10")
+    plots = _worker['plots']
+    plots.show(frame)
+    if path is None:
+        return plots.snapshot()
+    from matplotlib.image import imsave
+    # zlib level 1 encodes about twice as fast as the default for ~6% larger files
+    imsave(path, plots.snapshot(), pil_kwargs={'compress_level': 1})
+    return path
+
+
+def _file_names(jobs):
+    # One PNG name per job. Ids that sanitize to the same name, or differ only
+    # in case (one file on Windows and macOS), all get their row number
+    names = [re.sub(r'[^\w.-]', '_', name) for name, *_ in jobs]
+    counts = Counter(name.casefold() for name in names)
+    names = [f"{name}_row{row}" if counts[name.casefold()] > 1 else name
+             for name, (_, row, *_) in zip(names, jobs)]
+    # A suffixed name can still meet another id (e.g. "a_row2"): fail rather than overwrite
+    seen = {}
+    for name, (job_name, *_) in zip(names, jobs):
+        key = name.casefold()
+        if key in seen:
+            raise ValueError(f"Applicants {seen[key]!r} and {job_name!r} map to the same report file {name}.png")
+        seen[key] = job_name
+    return [name + '.png' for name in names]
+
+
+def render_reports(jobs, output, workers=None, dpi=100):
+    """
+    Render the reports of `declined_jobs`.
+
+    Call it from under `if __name__ == "__main__":` on platforms that spawn
+    worker processes (Windows, macOS).
+
+    Args:
+        jobs (list): Items of `declined_jobs`
+        output (str): A directory for one PNG per applicant, named after its id (with
+                      "_row<N>" appended to ids whose names would collide), or a path
+                      ending in .pdf for a single PDF with one page per applicant, in order
+        workers (int): Worker processes (default: os.cpu_count()); 1 renders in-process
+        dpi (float): Resolution of the reports
+
+    Returns:
+        int: Reports written
+
+    Raises:
+        ValueError: Two applicants would still share a PNG file
+    """
+    to_pdf = output.lower().endswith('.pdf')
+    if to_pdf:
+        tasks = [(job, None) for job in jobs]
+    else:
+        names = _file_names(jobs)
+        os.makedirs(output, exist_ok=True)
+        tasks = [(job, os.path.join(output, name)) for job, name in zip(jobs, names)]
+
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    if workers == 1:
+        _init_worker(dpi)
+        results = map(_render, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(dpi,))
+        results = pool.imap(_render, tasks, chunksize=max(1, min(16, len(tasks) // (4 * workers))))
+
+    written = 0
+    try:
+        if not to_pdf:
+            for _ in results:
+                written += 1
+        else:
+            # Pages hold the reports as images; one page figure is reused throughout
+            from matplotlib.backends.backend_pdf import PdfPages
+            from matplotlib.figure import Figure
+            page = image = None
+            with PdfPages(output) as pdf:
+                for pixels in results:
+                    if page is None:
+                        page = Figure(figsize=(pixels.shape[1] / dpi, pixels.shape[0] / dpi), dpi=dpi)
+                        image = page.figimage(pixels)
+                    else:
+                        image.set_data(pixels)
+                    pdf.savefig(page, dpi=dpi)
+                    written += 1
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render explanation reports for declined credit applicants.")
+    parser.add_argument('input', help="Input file (CSV or JSON lines), or - for stdin")
+    parser.add_argument('-o', '--output', required=True,
+                        help="Directory for one PNG per applicant, or a .pdf file for a multi-page PDF")
+    parser.add_argument('--input-format', choices=('csv', 'jsonl'),
+                        help="Defaults to the input file extension, else csv")
+    parser.add_argument('--declined-below', type=float, default=500.0,
+                        help="Credit score under which an applicant is declined (default: 500)")
+    parser.add_argument('--id-column', help="Column naming each applicant (default: row number)")
+    parser.add_argument('--method', choices=('sampled', 'exact'), default='sampled',
+                        help="Centroid method (default: sampled, as in the GUI)")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--dpi', type=float, default=100.0, help="Report resolution (default: 100)")
+    args = parser.parse_args(argv)
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be positive")
+
+    input_format = args.input_format or detect_format(args.input)
+    try:
+        input_stream = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+        try:
+            records = list(read_records(input_stream, input_format))
+        finally:
+            if input_stream is not sys.stdin:
+                input_stream.close()
+    except OSError as error:
+        parser.exit(1, f"error: {error}\n")
+
+    try:
+        jobs = declined_jobs(records, args.declined_below, args.id_column, args.method)
+    except (KeyError, ValueError) as error:
+        parser.exit(1, f"error: {error}\n")
+
+    start = time.perf_counter()
+    try:
+        written = render_reports(jobs, args.output, args.workers, args.dpi)
+    except (OSError, ValueError) as error:
+        parser.exit(1, f"error: {error}\n")
+    elapsed = time.perf_counter() - start
+    rate = written / elapsed if elapsed > 0 else float('inf')
+    print(f"Rendered {written} reports for {len(records)} applicants in {elapsed:.2f} s "
+          f"({rate:,.1f} reports/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
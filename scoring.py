@@ -0,0 +1,167 @@
+import numpy as np
+
+import fuzzification
+from defuzzification import Defuzzifier
+from inference import (APPLICATION_RULE_BASE, HOUSE_RULE_BASE, LOAN_RULE_BASE,
+                       evaluate_application_rule, evaluate_house_rule, evaluate_loan_rule)
+from instrumentation import instrumented
+
+
+# Batch scores agree with `score_applicant` (same centroid method) to within
+# this many score units. Both paths use the same compiled grid; they differ
+# only in floating point summation order (observed differences are ~1e-12).
+BATCH_TOLERANCE = 1e-9
+
+
+@instrumented('scoring.score_applicant')
+def score_applicant(market, location, assets, salary, rate, defuzzifier=None, method='sampled', sparse=False):
+    """
+    Score one applicant exactly as `FuzzyLogicApp.calculate` does.
+
+    Args:
+        market (float): Market value of the house ($)
+        location (float): Location score of the house (0-10)
+        assets (float): Assets of the applicant ($)
+        salary (float): Salary of the applicant ($)
+        rate (float): Interest rate (%)
+        defuzzifier (Defuzzifier): Optional instance to reuse
+        method (str): Centroid method, 'sampled' or 'exact'
+        sparse (bool): Fuzzify through the breakpoint indexes and evaluate only the
+                       rules whose antecedents are all active (same scores)
+
+    Returns:
+        tuple: (house_score, application_score, credit_score)
+    """
+    if defuzzifier is None:
+        defuzzifier = Defuzzifier()
+
+    if sparse:
+        house, application, credit = _active_set_rules(market, location, assets, salary, rate)
+        return (
+            defuzzifier.centroid_defuzzification(house, 'house', method),
+            defuzzifier.centroid_defuzzification(application, 'application', method),
+            defuzzifier.centroid_defuzzification(credit, 'credit', method)
+        )
+
+    fuzzified_market = fuzzification.market_value_house_fuzzification(market)
+    fuzzified_location = fuzzification.location_of_house_fuzzification(location)
+    fuzzified_assets = fuzzification.application_assets_fuzzification(assets)
+    fuzzified_salary = fuzzification.application_salary_fuzzification(salary)
+    fuzzified_rate = fuzzification.interest_rate_fuzzification(rate)
+
+    house = evaluate_house_rule(fuzzified_market, fuzzified_location)
+    application = evaluate_application_rule(fuzzified_assets, fuzzified_salary)
+    credit = evaluate_loan_rule(fuzzified_salary, fuzzified_rate, application, house)
+
+    return (
+        defuzzifier.centroid_defuzzification(house, 'house', method),
+        defuzzifier.centroid_defuzzification(application, 'application', method),
+        defuzzifier.centroid_defuzzification(credit, 'credit', method)
+    )
+
+
+def _active_set_rules(market, location, assets, salary, rate):
+    # The rule stages of one applicant on active labels only
+    indexes = fuzzification.BREAKPOINT_INDEXES
+    salary_labels = indexes['application_salary'].active(salary)
+    house = HOUSE_RULE_BASE.evaluate_active({
+        'market': indexes['market_house'].active(market),
+        'location': indexes['location_house'].active(location)
+    })
+    application = APPLICATION_RULE_BASE.evaluate_active({
+        'assets': indexes['application_assets'].active(assets),
+        'salary': salary_labels
+    })
+    credit = LOAN_RULE_BASE.evaluate_active({
+        'salary': salary_labels,
+        'interest': indexes['interest_rate'].active(rate),
+        'application': application.active(),
+        'house': house.active()
+    })
+    return house, application, credit
+
+
+def _matrix_to_degrees(matrix, labels):
+    return dict(zip(labels, matrix.T))
+
+
+@instrumented('scoring.score_batch', batch_size=lambda market, *args, **kwargs: np.size(market))
+def score_batch(market, location, assets, salary, rate, return_degrees=False,
+                defuzzifier=None, chunk_size=256, method='sampled', defuzzification=None):
+    """
+    Score a batch of applicants given as columnar arrays.
+
+    Runs the same pipeline as `score_applicant` (fuzzification, the three
+    rule stages and three centroids) on whole columns at once. Scores match
+    the per-applicant path to within BATCH_TOLERANCE.
+
+    Args:
+        market (array_like): N market values of the house ($)
+        location (array_like): N location scores of the house (0-10)
+        assets (array_like): N asset values of the applicants ($)
+        salary (array_like): N salaries of the applicants ($)
+        rate (array_like): N interest rates (%)
+        return_degrees (bool): Also return the intermediate fuzzy degrees
+        defuzzifier (Defuzzifier): Optional instance to reuse
+        chunk_size (int): Rows defuzzified at a time
+        method (str): Centroid method, 'sampled' or 'exact'
+        defuzzification (str or dict): Optional defuzzification method (a key of
+                                       defuzzification.DEFUZZIFICATION_METHODS), or
+                                       {output type: method}; outputs not given one
+                                       use the centroid selected by `method`
+
+    Returns:
+        tuple: (house_scores, application_scores, credit_scores), each an array
+               of N values. With return_degrees=True a fourth element is a dict
+               of N x labels matrices keyed by input name ('market_house', ...)
+               and by rule stage ('house', 'application', 'credit'); the column
+               order is the label order of the matching configuration.
+    """
+    if defuzzifier is None:
+        defuzzifier = Defuzzifier()
+
+    crisp_inputs = {
+        'market_house': market,
+        'location_house': location,
+        'application_assets': assets,
+        'application_salary': salary,
+        'interest_rate': rate
+    }
+    # Fuzzified inputs as N x labels matrices; the label order of INPUT_CONFIGS
+    # is the column order the rule bases are compiled for
+    degrees = {
+        name: fuzzification.fuzzify_array(np.ravel(values), fuzzification.INPUT_CONFIGS[name]['sets'])
+        for name, values in crisp_inputs.items()
+    }
+
+    degrees['house'] = HOUSE_RULE_BASE.evaluate({
+        'market': degrees['market_house'],
+        'location': degrees['location_house']
+    })
+    degrees['application'] = APPLICATION_RULE_BASE.evaluate({
+        'assets': degrees['application_assets'],
+        'salary': degrees['application_salary']
+    })
+    degrees['credit'] = LOAN_RULE_BASE.evaluate({
+        'salary': degrees['application_salary'],
+        'interest': degrees['interest_rate'],
+        'application': degrees['application'],
+        'house': degrees['house']
+    })
+
+    if not isinstance(defuzzification, dict):
+        defuzzification = dict.fromkeys(('house', 'application', 'credit'), defuzzification)
+
+    scores = tuple(
+        defuzzifier.defuzzify_batch(_matrix_to_degrees(degrees[output_type], rule_base.outputs), output_type,
+                                    defuzzification[output_type], chunk_size)
+        if defuzzification.get(output_type) else
+        defuzzifier.centroid_defuzzification_batch(
+            _matrix_to_degrees(degrees[output_type], rule_base.outputs), output_type, chunk_size, method)
+        for output_type, rule_base in (('house', HOUSE_RULE_BASE), ('application', APPLICATION_RULE_BASE),
+                                       ('credit', LOAN_RULE_BASE))
+    )
+
+    if not return_degrees:
+        return scores
+    return scores + (degrees,)
@@ -0,0 +1,202 @@
+"""
+Sensitivity of the scores to each crisp input.
+
+`score_sensitivities` returns, for a whole batch of applicants, the partial
+derivatives of the house, application and credit scores with respect to the
+five inputs, by central differences evaluated in one vectorized pass. Each
+rule stage only re-runs for the perturbations of the inputs it depends on
+(house: market and location; application: assets and salary; credit: all
+five), so a batch costs about 7x `score_batch` instead of 11x.
+
+The membership functions are piecewise linear, so the scores have kinks:
+within `relative_step` of one (e.g. an input exactly on a vertex) the result
+is a blend of the one-sided derivatives. Perturbed inputs are clamped to
+their range in fuzzification.INPUT_CONFIGS, past which every degree is 0, so
+inputs within a step of a range end get a one-sided difference. Use the
+exact centroid (the default); the sampled centroid is a step function of the
+strengths at this scale and its differences are dominated by the sampling.
+
+Run the module to check the sensitivities at both ends of every input's range
+against one-sided differences of `score_batch`:
+
+Usage:
+    python sensitivity.py
+"""
+import sys
+
+import numpy as np
+
+import fuzzification
+from defuzzification import Defuzzifier
+from inference import APPLICATION_RULE_BASE, HOUSE_RULE_BASE, LOAN_RULE_BASE
+from instrumentation import instrumented
+from scoring import score_batch
+
+
+INPUT_NAMES = tuple(fuzzification.INPUT_CONFIGS)
+
+# Inputs each output depends on
+DEPENDENCIES = {
+    'house': ('market_house', 'location_house'),
+    'application': ('application_assets', 'application_salary'),
+    'credit': INPUT_NAMES,
+}
+
+
+def _variants(base, changed, names):
+    # Stack the base rows, then the +step and -step rows of each name in turn;
+    # `changed` maps the names that move this matrix to its (+step, -step) rows
+    blocks = [base]
+    for name in names:
+        blocks.extend(changed.get(name, (base, base)))
+    return np.concatenate(blocks)
+
+
+@instrumented('sensitivity.score_sensitivities', batch_size=lambda market, *args, **kwargs: np.size(market))
+def score_sensitivities(market, location, assets, salary, rate, defuzzifier=None, chunk_size=256,
+                        method='exact', relative_step=1e-6):
+    """
+    Score a batch of applicants and differentiate each score by each input.
+
+    Args:
+        market (array_like): N market values of the house ($)
+        location (array_like): N location scores of the house (0-10)
+        assets (array_like): N asset values of the applicants ($)
+        salary (array_like): N salaries of the applicants ($)
+        rate (array_like): N interest rates (%)
+        defuzzifier (Defuzzifier): Optional instance to reuse
+        chunk_size (int): Rows defuzzified at a time
+        method (str): Centroid method, 'exact' or 'sampled' (see the module docstring)
+        relative_step (float): Half-width of the central difference, as a fraction
+                               of each input's range in fuzzification.INPUT_CONFIGS
+
+    Returns:
+        tuple: (scores, sensitivities). scores is {output_type: N scores}, as from
+               `score_batch` with the same `method` (note that `score_batch`
+               defaults to 'sampled'); sensitivities is {output_type: N x 5 matrix}, columns in
+               INPUT_NAMES order, in score units per input unit (e.g. credit points
+               per $ of salary). Inputs an output does not depend on have zero columns.
+    """
+    if defuzzifier is None:
+        defuzzifier = Defuzzifier()
+
+    crisp_inputs = dict(zip(INPUT_NAMES, (np.ravel(np.asarray(values, dtype=float))
+                                          for values in (market, location, assets, salary, rate))))
+    n = crisp_inputs['market_house'].size
+
+    # Fuzzified inputs at the point and at +/- one step of each input, clamped
+    # to the input's range; steps holds the N distances actually spanned
+    steps = {}
+    base = {}
+    perturbed = {}
+    for name, values in crisp_inputs.items():
+        config = fuzzification.INPUT_CONFIGS[name]
+        low, high = config['range']
+        step = relative_step * (high - low)
+        upper = np.clip(values + step, low, high)
+        lower = np.clip(values - step, low, high)
+        steps[name] = upper - lower
+        base[name] = fuzzification.fuzzify_array(values, config['sets'])
+        perturbed[name] = {name: (fuzzification.fuzzify_array(upper, config['sets']),
+                                  fuzzification.fuzzify_array(lower, config['sets']))}
+
+    # Rule stages on the base rows followed by the +/- rows of each dependency
+    strengths = {
+        'house': HOUSE_RULE_BASE.evaluate({
+            'market': _variants(base['market_house'], perturbed['market_house'], DEPENDENCIES['house']),
+            'location': _variants(base['location_house'], perturbed['location_house'], DEPENDENCIES['house']),
+        }),
+        'application': APPLICATION_RULE_BASE.evaluate({
+            'assets': _variants(base['application_assets'], perturbed['application_assets'],
+                                DEPENDENCIES['application']),
+            'salary': _variants(base['application_salary'], perturbed['application_salary'],
+                                DEPENDENCIES['application']),
+        }),
+    }
+    # The credit stage takes the house and application strengths of each
+    # perturbation, reusing the base rows for inputs they do not depend on
+    stage_variants = {}
+    for output_type in ('house', 'application'):
+        rows = strengths[output_type].reshape(-1, n, strengths[output_type].shape[1])
+        stage_variants[output_type] = (rows[0], dict(zip(DEPENDENCIES[output_type], zip(rows[1::2], rows[2::2]))))
+    strengths['credit'] = LOAN_RULE_BASE.evaluate({
+        'salary': _variants(base['application_salary'], perturbed['application_salary'], INPUT_NAMES),
+        'interest': _variants(base['interest_rate'], perturbed['interest_rate'], INPUT_NAMES),
+        'application': _variants(*stage_variants['application'], INPUT_NAMES),
+        'house': _variants(*stage_variants['house'], INPUT_NAMES),
+    })
+
+    scores = {}
+    sensitivities = {}
+    for output_type, rule_base in (('house', HOUSE_RULE_BASE), ('application', APPLICATION_RULE_BASE),
+                                   ('credit', LOAN_RULE_BASE)):
+        values = defuzzifier.centroid_defuzzification_batch(
+            dict(zip(rule_base.outputs, strengths[output_type].T)), output_type, chunk_size, method).reshape(-1, n)
+        scores[output_type] = values[0]
+        sensitivities[output_type] = np.zeros((n, len(INPUT_NAMES)))
+        for index, name in enumerate(DEPENDENCIES[output_type]):
+            # Inputs outside their range clamp both sides to one end: no step, zero slope
+            np.divide(values[1 + 2 * index] - values[2 + 2 * index], steps[name],
+                      out=sensitivities[output_type][:, INPUT_NAMES.index(name)], where=steps[name] > 0)
+    return scores, sensitivities
+
+
+def check_range_ends(relative_step=1e-6, tolerance=1e-3):
+    """
+    Compare the sensitivities at both ends of each input's range with
+    one-sided differences of `score_batch` (exact centroid) into the range.
+
+    Every applicant is the midpoint of all ranges with one input moved to an
+    end; the difference is taken over the same step as `score_sensitivities`.
+
+    Args:
+        relative_step (float): Step, as in `score_sensitivities`
+        tolerance (float): Largest allowed difference, relative to the range
+                           of the scores per range of the input
+
+    Returns:
+        list: (input name, end value, output type, sensitivity, expected) of every mismatch
+    """
+    midpoints = {name: sum(config['range']) / 2 for name, config in fuzzification.INPUT_CONFIGS.items()}
+    cases = [(name, end) for name, config in fuzzification.INPUT_CONFIGS.items() for end in config['range']]
+    rows = []
+    for name, end in cases:
+        config = fuzzification.INPUT_CONFIGS[name]
+        step = relative_step * (config['range'][1] - config['range'][0])
+        inside = end + step if end == config['range'][0] else end - step
+        for value in (end, inside):
+            rows.append([value if other == name else midpoint for other, midpoint in midpoints.items()])
+    columns = np.array(rows).T
+
+    defuzzifier = Defuzzifier()
+    _, sensitivities = score_sensitivities(*columns[:, ::2], defuzzifier=defuzzifier, relative_step=relative_step)
+    batch_scores = dict(zip(('house', 'application', 'credit'),
+                            score_batch(*columns, defuzzifier=defuzzifier, method='exact')))
+
+    mismatches = []
+    for row, (name, end) in enumerate(cases):
+        config = fuzzification.INPUT_CONFIGS[name]
+        input_range = config['range'][1] - config['range'][0]
+        inside = columns[INPUT_NAMES.index(name), 2 * row + 1]
+        for output_type, values in batch_scores.items():
+            output_range = defuzzifier.output_configs[output_type]['range']
+            scale = (output_range[1] - output_range[0]) / input_range
+            expected = (values[2 * row + 1] - values[2 * row]) / (inside - end)
+            sensitivity = sensitivities[output_type][row, INPUT_NAMES.index(name)]
+            if abs(sensitivity - expected) > tolerance * scale:
+                mismatches.append((name, end, output_type, sensitivity, expected))
+    return mismatches
+
+
+def main():
+    mismatches = check_range_ends()
+    for name, end, output_type, sensitivity, expected in mismatches:
+        print(f"MISMATCH d{output_type}/d{name} at {end}: {sensitivity:.6g}, expected {expected:.6g}")
+    if mismatches:
+        return 1
+    print("Sensitivities at the range ends match one-sided differences")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,380 @@
+"""
+Local HTTP/JSON scoring service.
+
+Built on asyncio streams from the standard library only. Concurrent
+single-applicant requests are coalesced into micro-batches and scored with
+one vectorized `score_batch` call, which amortizes the per-request Python
+overhead of the pipeline under load.
+
+Endpoints:
+    POST /score   {"market_house": ..., "location_house": ..., "application_assets": ...,
+                   "application_salary": ..., "interest_rate": ...}
+                  -> {"house_score": ..., "application_score": ..., "credit_score": ...}
+    GET  /health  -> {"status": "ok", ...batching statistics}
+    GET  /metrics -> pipeline metrics in Prometheus text format (with --metrics)
+
+Usage:
+    python service.py --port 8080 --max-batch-size 256 --max-wait-us 500
+    python service.py --check-shutdown    # check that a graceful shutdown logs nothing
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import logging
+import signal
+import sys
+import time
+
+import numpy as np
+
+from batch_score import INPUT_COLUMNS, SCORE_COLUMNS
+import instrumentation
+from defuzzification import Defuzzifier
+from scoring import score_batch
+
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 503: 'Service Unavailable'}
+MAX_BODY_SIZE = 64 * 1024
+
+
+class MicroBatcher:
+    """
+    Coalesces single-applicant requests into batches scored by one vectorized call.
+
+    A batch is closed once it holds `max_batch_size` applicants or
+    `max_wait_us` microseconds after its first applicant arrived, whichever
+    comes first. Batches are scored one at a time in a worker thread; while
+    one is being scored, new requests queue up and form the next, so batches
+    grow with the load by themselves.
+    """
+
+    def __init__(self, max_batch_size=256, max_wait_us=500, method='sampled'):
+        """
+        Args:
+            max_batch_size (int): Most applicants scored per call
+            max_wait_us (float): Longest time (microseconds) the first applicant of a batch waits for others
+            method (str): Centroid method, 'sampled' or 'exact'
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_us / 1e6
+        self.method = method
+        self.defuzzifier = Defuzzifier()
+
+        self.batches = 0
+        self.scored = 0
+
+        self._queue = asyncio.Queue()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Score every applicant already queued, then stop the batching task."""
+        await self._queue.put(None)
+        await self._task
+        self._executor.shutdown()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    async def score(self, inputs):
+        """
+        Score one applicant as part of the next batch.
+
+        Args:
+            inputs (tuple): The five crisp inputs, in INPUT_COLUMNS order
+
+        Returns:
+            tuple: (house_score, application_score, credit_score)
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((inputs, future))
+        return await future
+
+    async def _collect(self):
+        # Wait for the first applicant, then gather more until the batch is
+        # full or its deadline passes. Returns (batch, stopping)
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _score_batch(self, columns):
+        return np.column_stack(score_batch(*columns, defuzzifier=self.defuzzifier,
+                                           method=self.method)).tolist()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._collect()
+            if not batch:
+                continue
+            columns = np.array([inputs for inputs, _ in batch], dtype=float).T
+            try:
+                rows = await loop.run_in_executor(self._executor, self._score_batch, columns)
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            for (_, future), row in zip(batch, rows):
+                if not future.done():
+                    future.set_result(tuple(row))
+            self.batches += 1
+            self.scored += len(batch)
+
+
+class ScoringService:
+    """Minimal HTTP/1.1 front end (keep-alive, JSON bodies) for a MicroBatcher."""
+
+    def __init__(self, batcher, host='127.0.0.1', port=8080):
+        self.batcher = batcher
+        self.host = host
+        self.port = port
+        self.started = None
+        self._server = None
+        self._connections = set()
+        self._idle = set()  # readers of connections waiting for their next request
+        self._closing = False
+
+    async def start(self):
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.started = time.time()
+
+    async def shutdown(self):
+        """Stop accepting connections, answer requests in flight, then stop the batcher."""
+        self._closing = True
+        self._server.close()
+        # Keep-alive connections waiting for their next request read an end of
+        # stream and close; cancelling their handlers would log the cancellation
+        for reader in self._idle:
+            reader.feed_eof()
+        await self._server.wait_closed()
+        if self._connections:
+            await asyncio.wait(self._connections)
+        await self.batcher.stop()
+
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while not self._closing:
+                self._idle.add(reader)
+                try:
+                    request = await self._read_request(reader)
+                except ValueError as error:
+                    # The stream cannot be resynchronized after a malformed request
+                    self._write_response(writer, 400, {'error': str(error)}, keep_alive=False)
+                    await writer.drain()
+                    break
+                finally:
+                    self._idle.discard(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self._dispatch(method, path, body)
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and not self._closing and status != 413)
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _read_request(self, reader):
+        # Returns (method, path, headers, body), or None once the client is done;
+        # raises ValueError on a malformed request line or Content-Length
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        parts = request_line.decode('latin-1').split(' ', 2)
+        if len(parts) != 3:
+            raise ValueError("Malformed request line")
+        method, path, _ = parts
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise ValueError("Invalid Content-Length") from None
+        if length < 0:
+            raise ValueError("Invalid Content-Length")
+        body = await reader.readexactly(length) if 0 < length <= MAX_BODY_SIZE else b''
+        if length > MAX_BODY_SIZE:
+            return method, path, {'connection': 'close'}, None
+        return method, path, headers, body
+
+    async def _dispatch(self, method, path, body):
+        path = path.split('?', 1)[0]
+        if path == '/health':
+            if method != 'GET':
+                return 405, {'error': "Use GET /health"}
+            return 200, {
+                'status': 'closing' if self._closing else 'ok',
+                'uptime_s': time.time() - self.started,
+                'pending': self.batcher.pending,
+                'batches': self.batcher.batches,
+                'scored': self.batcher.scored,
+                'mean_batch_size': self.batcher.scored / self.batcher.batches if self.batcher.batches else 0.0,
+            }
+        if path == '/metrics':
+            if method != 'GET':
+                return 405, {'error': "Use GET /metrics"}
+            if not instrumentation.is_enabled():
+                return 404, {'error': "Metrics are disabled; start the service with --metrics"}
+            return 200, instrumentation.prometheus_text()
+        if path == '/score':
+            if method != 'POST':
+                return 405, {'error': "Use POST /score"}
+            if body is None:
+                return 413, {'error': f"Body larger than {MAX_BODY_SIZE} bytes"}
+            if self._closing:
+                return 503, {'error': "Shutting down"}
+            try:
+                record = json.loads(body)
+                inputs = tuple(float(record[name]) for name in INPUT_COLUMNS)
+            except KeyError as error:
+                return 400, {'error': f"Missing input column: {error.args[0]}"}
+            except (ValueError, TypeError):
+                return 400, {'error': "Body must be a JSON object of numeric inputs: " + ', '.join(INPUT_COLUMNS)}
+            scores = await self.batcher.score(inputs)
+            return 200, dict(zip(SCORE_COLUMNS, scores))
+        return 404, {'error': f"No such endpoint: {path}"}
+
+    @staticmethod
+    def _write_response(writer, status, payload, keep_alive):
+        # Text payloads are metrics, everything else is JSON
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), 'text/plain; version=0.0.4'
+        else:
+            body, content_type = json.dumps(payload).encode(), 'application/json'
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+        )
+
+
+async def serve(host='127.0.0.1', port=8080, max_batch_size=256, max_wait_us=500, method='sampled'):
+    """Run the service until SIGINT or SIGTERM, then shut it down gracefully."""
+    service = ScoringService(MicroBatcher(max_batch_size, max_wait_us, method), host, port)
+    await service.start()
+    print(f"Scoring service listening on http://{service.host}:{service.port}", flush=True)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except NotImplementedError:  # Windows event loops
+            signal.signal(signum, lambda *_: loop.call_soon_threadsafe(stop.set))
+    await stop.wait()
+
+    print("Shutting down...", flush=True)
+    await service.shutdown()
+
+
+async def check_idle_shutdown():
+    """
+    Shut a service down while a keep-alive client sits idle between requests.
+
+    Returns:
+        list: Messages asyncio logged meanwhile; a graceful shutdown logs none
+    """
+    class Collector(logging.Handler):
+        def emit(self, record):
+            messages.append(record.getMessage())
+
+    messages = []
+    handler = Collector()
+    logger = logging.getLogger('asyncio')
+    logger.addHandler(handler)
+    try:
+        service = ScoringService(MicroBatcher(), port=0)
+        await service.start()
+        reader, writer = await asyncio.open_connection(service.host, service.port)
+        writer.write(b"GET /health HTTP/1.1\r\n\r\n")
+        await writer.drain()
+        headers = await reader.readuntil(b"\r\n\r\n")
+        length = int(headers.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+        await reader.readexactly(length)  # the connection is now idle, kept alive
+        await service.shutdown()
+        await reader.read()
+        writer.close()
+        await asyncio.sleep(0)  # let callbacks of the closed connections run
+    finally:
+        logger.removeHandler(handler)
+    return messages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve credit scores over HTTP with micro-batching.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-batch-size', type=int, default=256, help="Most applicants scored per call")
+    parser.add_argument('--max-wait-us', type=float, default=500,
+                        help="Longest wait (microseconds) for a batch to fill")
+    parser.add_argument('--method', choices=('sampled', 'exact'), default='sampled',
+                        help="Centroid method (default: sampled, as in the GUI)")
+    parser.add_argument('--metrics', action='store_true',
+                        help="Record pipeline metrics and serve them at GET /metrics")
+    parser.add_argument('--check-shutdown', action='store_true',
+                        help="Check that shutting down with an idle keep-alive client logs nothing, then exit")
+    args = parser.parse_args(argv)
+
+    if args.check_shutdown:
+        messages = asyncio.run(check_idle_shutdown())
+        for message in messages:
+            print(f"LOGGED: {message}")
+        if messages:
+            return 1
+        print("Graceful shutdown with an idle keep-alive client logged nothing")
+        return 0
+
+    if args.max_batch_size < 1:
+        parser.error("--max-batch-size must be positive")
+    if args.max_wait_us < 0:
+        parser.error("--max-wait-us must not be negative")
+
+    if args.metrics:
+        instrumentation.enable()
+    asyncio.run(serve(args.host, args.port, args.max_batch_size, args.max_wait_us, args.method))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Incremental scoring of one applicant whose inputs change a few at a time.
+
+The pipeline is a DAG: each crisp input is fuzzified on its own; the house
+stage reads (market, location), the application stage (assets, salary) and
+the loan stage (salary, interest rate, application, house); each stage
+output has its centroid and its clipped / aggregated sets. A
+`ScoringSession` caches every node and, when inputs change, drops only the
+nodes downstream of them. Changing the interest rate, for example, re-runs
+its fuzzification, the loan stage and the credit centroid, and reuses the
+house and application stages and their centroids.
+
+Nodes are computed on first read, so the sets of the plots cost nothing
+unless they are asked for. Not thread-safe; use one session per thread.
+"""
+from collections import Counter
+
+import fuzzification
+from defuzzification import Defuzzifier
+from inference import evaluate_application_rule, evaluate_house_rule, evaluate_loan_rule
+from instrumentation import record_cache
+
+
+INPUT_NAMES = tuple(fuzzification.INPUT_CONFIGS)
+OUTPUT_TYPES = ('house', 'application', 'credit')
+
+# Nodes that do not depend on the centroid settings: name -> (dependencies, function)
+STAGES = {
+    'fuzzy_market_house': (('market_house',), fuzzification.market_value_house_fuzzification),
+    'fuzzy_location_house': (('location_house',), fuzzification.location_of_house_fuzzification),
+    'fuzzy_application_assets': (('application_assets',), fuzzification.application_assets_fuzzification),
+    'fuzzy_application_salary': (('application_salary',), fuzzification.application_salary_fuzzification),
+    'fuzzy_interest_rate': (('interest_rate',), fuzzification.interest_rate_fuzzification),
+    'house': (('fuzzy_market_house', 'fuzzy_location_house'), evaluate_house_rule),
+    'application': (('fuzzy_application_assets', 'fuzzy_application_salary'), evaluate_application_rule),
+    'credit': (('fuzzy_application_salary', 'fuzzy_interest_rate', 'application', 'house'), evaluate_loan_rule),
+}
+
+_MISSING = object()
+
+
+class ScoringSession:
+    """
+    A cached evaluation of the scoring pipeline for one applicant.
+
+    Besides STAGES, every output type has a '<type>_score' node (its centroid)
+    and a '<type>_sets' node (`Defuzzifier.clipped_sets`). Scores equal
+    `scoring.score_applicant` with the same defuzzifier and method.
+    """
+
+    def __init__(self, defuzzifier=None, method='sampled', **inputs):
+        """
+        Args:
+            defuzzifier (Defuzzifier): Optional instance to reuse
+            method (str): Centroid method, 'sampled' or 'exact'
+            **inputs: Optional initial crisp inputs, keyed by INPUT_NAMES
+        """
+        self.defuzzifier = defuzzifier if defuzzifier is not None else Defuzzifier()
+        self.method = method
+
+        self.nodes = dict(STAGES)
+        for output_type in OUTPUT_TYPES:
+            self.nodes[f'{output_type}_score'] = ((output_type,), self._centroid(output_type))
+            self.nodes[f'{output_type}_sets'] = ((output_type,), self._sets(output_type))
+
+        self.dependents = {name: [] for name in INPUT_NAMES + tuple(self.nodes)}
+        for name, (dependencies, _) in self.nodes.items():
+            for dependency in dependencies:
+                self.dependents[dependency].append(name)
+
+        # Computed node values and crisp inputs; node -> evaluation count
+        self._values = {}
+        self.evaluations = Counter()
+        if inputs:
+            self.update(**inputs)
+
+    def _centroid(self, output_type):
+        def centroid(fuzzy_output):
+            return self.defuzzifier.centroid_defuzzification(fuzzy_output, output_type, self.method)
+        return centroid
+
+    def _sets(self, output_type):
+        def sets(fuzzy_output):
+            return self.defuzzifier.clipped_sets(fuzzy_output, output_type)
+        return sets
+
+    def update(self, **inputs):
+        """
+        Set crisp inputs, invalidating the nodes downstream of those that changed.
+
+        Args:
+            **inputs: Crisp values keyed by INPUT_NAMES
+
+        Returns:
+            set: Names of the cached nodes that were dropped
+        """
+        unknown = set(inputs) - set(INPUT_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown inputs: {', '.join(sorted(unknown))}")
+
+        dropped = set()
+        for name, value in inputs.items():
+            value = float(value)
+            if self._values.get(name, _MISSING) == value:
+                continue
+            self._values[name] = value
+            # A node missing from the cache has no cached dependents either,
+            # since computing one computes (and caches) its dependencies first
+            stack = list(self.dependents[name])
+            while stack:
+                node = stack.pop()
+                if self._values.pop(node, _MISSING) is not _MISSING:
+                    dropped.add(node)
+                    stack.extend(self.dependents[node])
+        return dropped
+
+    def get(self, name):
+        """
+        The value of a node or crisp input, computed on first read after a change.
+
+        Raises:
+            KeyError: Unknown node, or an input that has not been set
+        """
+        value = self._values.get(name, _MISSING)
+        if name not in self.nodes:
+            if value is _MISSING:
+                raise KeyError(f"Input not set: {name}" if name in INPUT_NAMES else name)
+            return value
+
+        record_cache('scoring_session', value is not _MISSING)
+        if value is _MISSING:
+            dependencies, function = self.nodes[name]
+            value = function(*[self.get(dependency) for dependency in dependencies])
+            self._values[name] = value
+            self.evaluations[name] += 1
+        return value
+
+    def scores(self):
+        """
+        Returns:
+            tuple: (house_score, application_score, credit_score)
+        """
+        return tuple(self.get(f'{output_type}_score') for output_type in OUTPUT_TYPES)
+
+    def copy(self):
+        """A session sharing this one's cached values (they are never mutated), to branch from."""
+        session = ScoringSession.__new__(ScoringSession)
+        session.__dict__.update(self.__dict__)
+        session._values = dict(self._values)
+        session.evaluations = Counter()
+        return session
+
+    def what_if(self, **inputs):
+        """
+        Score the current applicant with some inputs changed, leaving this
+        session as it is; only the nodes downstream of the changes are computed.
+
+        Returns:
+            tuple: (house_score, application_score, credit_score)
+        """
+        branch = self.copy()
+        branch.update(**inputs)
+        return branch.scores()
@@ -0,0 +1,233 @@
+from bisect import bisect_right
+
+import numpy as np
+
+import fuzzification
+from defuzzification import Defuzzifier
+from inference import (APPLICATION_RULE_BASE, HOUSE_RULE_BASE, LOAN_RULE_BASE,
+                       evaluate_application_rule, evaluate_house_rule, evaluate_loan_rule)
+from scoring import score_batch
+
+
+class ResponseSurface:
+    """
+    A score tabulated on a rectilinear grid over some crisp inputs and
+    answered by multilinear interpolation (bilinear for two inputs).
+    """
+
+    def __init__(self, axes, values):
+        """
+        Args:
+            axes (list): One sorted 1-D array of grid points per input
+            values (numpy.ndarray): Scores on the grid, shape (len(axis) for axis in axes)
+        """
+        self.axes = [np.asarray(axis, dtype=float) for axis in axes]
+        self.values = np.asarray(values, dtype=float)
+        self._flat_values = self.values.ravel()
+
+        # Flat-index offsets of the 2^d corners of a cell
+        self._strides = [stride // self.values.itemsize for stride in self.values.strides]
+        self._corners = list(np.ndindex(*(2,) * len(self.axes)))
+        self._corner_offsets = [sum(upper * stride for upper, stride in zip(corner, self._strides))
+                                for corner in self._corners]
+
+        # Plain-Python copies for `value`
+        self._axis_lists = [axis.tolist() for axis in self.axes]
+        self._value_list = self._flat_values.tolist()
+
+    def __call__(self, *coordinates):
+        """
+        Interpolate the surface. Queries outside the grid are clamped to its edges.
+
+        Args:
+            *coordinates (array_like): One array of N values per input
+
+        Returns:
+            numpy.ndarray: N interpolated scores
+        """
+        indices = []
+        fractions = []
+        for axis, values in zip(self.axes, coordinates):
+            values = np.clip(np.asarray(values, dtype=float), axis[0], axis[-1])
+            index = np.clip(np.searchsorted(axis, values, side='right') - 1, 0, len(axis) - 2)
+            indices.append(index)
+            fractions.append((values - axis[index]) / (axis[index + 1] - axis[index]))
+
+        # Weighted sum over the 2^d corners of each cell
+        flat_index = np.ravel_multi_index(indices, self.values.shape)
+        result = np.zeros(flat_index.shape)
+        for corner, offset in zip(self._corners, self._corner_offsets):
+            weight = 1.0
+            for fraction, upper in zip(fractions, corner):
+                weight = weight * (fraction if upper else 1.0 - fraction)
+            result += weight * self._flat_values[flat_index + offset]
+        return result
+
+    def value(self, *coordinates):
+        """
+        Interpolate the surface at a single point, in plain Python.
+
+        Args:
+            *coordinates (float): One value per input
+
+        Returns:
+            float: The interpolated score
+        """
+        flat_index = 0
+        weights = [1.0]
+        offsets = [0]
+        for axis, stride, value in zip(self._axis_lists, self._strides, coordinates):
+            value = min(max(value, axis[0]), axis[-1])
+            index = min(max(bisect_right(axis, value) - 1, 0), len(axis) - 2)
+            fraction = (value - axis[index]) / (axis[index + 1] - axis[index])
+            flat_index += index * stride
+
+            # Extend the corner weights and offsets by this input's two cell edges
+            weights = [weight * (1.0 - fraction) for weight in weights] + [weight * fraction for weight in weights]
+            offsets = offsets + [offset + stride for offset in offsets]
+
+        values = self._value_list
+        return sum(weight * values[flat_index + offset] for weight, offset in zip(weights, offsets))
+
+
+def surface_axis(name, resolution):
+    """
+    Grid points for one crisp input: `resolution` evenly spaced points over its
+    universe plus every membership function vertex, where the surfaces bend.
+
+    Args:
+        name (str): Input name, a key of fuzzification.INPUT_CONFIGS
+        resolution (int): Number of evenly spaced points (0 for vertices only)
+
+    Returns:
+        numpy.ndarray: Sorted unique grid points
+    """
+    config = fuzzification.INPUT_CONFIGS[name]
+    low, high = config['range']
+    vertices = [vertex for _, params in config['sets'].values() for vertex in params]
+    points = np.concatenate([np.linspace(low, high, resolution), vertices, [low, high]])
+    return np.unique(np.clip(points, low, high))
+
+
+class SurrogateScorer:
+    """
+    Precomputed response surfaces of the credit pipeline for constant-time scoring.
+
+    The house score depends only on (market, location) and the application
+    score only on (assets, salary), so each is tabulated as a 2-D surface. The
+    final loan stage is tabulated as its centroid over the five loan rule
+    strengths; at query time those strengths come from the (cheap, vectorized)
+    fuzzification and rule bases, so no query samples an output universe.
+    At build time every surface is checked against the exact pipeline on
+    random applicants and the largest absolute difference is kept in `max_error`.
+    """
+
+    def __init__(self, resolution=128, loan_levels=11, method='sampled',
+                 validation_points=4096, seed=0):
+        """
+        Args:
+            resolution (int): Evenly spaced points per input for the house and application surfaces
+            loan_levels (int): Grid points per rule strength for the loan stage surface;
+                               they are spaced quadratically, denser near 0 where the
+                               centroid bends most
+            method (str): Centroid method of the pipeline being tabulated, 'sampled' or 'exact'
+            validation_points (int): Random applicants used to measure max_error
+            seed (int): Seed for the validation sample
+        """
+        self.method = method
+        self.defuzzifier = Defuzzifier()
+
+        house_axes = [surface_axis('market_house', resolution), surface_axis('location_house', resolution)]
+        self.house = ResponseSurface(house_axes, self._tabulate(
+            {'market_house': house_axes[0], 'location_house': house_axes[1]})[0])
+
+        application_axes = [surface_axis('application_assets', resolution),
+                            surface_axis('application_salary', resolution)]
+        self.application = ResponseSurface(application_axes, self._tabulate(
+            {'application_assets': application_axes[0], 'application_salary': application_axes[1]})[1])
+
+        levels = np.linspace(0.0, 1.0, loan_levels) ** 2
+        mesh = np.meshgrid(*[levels] * len(LOAN_RULE_BASE.outputs), indexing='ij')
+        credit = self.defuzzifier.centroid_defuzzification_batch(
+            dict(zip(LOAN_RULE_BASE.outputs, (strength.ravel() for strength in mesh))), 'credit',
+            method=method)
+        self.credit = ResponseSurface([levels] * len(LOAN_RULE_BASE.outputs), credit.reshape(mesh[0].shape))
+
+        self.max_error = self._validate(validation_points, seed)
+
+    def _tabulate(self, axes):
+        # Score every point of the grid spanned by `axes`; the inputs that do
+        # not affect the surface stay at the lower end of their range.
+        # Returns score grids of shape (len(axis) for axis in axes.values())
+        shape = tuple(len(axis) for axis in axes.values())
+        mesh = dict(zip(axes, np.meshgrid(*axes.values(), indexing='ij')))
+        columns = [
+            mesh[name].ravel() if name in mesh
+            else np.full(int(np.prod(shape)), config['range'][0], dtype=float)
+            for name, config in fuzzification.INPUT_CONFIGS.items()
+        ]
+        scores = score_batch(*columns, defuzzifier=self.defuzzifier, method=self.method)
+        return [output.reshape(shape) for output in scores]
+
+    def _validate(self, count, seed):
+        rng = np.random.default_rng(seed)
+        columns = [rng.uniform(*config['range'], count) for config in fuzzification.INPUT_CONFIGS.values()]
+        exact = score_batch(*columns, defuzzifier=self.defuzzifier, method=self.method)
+        approximate = self.score(*columns)
+        return {
+            output: float(np.max(np.abs(exact_scores - approximate_scores), initial=0.0))
+            for output, exact_scores, approximate_scores in zip(('house', 'application', 'credit'),
+                                                                exact, approximate)
+        }
+
+    def score(self, market, location, assets, salary, rate):
+        """
+        Interpolated scores for a batch of applicants or a single applicant.
+
+        Args:
+            market, location, assets, salary, rate (array_like): Crisp inputs, as in `score_batch`,
+                                                                 or five floats
+
+        Returns:
+            tuple: (house_scores, application_scores, credit_scores), arrays of N values
+                   or floats for a single applicant
+        """
+        if all(np.ndim(values) == 0 for values in (market, location, assets, salary, rate)):
+            return self._score_one(market, location, assets, salary, rate)
+
+        crisp_inputs = [np.ravel(np.asarray(values, dtype=float))
+                        for values in (market, location, assets, salary, rate)]
+        degrees = {
+            name: fuzzification.fuzzify_array(values, config['sets'])
+            for values, (name, config) in zip(crisp_inputs, fuzzification.INPUT_CONFIGS.items())
+        }
+        house = HOUSE_RULE_BASE.evaluate({'market': degrees['market_house'],
+                                          'location': degrees['location_house']})
+        application = APPLICATION_RULE_BASE.evaluate({'assets': degrees['application_assets'],
+                                                      'salary': degrees['application_salary']})
+        credit = LOAN_RULE_BASE.evaluate({'salary': degrees['application_salary'],
+                                          'interest': degrees['interest_rate'],
+                                          'application': application,
+                                          'house': house})
+
+        return (
+            self.house(crisp_inputs[0], crisp_inputs[1]),
+            self.application(crisp_inputs[2], crisp_inputs[3]),
+            self.credit(*np.clip(credit, 0.0, 1.0).T)
+        )
+
+    def _score_one(self, market, location, assets, salary, rate):
+        # One applicant: dict-based fuzzification and rules plus plain-Python
+        # interpolation avoid the per-call overhead of small arrays
+        salary_fuzzy = fuzzification.application_salary_fuzzification(salary)
+        house = evaluate_house_rule(fuzzification.market_value_house_fuzzification(market),
+                                    fuzzification.location_of_house_fuzzification(location))
+        application = evaluate_application_rule(fuzzification.application_assets_fuzzification(assets),
+                                                salary_fuzzy)
+        credit = evaluate_loan_rule(salary_fuzzy, fuzzification.interest_rate_fuzzification(rate),
+                                    application, house)
+        return (
+            self.house.value(market, location),
+            self.application.value(assets, salary),
+            self.credit.value(*(min(max(credit[label], 0.0), 1.0) for label in LOAN_RULE_BASE.outputs))
+        )